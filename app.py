@@ -1,42 +1,95 @@
 import os
-import json
-from datetime import datetime
 from functools import wraps
-from flask import Flask, render_template, request, redirect, url_for, session, send_from_directory, jsonify
+from flask import Flask, Response, render_template, request, redirect, url_for, session, jsonify, make_response, stream_with_context
+from werkzeug.utils import secure_filename
+from src.web.storage import open_store, user_key
+from src.web.cache import UserCache
+from src.web.leaderboard import Leaderboard
+from src.web.cohort import Cohort
+from src.web.aggregates import SUBJECTS, subject_averages, chart_points
+from src.web.records import build_record, rebase_record, read_import_rows, parse_import_row, build_import_batch, iter_csv, iter_ndjson
+from src.web.journal import WriteBehindJournal
+from src.components.schema import FEATURE_CATEGORIES
+from src.web import metrics as app_metrics
+from src.web import assets as app_assets
+from src.web.assets import PageCache
+from src.web.metrics import metrics
+from src.logger import logger
 
 app = Flask(__name__)
 app.secret_key = "supersecret-key-change-this"  # change in production
 
 # -----------------------------
-# Storage (JSON – no database)
+# Storage (no database)
+# USER_STORE_BACKEND=log (default) keeps an indexed append-only log in data/store
+# and migrates an existing data/users.json on first start; =json keeps the legacy file.
+# APP_DATA_DIR / APP_ARTIFACTS_DIR point the app at other data and model directories
+# (benchmarks, staging copies).
 # -----------------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(BASE_DIR, "data")
+DATA_DIR = os.environ.get("APP_DATA_DIR") or os.path.join(BASE_DIR, "data")
+ARTIFACTS_DIR = os.environ.get("APP_ARTIFACTS_DIR") or os.path.join(BASE_DIR, "artifacts")
 os.makedirs(DATA_DIR, exist_ok=True)
-USERS_FILE = os.path.join(DATA_DIR, "users.json")
-
-SUBJECTS = ["Math", "Reading", "Writing", "English", "Computer", "Science", "Social"]
+store = open_store(DATA_DIR)
+users_cache = UserCache(store, maxsize=int(os.environ.get("USER_CACHE_SIZE", 4096)))
+board = Leaderboard(store)
+cohort = Cohort(store)
+# score submissions go through a fsynced write-behind journal that is folded into
+# the store in the background (log backend only; WRITE_BEHIND=0 writes directly).
+# Reads may lag another worker's submissions by the fold interval, so every write
+# rebases its records on the stored latest record (deltas, points) under the store lock.
+journal = None
+if os.environ.get("WRITE_BEHIND", "1") != "0" and getattr(store, "supports_watermarks", False):
+    journal = WriteBehindJournal(store, os.path.join(DATA_DIR, "journal"), reader=users_cache.get,
+                                 rebase=rebase_record)
+    journal.recover()
+MAX_PREDICT_BATCH = 1000
+MAX_IMPORT_ROWS = 50000
+# comma-separated usernames allowed to import/export records of other users
+IMPORT_ADMINS = {user_key(u) for u in os.environ.get("IMPORT_ADMINS", "").split(",") if u.strip()}
+_predictor = None
+# latency histograms at /metrics; PROFILE_TOKEN enables per-request cProfile via X-Profile
+app_metrics.init_app(app)
+# fingerprinted, precompressed static files; anonymous pages rendered once per worker
+assets = app_assets.init_app(app)
+pages = PageCache()
 
 # -----------------------------
 # Helpers
 # -----------------------------
-def ensure_store():
-    if not os.path.exists(USERS_FILE):
-        with open(USERS_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f)
-
-def load_users():
-    ensure_store()
-    with open(USERS_FILE, "r", encoding="utf-8") as f:
-        try:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
-        except Exception:
-            return []
-
-def save_users(users):
-    with open(USERS_FILE, "w", encoding="utf-8") as f:
-        json.dump(users, f, indent=2, ensure_ascii=False)
+@metrics.timed("store_operation_seconds", op="find_user")
+def find_user(username):
+    if journal is not None:
+        return journal.get_user(username)
+    return users_cache.get(username)
+
+def get_predictor():
+    # one warm model per worker; loaded on first use, hot-swapped when a new model is published
+    global _predictor
+    if _predictor is None:
+        from src.pipeline.score_predictor import ScorePredictor
+        predictor = ScorePredictor(
+            os.path.join(ARTIFACTS_DIR, "model.pkl"),
+            os.path.join(ARTIFACTS_DIR, "preprocessor.pkl"),
+            reload_interval=float(os.environ.get("MODEL_RELOAD_INTERVAL", 5)),
+        )
+        predictor.warm()
+        _predictor = predictor
+    return _predictor
+
+def warm_up():
+    """Build the store index, leaderboard and cohort and load the model now instead of on first use.
+
+    gunicorn.conf.py calls this in the preloaded master, so forked workers
+    share the result copy-on-write.
+    """
+    store.refresh()
+    len(board)
+    len(cohort)
+    try:
+        get_predictor()
+    except Exception as e:
+        logger.warning(f"Prediction model not preloaded: {e}")
 
 def login_required(view):
     @wraps(view)
@@ -49,84 +102,38 @@ def login_required(view):
 def current_user_full():
     if "user" not in session:
         return None
-    username = session["user"]["username"]
-    users = load_users()
-    return next((u for u in users if u["username"].lower() == username.lower()), None)
-
-# -----------------------------
-# Recommendations / Badges / Points
-# -----------------------------
-RECOMMENDATIONS = {
-    "Math": "Practice problem sets daily; revisit formulas and attempt past papers.",
-    "Reading": "Read editorials and short stories; summarize in your own words.",
-    "Writing": "Draft structured paragraphs; focus on grammar and clarity.",
-    "English": "Improve vocabulary and grammar with short daily exercises.",
-    "Computer": "Revise basics; build tiny programs or logic puzzles.",
-    "Science": "Strengthen fundamentals; learn via concept maps and experiments.",
-    "Social": "Create timelines/maps; revise key events and civics topics."
+    return find_user(session["user"]["username"])
+
+PROFILE_LABELS = {
+    "gender": "Gender",
+    "race_ethnicity": "Race/Ethnicity",
+    "parental_level_of_education": "Parental Level of Education",
+    "lunch": "Lunch",
+    "test_preparation_course": "Test Preparation Course",
 }
 
-def make_recommendation(weakest_list, hours):
-    if not weakest_list:
-        base = "Great work! Keep practicing to maintain consistency."
-    else:
-        base = "; ".join(RECOMMENDATIONS.get(w, "Practice regularly.") for w in weakest_list)
-    if hours < 2:
-        return f"{base} You’re studying <2 hrs/day — try to increase consistent study time."
-    if hours >= 6:
-        return f"{base} You’re studying a lot — focus on targeted practice & mock tests."
-    return base
-
-def badge_for_percentage(p):
-    if p >= 85:
-        return "🏅 Gold"
-    if p >= 70:
-        return "🥈 Silver"
-    if p >= 55:
-        return "🥉 Bronze"
-    return "🎯 Starter"
-
-def clamp_scores(scores):
-    return {k: max(0, min(100, int(v))) for k, v in scores.items()}
-
-def compute_percentage(scores):
-    return round(sum(scores.values()) / len(scores), 2) if scores else 0.0
-
-def compute_points(prev_pct, new_pct):
-    if new_pct > prev_pct:
-        delta = new_pct - prev_pct
-        if delta >= 10:
-            return 20
-        if delta >= 5:
-            return 14
-        return 10
-    return 2
-
-def compute_subject_deltas(prev_scores, new_scores):
-    deltas = {}
-    for s in SUBJECTS:
-        prev = prev_scores.get(s, 0) if prev_scores else 0
-        deltas[s] = new_scores.get(s, 0) - prev
-    return deltas
+def render_register(**context):
+    return render_template("register.html", profile_labels=PROFILE_LABELS, profile_options=FEATURE_CATEGORIES, **context)
+
+def is_import_admin():
+    return "user" in session and user_key(session["user"]["username"]) in IMPORT_ADMINS
 
 # -----------------------------
 # Routes
 # -----------------------------
 @app.route("/")
+@pages.cached
 def index():
     return render_template("index.html")
 
 @app.route("/login", methods=["GET", "POST"])
+@pages.cached
 def login():
     if request.method == "POST":
         username = (request.form.get("username") or "").strip()
         password = request.form.get("password") or ""
-        users = load_users()
-        user = next(
-            (u for u in users if u["username"].lower() == username.lower() and u.get("password", "") == password),
-            None
-        )
-        if user:
+        user = find_user(username)
+        if user and user.get("password", "") == password:
             session["user"] = {
                 "username": user["username"],
                 "name": user["name"],
@@ -137,6 +144,7 @@ def login():
     return render_template("login.html")
 
 @app.route("/register", methods=["GET", "POST"])
+@pages.cached
 def register():
     if request.method == "POST":
         name = (request.form.get("name") or "").strip()
@@ -146,26 +154,28 @@ def register():
         repassword = request.form.get("repassword") or ""
 
         if not (name and username and roll and password and repassword):
-            return render_template("register.html", error="All fields are required for registration.")
+            return render_register(error="All fields are required for registration.")
 
         if password != repassword:
-            return render_template("register.html", error="Passwords do not match.")
-
-        users = load_users()
-        if any(u["username"].lower() == username.lower() for u in users):
-            return render_template("register.html", error="Username already exists. Please choose another.")
-
-        users.append({
-            "name": name,
-            "username": username,
-            "roll": roll,
-            "password": password,
-            "points": 0,
-            "records": []
-        })
-        save_users(users)
-        return render_template("register.html", success="Registration successful. Please login.")
-    return render_template("register.html")
+            return render_register(error="Passwords do not match.")
+
+        # optional demographics, used as features by the incremental retraining
+        profile = {f: request.form.get(f) for f in PROFILE_LABELS if request.form.get(f) in FEATURE_CATEGORIES[f]}
+
+        with metrics.timer("store_operation_seconds", op="add_user"):
+            added = store.add_user({
+                "name": name,
+                "username": username,
+                "roll": roll,
+                "password": password,
+                "points": 0,
+                "profile": profile,
+                "records": []
+            })
+        if not added:
+            return render_register(error="Username already exists. Please choose another.")
+        return render_register(success="Registration successful. Please login.")
+    return render_register()
 
 @app.route("/logout")
 def logout():
@@ -196,55 +206,30 @@ def home():
         except Exception:
             return render_template("home.html", user=user, latest=latest, error="Please enter valid integers (0–100).")
 
-        scores = clamp_scores(scores)
-        percentage = compute_percentage(scores)
-        weakest_val = min(scores.values())
-        weakest_subjects = sorted([s for s, v in scores.items() if v == weakest_val])
-        recommendation = make_recommendation(weakest_subjects, hours)
-        badge = badge_for_percentage(percentage)
-
-        prev_pct = user["records"][-1]["percentage"] if user["records"] else 0
-        prev_scores = user["records"][-1]["scores"] if user["records"] else {}
-        points_gain = compute_points(prev_pct, percentage)
-        deltas = compute_subject_deltas(prev_scores, scores)
-
-        new_record = {
-            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
-            "hours": hours,
-            "scores": scores,
-            "percentage": percentage,
-            "weakest_subjects": weakest_subjects,
-            "recommendation": recommendation,
-            "badge": badge,
-            "deltas": deltas
-        }
-
-        users = load_users()
-        for u in users:
-            if u["username"].lower() == user["username"].lower():
-                u["records"].append(new_record)
-                u["points"] = u.get("points", 0) + points_gain
-                user = u
-                break
-        save_users(users)
+        new_record, points_gain = build_record(scores, hours, latest)
+
+        if journal is not None:
+            with metrics.timer("store_operation_seconds", op="journal_submit"):
+                journal.submit(user["username"], new_record, points_gain)
+            user = find_user(user["username"]) or user
+        else:
+            with metrics.timer("store_operation_seconds", op="append_record"):
+                stored = store.append_record(user["username"], new_record, points_gain, rebase=rebase_record)
+            if stored is not None:
+                user, new_record = stored, stored["records"][-1]
         latest = new_record
 
-    trend_labels = []
-    trend_percentages = []
-    subject_trend = {s: [] for s in SUBJECTS}
-    averages = {}
-
-    if user["records"]:
-        trend_labels = [f"Attempt {i+1}" for i in range(len(user["records"]))]  
-        trend_percentages = [r["percentage"] for r in user["records"]]
-        for s in SUBJECTS:
-            subject_trend[s] = [r["scores"].get(s, 0) for r in user["records"]]
-        averages = {
-            s: round(sum(r["scores"].get(s, 0) for r in user["records"]) / len(user["records"]), 2)
-            for s in SUBJECTS
-        }
+    # running aggregates are maintained by the store on every append
+    agg = user["aggregates"]
+    series = agg["series"]
+    trend_labels = [f"Attempt {i+1}" for i in range(agg["count"])]
+    trend_percentages = series["percentage"]
+    subject_trend = {s: series[s] for s in SUBJECTS}
+    averages = subject_averages(agg)
 
     scores_for_chart = latest["scores"] if latest else {}
+    standing = cohort.standing(latest["scores"], user["username"]) if latest else None
+    cohort_stats = cohort.summary() if latest else None
 
     return render_template(
         "home.html",
@@ -253,58 +238,197 @@ def home():
         scores=scores_for_chart,
         trend={"labels": trend_labels, "percentages": trend_percentages},
         subject_trend=subject_trend,
-        averages=averages
+        averages=averages,
+        aggregates=agg,
+        standing=standing,
+        cohort_stats=cohort_stats
     )
 
 @app.route("/records")
 @login_required
 def records():
+    # ?page=N&per_page=M renders one slice of the history (oldest first)
     user = current_user_full()
     if not user:
         return redirect(url_for("login"))
-    return render_template("records.html", user=user, records=user.get("records", []))
+    all_records = user.get("records", [])
+    per_page = min(max(request.args.get("per_page", 50, type=int), 1), 500)
+    pages = max(-(-len(all_records) // per_page), 1)
+    page = min(max(request.args.get("page", 1, type=int), 1), pages)
+    offset = (page - 1) * per_page
+    return render_template(
+        "records.html", user=user, records=all_records[offset:offset + per_page],
+        page=page, pages=pages, per_page=per_page, total=len(all_records), offset=offset
+    )
+
+@app.route("/records/import", methods=["POST"])
+@login_required
+def import_records():
+    # CSV (header row), a JSON list / {"records": [...]} or NDJSON, as the body or a "file" upload.
+    # Rows without a username belong to the caller; other users need IMPORT_ADMINS.
+    # Nothing is written unless every row is valid.
+    upload = request.files.get("file")
+    data = upload.read() if upload else request.get_data()
+    content_type = (upload.mimetype if upload else request.mimetype) or ""
+    if upload and upload.filename:
+        ext = os.path.splitext(upload.filename)[1].lower()
+        content_type = {".csv": "text/csv", ".json": "application/json",
+                        ".ndjson": "application/x-ndjson", ".jsonl": "application/x-ndjson"}.get(ext, content_type)
+    try:
+        rows = read_import_rows(data, content_type, max_rows=MAX_IMPORT_ROWS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not rows:
+        return jsonify({"error": "No records to import."}), 400
+
+    me = session["user"]["username"]
+    admin = is_import_admin()
+    parsed, errors, users = [], [], {}
+    for i, row in enumerate(rows, 1):
+        try:
+            username, scores, hours, timestamp = parse_import_row(row, default_username=me)
+            key = user_key(username)
+            if key != user_key(me) and not admin:
+                raise ValueError("not allowed to import records for other users")
+            if key not in users:
+                users[key] = find_user(username)
+            if users[key] is None:
+                raise ValueError(f"unknown user {username!r}")
+        except ValueError as e:
+            errors.append({"row": i, "error": str(e)})
+            continue
+        parsed.append((users[key]["username"], scores, hours, timestamp))
+    if errors:
+        return jsonify({"error": "No records were imported.", "errors": errors[:100], "error_count": len(errors)}), 400
+
+    if journal is not None:
+        # this worker's pending submissions come before the import
+        journal.flush()
+    batch = build_import_batch(parsed, {})
+    # the chain is rebuilt under the store lock on top of each user's real latest record
+    gains = {}
+    def rebase(record, prev_record):
+        rebased, gain = rebase_record(record, prev_record)
+        gains[id(record)] = gain
+        return rebased, gain
+    with metrics.timer("store_operation_seconds", op="import_records"):
+        imported = store.append_records(batch, rebase=rebase)
+    points = {}
+    for username, record, _ in batch:
+        if id(record) in gains:
+            points[username] = points.get(username, 0) + gains[id(record)]
+    return jsonify({"imported": imported, "users": len(points), "points": points})
+
+@app.route("/records/export")
+@login_required
+def export_records():
+    # ?format=ndjson (default) or csv; admins may add ?all=1 for every user.
+    # The body is streamed in chunks, one user at a time.
+    fmt = request.args.get("format", "ndjson").lower()
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    if request.args.get("all") == "1":
+        if not is_import_admin():
+            return jsonify({"error": "Exporting all users requires IMPORT_ADMINS."}), 403
+        if journal is not None:
+            journal.flush()
+        source = ((u["username"], u.get("records", [])) for u in store.iter_users())
+        name = "records"
+    else:
+        user = current_user_full()
+        if not user:
+            return redirect(url_for("login"))
+        source = [(user["username"], user.get("records", []))]
+        name = f"records-{secure_filename(user['username']) or 'user'}"
+
+    if fmt == "csv":
+        body, mimetype = iter_csv(source), "text/csv"
+    else:
+        body, mimetype = iter_ndjson(source), "application/x-ndjson"
+    resp = Response(stream_with_context(body), mimetype=mimetype)
+    resp.headers["Content-Disposition"] = f'attachment; filename="{name}.{fmt}"'
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
 
 @app.route("/leaderboard")
 def leaderboard():
-    users = load_users()
-    board = []
-    for u in users:
-        recs = u.get("records", [])
-        if recs:
-            avg = round(sum(r["percentage"] for r in recs) / len(recs), 2)
-            board.append({
-                "name": u.get("name", u["username"]),
-                "roll": u.get("roll", "-"),
-                "avg": avg,
-                "points": u.get("points", 0)
-            })
-    board.sort(key=lambda x: (x["avg"], x["points"]), reverse=True)
-    return render_template("leaderboard.html", leaderboard=board)
+    # ?top=K shows the first K entries, ?page=N&per_page=M paginates; no args shows everyone
+    top = request.args.get("top", type=int)
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = request.args.get("per_page", type=int)
+    if top is not None:
+        offset, limit = 0, max(top, 0)
+    elif per_page:
+        per_page = min(max(per_page, 1), 500)
+        offset, limit = (page - 1) * per_page, per_page
+    else:
+        offset, limit = 0, None
+
+    with metrics.timer("store_operation_seconds", op="leaderboard_page"):
+        rows, total = board.page(offset, limit)
+    pages = -(-total // per_page) if per_page and top is None else 1
+    resp = make_response(render_template(
+        "leaderboard.html", leaderboard=rows, page=page, pages=pages, per_page=per_page
+    ))
+    resp.set_etag(Leaderboard.etag(rows, total))
+    resp.last_modified = board.last_modified
+    resp.cache_control.public = True
+    resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
 
 @app.route("/records/chart-data")
 @login_required
 def chart_data():
+    # ?since=N skips the first N attempts the client already has, ?limit caps the batch
     user = current_user_full()
-    if not user or not user.get("records"):
+    if not user:
         return jsonify([])
-    data = [
-        {
-            "timestamp": r["timestamp"],
-            "percentage": r["percentage"],
-            "scores": r["scores"]
-        }
-        for r in user["records"]
-    ]
-    return jsonify(data)
+    agg = user["aggregates"]
+    since = min(max(request.args.get("since", 0, type=int), 0), agg["count"])
+    limit = request.args.get("limit", type=int)
+    resp = jsonify(chart_points(agg, since, max(limit, 0) if limit is not None else None))
+    resp.headers["X-Total-Count"] = str(agg["count"])
+    return resp
+
+@app.route("/api/cohort")
+def api_cohort():
+    # cohort statistics over every student's latest record; logged-in users also get their standing
+    with metrics.timer("store_operation_seconds", op="cohort_summary"):
+        payload = dict(cohort.summary())
+    user = current_user_full()
+    if user and user.get("records"):
+        payload["me"] = cohort.standing(user["records"][-1]["scores"], user["username"])
+    return jsonify(payload)
+
+@app.route("/api/predict", methods=["POST"])
+def api_predict():
+    # a JSON object predicts one student; a list (or {"students": [...]}) is scored as one batch
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict) and isinstance(payload.get("students"), list):
+        payload = payload["students"]
+    bulk = isinstance(payload, list)
+    rows = payload if bulk else [payload]
+    if not rows or not all(isinstance(r, dict) for r in rows):
+        return jsonify({"error": "Expected a JSON object or a list of objects with the student features."}), 400
+    if len(rows) > MAX_PREDICT_BATCH:
+        return jsonify({"error": f"At most {MAX_PREDICT_BATCH} students per request."}), 413
+
+    try:
+        predictor = get_predictor()
+    except Exception:
+        return jsonify({"error": "Prediction model is not available."}), 503
+    try:
+        predictions = predictor.predict_many(rows)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if bulk:
+        return jsonify({"predictions": predictions})
+    return jsonify({"prediction": predictions[0]})
 
 @app.route("/health")
 def health():
-    return {"status": "ok"}
-
-@app.route("/static/<path:filename>")
-def static_files(filename):
-    static_dir = os.path.join(BASE_DIR, "static")
-    return send_from_directory(static_dir, filename)
+    return {"status": "ok", "user_cache": users_cache.stats(), "page_cache": pages.stats()}
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,93 @@
+"""Load time and peak RSS of model artifacts: dill vs joblib (+mmap) vs flat forest.
+
+    python -m benchmarks.artifact_load --model artifacts/model.pkl
+
+Each variant is loaded in a fresh interpreter, so the timings include the
+imports the unpickler triggers (sklearn for the pickled estimators), which is
+what a cold worker pays.
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+_PROBE = r"""
+import json, resource, sys, time
+
+def peak_rss_mb():
+    # VmHWM is reset by exec; ru_maxrss on Linux also counts the parent before exec
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+from src.utils import load_object
+start = time.perf_counter()
+obj = load_object(sys.argv[1], mmap_mode=None if sys.argv[2] == "none" else sys.argv[2], verify=sys.argv[3] == "1")
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "rss_mb": peak_rss_mb()}))
+"""
+
+
+def _probe(path, mmap_mode, verify):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.getcwd()] + sys.path))
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE, path, mmap_mode, "1" if verify else "0"],
+        check=True, capture_output=True, text=True, env=env,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(model_path, repeats=3):
+    from src.utils import load_object, save_object
+    from src.components.flat_forest import FlatForest
+    tmp = tempfile.mkdtemp(prefix="artifact_bench_")
+    try:
+        model = load_object(model_path)
+        joblib_path = os.path.join(tmp, "model.joblib")
+        flat_path = os.path.join(tmp, "model.flat")
+        save_object(joblib_path, model, fmt="joblib")
+        save_object(flat_path, FlatForest.from_model(model), fmt="joblib")
+        variants = [
+            ("dill", model_path, "none", False),
+            ("joblib", joblib_path, "none", False),
+            ("joblib+mmap", joblib_path, "r", False),
+            ("joblib+mmap+verify", joblib_path, "r", True),
+            ("flat+mmap", flat_path, "r", False),
+            ("flat+mmap+verify", flat_path, "r", True),
+        ]
+        results = {}
+        for name, path, mmap_mode, verify in variants:
+            runs = [_probe(path, mmap_mode, verify) for _ in range(repeats)]
+            results[name] = {
+                "file_mb": os.path.getsize(path) / 2**20,
+                "seconds": min(r["seconds"] for r in runs),
+                "rss_mb": min(r["rss_mb"] for r in runs),
+            }
+        return results
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="artifacts/model.pkl")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = run(args.model, args.repeats)
+    print(f"{'variant':<20} {'file MB':>8} {'load s':>8} {'peak RSS MB':>12}")
+    for name, r in results.items():
+        print(f"{name:<20} {r['file_mb']:>8.1f} {r['seconds']:>8.3f} {r['rss_mb']:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
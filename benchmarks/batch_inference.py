@@ -0,0 +1,58 @@
+"""Throughput of BatchInferenceService against a single-process ``model.predict``.
+
+    python -m benchmarks.batch_inference --rows 200000 --workers 4
+"""
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+from src.pipeline.batch_inference import BatchInferenceService
+
+
+def _best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows, workers, chunksize, repeats, data_path, model_path, preprocessor_path):
+    base = pd.read_csv(data_path)
+    df = base.sample(rows, replace=True, random_state=0).reset_index(drop=True)
+    with BatchInferenceService(model_path, preprocessor_path, workers=workers, chunksize=chunksize) as service:
+        service.predict(df.head(chunksize * workers))  # start the pool outside the timing
+        single = _best_of(lambda: service.predict_single(df), repeats)
+        pooled = _best_of(lambda: service.predict(df), repeats)
+    return {
+        "rows": rows,
+        "workers": workers,
+        "single_rows_per_s": rows / single,
+        "pool_rows_per_s": rows / pooled,
+        "speedup": single / pooled,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--data", default="notebook/data/StudentsPerformance.csv")
+    parser.add_argument("--model", default="artifacts/model.pkl")
+    parser.add_argument("--preprocessor", default="artifacts/preprocessor.pkl")
+    args = parser.parse_args(argv)
+
+    result = run(args.rows, args.workers or os.cpu_count() or 1, args.chunksize, args.repeats,
+                 args.data, args.model, args.preprocessor)
+    print(f"rows={result['rows']} workers={result['workers']}")
+    print(f"single-process model.predict: {result['single_rows_per_s']:,.0f} rows/s")
+    print(f"process pool:                 {result['pool_rows_per_s']:,.0f} rows/s  ({result['speedup']:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Synthetic StudentsPerformance-style datasets and users.json stores of any size.
+
+    python -m benchmarks.datagen dataset --rows 1000000 --out /tmp/students.csv
+    python -m benchmarks.datagen users --users 10000 --records 20 --out /tmp/data/users.json
+
+Feature combinations are drawn from their joint frequencies in the source
+CSV. Scores are the source mean for that combination plus noise with the
+source's residual covariance, rounded and clipped to 0-100. Store records
+are built with ``src.web.records.build_record``, exactly like ``/home``.
+"""
+import os
+import sys
+import json
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from src.components.schema import FEATURE_COLS, TARGET_COLS
+
+DEFAULT_SOURCE = os.path.join("notebook", "data", "StudentsPerformance.csv")
+
+# users.json uses the subject titles, the dataset the *_score columns
+SUBJECT_OF = {
+    "math_score": "Math", "reading_score": "Reading", "writing_score": "Writing",
+    "english_score": "English", "computer_score": "Computer", "science_score": "Science",
+    "social_score": "Social",
+}
+
+
+class SyntheticStudents:
+    def __init__(self, source=DEFAULT_SOURCE, seed=0):
+        df = pd.read_csv(source)
+        groups = df.groupby(FEATURE_COLS, sort=True)[TARGET_COLS]
+        self.combos = pd.DataFrame(list(groups.groups.keys()), columns=FEATURE_COLS)
+        counts = groups.size().to_numpy(dtype=np.float64)
+        self.weights = counts / counts.sum()
+        self.means = groups.mean().to_numpy()
+        residuals = df[TARGET_COLS].to_numpy(dtype=np.float64) - groups.transform("mean").to_numpy()
+        self.cov = np.cov(residuals, rowvar=False)
+        self.rng = np.random.default_rng(seed)
+
+    def sample(self, n, combo=None):
+        """``n`` rows with the source columns; scores are uint8. ``combo`` fixes the feature combination."""
+        if combo is None:
+            idx = self.rng.choice(len(self.combos), size=n, p=self.weights)
+        else:
+            idx = np.full(n, combo)
+        noise = self.rng.multivariate_normal(np.zeros(len(TARGET_COLS)), self.cov, size=n, method="cholesky")
+        scores = np.clip(np.rint(self.means[idx] + noise), 0, 100).astype(np.uint8)
+        frame = self.combos.iloc[idx].reset_index(drop=True)
+        for j, col in enumerate(TARGET_COLS):
+            frame[col] = scores[:, j]
+        return frame
+
+    def write_dataset(self, path, rows, chunksize=500_000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        written = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            while written < rows:
+                n = min(chunksize, rows - written)
+                self.sample(n).to_csv(f, index=False, header=written == 0)
+                written += n
+        return path
+
+    def write_users(self, path, n_users, records_per_user=20, start=datetime(2024, 1, 1)):
+        """Stream a legacy users.json with profiles; record counts are Poisson around ``records_per_user``."""
+        from src.web.records import build_record
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        counts = self.rng.poisson(records_per_user, size=n_users)
+        total = 0
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[\n")
+            for i, count in enumerate(counts):
+                # each student keeps one feature combination, which becomes their profile
+                combo = int(self.rng.choice(len(self.combos), p=self.weights))
+                frame = self.sample(int(count), combo)
+                hours = self.rng.integers(0, 9, size=int(count))
+                records, points, prev = [], 0, None
+                profile = self.combos.iloc[combo].to_dict()
+                for j, row in enumerate(frame[TARGET_COLS].itertuples(index=False, name=None)):
+                    scores = {SUBJECT_OF[col]: int(v) for col, v in zip(TARGET_COLS, row)}
+                    timestamp = (start + timedelta(days=j, minutes=i % 1440)).isoformat(timespec="seconds")
+                    prev, gain = build_record(scores, int(hours[j]), prev, timestamp=timestamp)
+                    records.append(prev)
+                    points += gain
+                user = {
+                    "name": f"Student {i}",
+                    "username": f"student{i:07d}",
+                    "roll": str(100000 + i),
+                    "password": "password",
+                    "points": points,
+                    "profile": profile,
+                    "records": records,
+                }
+                f.write((",\n" if i else "") + json.dumps(user, ensure_ascii=False))
+                total += int(count)
+            f.write("\n]\n")
+        return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=DEFAULT_SOURCE)
+    parser.add_argument("--seed", type=int, default=0)
+    sub = parser.add_subparsers(dest="command", required=True)
+    ds = sub.add_parser("dataset", help="write a training CSV")
+    ds.add_argument("--rows", type=int, required=True)
+    ds.add_argument("--out", required=True)
+    us = sub.add_parser("users", help="write a users.json store")
+    us.add_argument("--users", type=int, required=True)
+    us.add_argument("--records", type=int, default=20, help="mean records per user")
+    us.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    gen = SyntheticStudents(args.source, args.seed)
+    if args.command == "dataset":
+        gen.write_dataset(args.out, args.rows)
+        print(f"Wrote {args.rows} rows to {args.out}")
+    else:
+        total = gen.write_users(args.out, args.users, args.records)
+        print(f"Wrote {args.users} users / {total} records to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
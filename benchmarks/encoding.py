@@ -0,0 +1,111 @@
+"""Memory and throughput of the feature encodings: dense one-hot vs sparse CSR vs ordinal uint8.
+
+    python -m benchmarks.encoding --rows 10000000
+
+Rows are resampled (with replacement) from StudentsPerformance.csv. Each
+encoding runs in a fresh interpreter so peak RSS is comparable; it encodes
+every row, fits a small native multi-output forest on ``--fit-rows`` of them
+and predicts all rows.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+
+def _rss_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _nbytes(X):
+    if hasattr(X, "indptr"):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+
+def synthetic_frame(source, rows, seed=0):
+    import numpy as np
+    import pandas as pd
+    from src.components.schema import FEATURE_COLS, TARGET_COLS
+    df = pd.read_csv(source)
+    idx = np.random.default_rng(seed).integers(0, len(df), rows)
+    data = {col: pd.Categorical(df[col].to_numpy()[idx]) for col in FEATURE_COLS}
+    data.update({col: df[col].to_numpy(dtype=np.uint8)[idx] for col in TARGET_COLS})
+    return pd.DataFrame(data)
+
+
+def measure(encoding, source, rows, fit_rows, n_estimators, max_depth):
+    from sklearn.ensemble import RandomForestRegressor
+    from src.components.data_transformation import DataTransformation
+    from src.components.schema import FEATURE_COLS, TARGET_COLS
+
+    df = synthetic_frame(source, rows)
+    y = df[TARGET_COLS].to_numpy()
+    base_rss = _rss_mb("VmRSS")
+
+    preprocessor = DataTransformation(encoding=encoding).get_preprocessor_object()
+    start = time.perf_counter()
+    X = preprocessor.fit_transform(df[FEATURE_COLS])
+    encode_seconds = time.perf_counter() - start
+    del df
+
+    model = RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth, random_state=42, n_jobs=-1)
+    start = time.perf_counter()
+    model.fit(X[:fit_rows], y[:fit_rows])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.predict(X)
+    predict_seconds = time.perf_counter() - start
+
+    return {
+        "features": f"{type(X).__name__} {X.dtype}",
+        "feature_mb": _nbytes(X) / 2**20,
+        "encode_rows_per_s": rows / encode_seconds,
+        "fit_seconds": fit_seconds,
+        "predict_rows_per_s": rows / predict_seconds,
+        "peak_rss_over_input_mb": _rss_mb("VmHWM") - base_rss,
+    }
+
+
+def _probe(encoding, args):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.getcwd()] + sys.path))
+    cmd = [sys.executable, "-m", "benchmarks.encoding", "--probe", encoding, "--data", args.data,
+           "--rows", str(args.rows), "--fit-rows", str(args.fit_rows),
+           "--trees", str(args.trees), "--max-depth", str(args.max_depth)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True, env=env).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=os.path.join("notebook", "data", "StudentsPerformance.csv"))
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--fit-rows", type=int, default=1_000_000)
+    parser.add_argument("--trees", type=int, default=10)
+    parser.add_argument("--max-depth", type=int, default=10)
+    parser.add_argument("--encodings", default="onehot,sparse,ordinal")
+    parser.add_argument("--probe", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        print(json.dumps(measure(args.probe, args.data, args.rows, args.fit_rows, args.trees, args.max_depth)))
+        return 0
+
+    print(f"{'encoding':<9} {'features':<22} {'MB':>8} {'encode rows/s':>14} {'fit s':>7} "
+          f"{'predict rows/s':>15} {'peak RSS +MB':>13}")
+    for encoding in args.encodings.split(","):
+        r = _probe(encoding, args)
+        print(f"{encoding:<9} {r['features']:<22} {r['feature_mb']:>8.1f} {r['encode_rows_per_s']:>14,.0f} "
+              f"{r['fit_seconds']:>7.1f} {r['predict_rows_per_s']:>15,.0f} {r['peak_rss_over_input_mb']:>13.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
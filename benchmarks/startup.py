@@ -0,0 +1,194 @@
+"""Web worker startup: import cost, cold start and per-worker memory, with and without preloading.
+
+    python -m benchmarks.startup --artifacts artifacts --workers 4
+
+Every number comes from a fresh interpreter:
+
+* ``imports``: ``python -X importtime -c "import <module>"`` for the web app
+  and the prediction modules. It reports the cumulative import time and
+  which heavy packages got loaded.
+* ``cold_start``: import the app and answer the first ``/health`` through
+  the test client. It reports wall time and peak RSS.
+* ``workers``: ``--workers`` processes that warm up (store index,
+  leaderboard, cohort, model) and serve a few requests. ``spawn`` starts
+  each one from scratch, like gunicorn without ``preload_app``.
+  ``preload`` warms up once in a master and forks, like
+  ``gunicorn.conf.py``. For each worker it reports RSS and USS (the
+  private memory: what one more worker actually costs).
+
+The model comes from ``--artifacts`` (``APP_ARTIFACTS_DIR``); without
+model.pkl the predictor is skipped. Users come from ``benchmarks.datagen``.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+HEAVY = ("numpy", "pandas", "scipy", "sklearn", "dill", "joblib", "catboost")
+IMPORT_TARGETS = ("app", "src.pipeline.score_predictor", "src.pipeline.stage_runner", "src.utils")
+
+
+def _memory_mb():
+    """RSS and USS (private clean + dirty) of this process in MB."""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":"):
+                fields[parts[0][:-1]] = int(parts[1])
+    uss = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {"rss_mb": fields.get("Rss", 0) / 1024, "uss_mb": uss / 1024}
+
+
+def _serve(app_module):
+    client = app_module.app.test_client()
+    for path in ("/", "/login", "/leaderboard", "/api/cohort", "/health"):
+        client.get(path)
+    if app_module._predictor is not None:
+        row = {col: sorted(values)[0] for col, values in app_module.FEATURE_CATEGORIES.items()}
+        client.post("/api/predict", json=row)
+
+
+def _child(mode, workers):
+    """Runs in a fresh interpreter with APP_DATA_DIR / APP_ARTIFACTS_DIR set; prints one JSON line."""
+    if mode == "cold":
+        start = time.perf_counter()
+        import app
+        app.app.test_client().get("/health")
+        seconds = time.perf_counter() - start
+        print(json.dumps(dict(_memory_mb(), seconds=seconds, heavy=[m for m in HEAVY if m in sys.modules])))
+        return
+    if mode == "spawn":
+        start = time.perf_counter()
+        import app
+        app.warm_up()
+        _serve(app)
+        print(json.dumps(dict(_memory_mb(), ready_seconds=time.perf_counter() - start)))
+        return
+
+    # preload: warm up once, then fork workers that keep running until all have reported
+    import gc
+    start = time.perf_counter()
+    import app
+    app.warm_up()
+    gc.collect()
+    gc.freeze()
+    master = dict(_memory_mb(), ready_seconds=time.perf_counter() - start)
+    results, pids, release_r, release_w = [], [], *os.pipe()
+    for _ in range(workers):
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            os.close(release_w)
+            fork_start = time.perf_counter()
+            _serve(app)
+            report = dict(_memory_mb(), ready_seconds=time.perf_counter() - fork_start)
+            os.write(write_end, json.dumps(report).encode())
+            os.close(write_end)
+            os.read(release_r, 1)  # stay alive until every worker has measured itself
+            os._exit(0)
+        os.close(write_end)
+        pids.append((pid, read_end))
+    for pid, read_end in pids:
+        with os.fdopen(read_end, "rb") as f:
+            results.append(json.loads(f.read()))
+    os.close(release_w)
+    for pid, _ in pids:
+        os.waitpid(pid, 0)
+    print(json.dumps({"master": master, "workers": results}))
+
+
+def _run_child(args, env):
+    cmd = [sys.executable, "-m", "benchmarks.startup"] + args
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True, env=env).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure_imports(env):
+    results = {}
+    for module in IMPORT_TARGETS:
+        probe = f"import {module}, sys, json; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], check=True,
+                              capture_output=True, text=True, env=env)
+        total_us = 0
+        for line in proc.stderr.splitlines():
+            parts = [p.strip() for p in line.split("|")]
+            if len(parts) == 3 and parts[2] == module:
+                total_us = int(parts[1])
+        results[module] = {"import_ms": total_us / 1000, "heavy": json.loads(proc.stdout.strip().splitlines()[-1])}
+    return results
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--artifacts", default="artifacts", help="directory with model.pkl / lookup_table.npz")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--records-per-user", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3, help="cold starts to time (the median is reported)")
+    parser.add_argument("--source", default=os.path.join("notebook", "data", "StudentsPerformance.csv"))
+    parser.add_argument("--output", help="also write the results as JSON here")
+    parser.add_argument("--child", choices=["cold", "spawn", "preload"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.child, args.workers)
+        return 0
+
+    from benchmarks.datagen import SyntheticStudents
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        data_dir = os.path.join(workdir, "data")
+        SyntheticStudents(args.source).write_users(os.path.join(data_dir, "users.json"), args.users,
+                                                   args.records_per_user)
+        env = dict(os.environ, APP_DATA_DIR=data_dir, APP_ARTIFACTS_DIR=os.path.abspath(args.artifacts),
+                   LOG_DIR=os.path.join(workdir, "logs"), PYTHONPATH=os.pathsep.join([os.getcwd()] + sys.path))
+        # the first start migrates users.json into the log store; keep that out of the timings
+        _run_child(["--child", "cold"], env)
+
+        results = {"imports": measure_imports(env)}
+        colds = sorted((_run_child(["--child", "cold"], env) for _ in range(args.repeat)), key=lambda r: r["seconds"])
+        results["cold_start"] = colds[len(colds) // 2]
+        spawned = [_run_child(["--child", "spawn"], env) for _ in range(args.workers)]
+        preload = _run_child(["--child", "preload", "--workers", str(args.workers)], env)
+        results["workers"] = {
+            "spawn": {"per_worker": spawned,
+                      "mean_rss_mb": _mean([w["rss_mb"] for w in spawned]),
+                      "mean_uss_mb": _mean([w["uss_mb"] for w in spawned]),
+                      "mean_ready_seconds": _mean([w["ready_seconds"] for w in spawned])},
+            "preload": {"master": preload["master"], "per_worker": preload["workers"],
+                        "mean_rss_mb": _mean([w["rss_mb"] for w in preload["workers"]]),
+                        "mean_uss_mb": _mean([w["uss_mb"] for w in preload["workers"]]),
+                        "mean_ready_seconds": _mean([w["ready_seconds"] for w in preload["workers"]])},
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for module, entry in results["imports"].items():
+        print(f"import {module:<32} {entry['import_ms']:>8.1f} ms  heavy: {', '.join(entry['heavy']) or '-'}")
+    cold = results["cold_start"]
+    print(f"cold start (import app + first request) {cold['seconds'] * 1000:>8.1f} ms  rss {cold['rss_mb']:.1f} MB")
+    for mode, entry in results["workers"].items():
+        print(f"{mode:<8} workers: rss {entry['mean_rss_mb']:.1f} MB  uss {entry['mean_uss_mb']:.1f} MB  "
+              f"ready {entry['mean_ready_seconds'] * 1000:.1f} ms")
+    if "master" in results["workers"]["preload"]:
+        m = results["workers"]["preload"]["master"]
+        print(f"preload master: rss {m['rss_mb']:.1f} MB, warm-up {m['ready_seconds'] * 1000:.1f} ms")
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
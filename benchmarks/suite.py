@@ -0,0 +1,233 @@
+"""End-to-end benchmark suite: pipeline components and Flask routes at several sizes.
+
+    python -m benchmarks.suite --sizes 1000,100000 --users 100,2000
+    python -m benchmarks.suite --record-baseline      # accept the current numbers
+
+Results go to ``--output`` as JSON. Each entry is keyed ``<group>/<name>@<size>``
+and has a ``seconds`` (components) or ``p50_ms`` (routes) metric. Entries
+slower than the baseline by more than ``--tolerance`` are reported and the
+exit code is 1. Baselines are machine-specific, so none is committed: record
+one on the machine that runs the comparison. Without one the exit code is 2,
+so a missing baseline cannot pass for "no regressions".
+
+Data comes from ``benchmarks.datagen``. Route timings run in a fresh
+interpreter per store size, with ``APP_DATA_DIR`` pointing the app at a
+generated users.json in a temporary directory. ModelTrainer is only timed up
+to ``--train-max-rows``, since the default forest does not scale to millions
+of rows on a laptop.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+PRIMARY_METRICS = ("seconds", "p50_ms")
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def bench_components(gen, size, workdir, train_max_rows, multioutput):
+    import pandas as pd
+    from src.components.data_ingestion import DataIngestion
+    from src.components.data_transformation import DataTransformation
+    from src.components.model_trainer import ModelTrainer
+    from src.pipeline.predict_pipeline import PredictPipeline
+
+    raw = gen.write_dataset(os.path.join(workdir, "students.csv"), size)
+    artifacts = os.path.join(workdir, "artifacts")
+    results = {}
+    (train_path, test_path), seconds = _timed(
+        lambda: DataIngestion(raw, artifacts_dir=artifacts).initiate_data_ingestion())
+    results[f"components/ingestion@{size}"] = {"seconds": seconds}
+
+    (train_array, test_array, _), seconds = _timed(
+        lambda: DataTransformation(artifacts_dir=artifacts).initiate_data_transformation(train_path, test_path))
+    results[f"components/transformation@{size}"] = {"seconds": seconds}
+
+    if size <= train_max_rows:
+        trainer = ModelTrainer(multioutput=multioutput, artifacts_dir=artifacts)
+        metrics, seconds = _timed(lambda: trainer.initiate_model_trainer(train_array, test_array))
+        results[f"components/trainer@{size}"] = {"seconds": seconds, "mae": metrics["mae"]}
+
+    df = pd.read_csv(raw)
+    pipeline = PredictPipeline()
+    _, seconds = _timed(lambda: pipeline.predict(df))
+    results[f"components/predict@{size}"] = {"seconds": seconds, "rows_per_s": size / seconds}
+    _, seconds = _timed(lambda: pipeline.class_statistics(df))
+    results[f"components/class_statistics@{size}"] = {"seconds": seconds}
+    return results
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {
+        "p50_ms": pick(0.50) * 1000,
+        "p95_ms": pick(0.95) * 1000,
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "requests": len(samples),
+    }
+
+
+def probe_routes(n_users, requests):
+    """Runs inside the child interpreter; APP_DATA_DIR is already set."""
+    from app import app, store
+    from src.components.schema import TARGET_COLS
+
+    usernames = [u["username"] for u in store.iter_users()]
+    rng = random.Random(0)
+    client = app.test_client()
+
+    def login(username):
+        user = store.get_user(username)
+        with client.session_transaction() as sess:
+            sess["user"] = {"username": user["username"], "name": user["name"], "roll": user["roll"]}
+
+    def post_home():
+        # the form fields share the dataset's *_score names
+        form = {col: str(rng.randint(0, 100)) for col in TARGET_COLS}
+        form["hours_studied"] = str(rng.randint(0, 8))
+        return client.post("/home", data=form)
+
+    routes = {
+        "home_post": post_home,
+        "leaderboard": lambda: client.get("/leaderboard"),
+        "leaderboard_page": lambda: client.get("/leaderboard?page=1&per_page=50"),
+        "chart_data": lambda: client.get("/records/chart-data"),
+    }
+    results = {}
+    for name, call in routes.items():
+        login(rng.choice(usernames))
+        call()  # first hit builds indexes and template caches
+        samples = []
+        for i in range(requests):
+            if i % 10 == 0:
+                login(rng.choice(usernames))
+            start = time.perf_counter()
+            resp = call()
+            samples.append(time.perf_counter() - start)
+            if resp.status_code >= 400:
+                raise RuntimeError(f"{name} returned {resp.status_code}")
+        results[f"routes/{name}@users={n_users}"] = _percentiles(samples)
+    return results
+
+
+def bench_routes(gen, n_users, records_per_user, requests, workdir):
+    data_dir = os.path.join(workdir, f"data-{n_users}")
+    gen.write_users(os.path.join(data_dir, "users.json"), n_users, records_per_user)
+    env = dict(os.environ, APP_DATA_DIR=data_dir,
+               PYTHONPATH=os.pathsep.join([os.getcwd()] + sys.path))
+    cmd = [sys.executable, "-m", "benchmarks.suite", "--probe-routes", str(n_users), "--requests", str(requests)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True, env=env).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance, min_delta_ms=1.0):
+    """Entries whose primary metric exceeds the baseline by more than ``tolerance``."""
+    regressions = []
+    for key, entry in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for metric in PRIMARY_METRICS:
+            if metric in entry and metric in base:
+                now, before = entry[metric], base[metric]
+                floor = min_delta_ms / (1000 if metric == "seconds" else 1)
+                if now > before * (1 + tolerance) and now - before > floor:
+                    regressions.append({"key": key, "metric": metric, "baseline": before, "current": now,
+                                        "ratio": now / before if before else float("inf")})
+    return regressions
+
+
+def _write_json(path, payload):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000", help="dataset rows for the component benchmarks")
+    parser.add_argument("--users", default="100,2000", help="store sizes for the route benchmarks")
+    parser.add_argument("--records-per-user", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--train-max-rows", type=int, default=20000)
+    parser.add_argument("--multioutput", choices=["wrapper", "native"], default="wrapper")
+    parser.add_argument("--source", default=os.path.join("notebook", "data", "StudentsPerformance.csv"))
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", default=os.path.join(RESULTS_DIR, "baseline.json"))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown ratio before flagging")
+    parser.add_argument("--record-baseline", "--update-baseline", dest="record_baseline", action="store_true",
+                        help="write the results to --baseline instead of comparing against it")
+    parser.add_argument("--skip-components", action="store_true")
+    parser.add_argument("--skip-routes", action="store_true")
+    parser.add_argument("--probe-routes", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe_routes is not None:
+        print(json.dumps(probe_routes(args.probe_routes, args.requests)))
+        return 0
+
+    from benchmarks.datagen import SyntheticStudents
+    gen = SyntheticStudents(args.source)
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    results = {}
+    try:
+        if not args.skip_components:
+            for size in [int(s) for s in args.sizes.split(",") if s]:
+                size_dir = os.path.join(workdir, f"rows-{size}")
+                results.update(bench_components(gen, size, size_dir, args.train_max_rows, args.multioutput))
+        if not args.skip_routes:
+            for n_users in [int(s) for s in args.users.split(",") if s]:
+                results.update(bench_routes(gen, n_users, args.records_per_user, args.requests, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    payload = {
+        "meta": {
+            "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    _write_json(args.output, payload)
+
+    for key, entry in results.items():
+        metric = next(m for m in PRIMARY_METRICS if m in entry)
+        print(f"{key:<48} {metric:>8} {entry[metric]:>12.4f}")
+
+    if args.record_baseline:
+        _write_json(args.baseline, payload)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --record-baseline to store one", file=sys.stderr)
+        return 2
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r['key']} {r['metric']}: {r['baseline']:.4f} -> {r['current']:.4f} ({r['ratio']:.2f}x)")
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
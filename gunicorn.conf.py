@@ -0,0 +1,34 @@
+# gunicorn app:app   (picks this file up from the working directory)
+#
+# preload_app imports app.py once in the master; when_ready then builds the
+# store index, leaderboard and cohort and loads the model there, so forked
+# workers start warm and share those pages copy-on-write. Everything that
+# holds a descriptor or a thread (stores, locks, the write-behind journal, the
+# log listener) re-opens or restarts itself per process.
+import gc
+import os
+import multiprocessing
+
+bind = os.environ.get("BIND", f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+# the write-behind journal folds on exit; give it time before a stopping worker is killed
+graceful_timeout = 30
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG")
+errorlog = "-"
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    import app
+    app.warm_up()
+    # keep the preloaded objects out of the collector so it does not dirty
+    # their pages in every worker (which would undo the copy-on-write sharing)
+    gc.collect()
+    gc.freeze()
+    server.log.info("Preloaded store index, leaderboard, cohort and model")
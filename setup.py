@@ -21,7 +21,7 @@ name='mlproject',
 version='0.0.1',
 author='Vanshi Chandra',
 author_email='vanshichandra26@gmail.com',
-packages=find_packages(),
+packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
 install_requires=get_requirements('requirements.txt')
 
 )
\ No newline at end of file
@@ -0,0 +1,150 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+SCHEMA_FILE = "schema.json"
+_UNSIGNED = [np.uint8, np.uint16, np.uint32, np.uint64]
+
+
+def is_columnar(path):
+    return os.path.isfile(os.path.join(path, SCHEMA_FILE))
+
+
+def _narrowest_unsigned(max_value):
+    for dtype in _UNSIGNED:
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError(f"value {max_value} does not fit an unsigned integer")
+
+
+def _numeric_dtype(values):
+    """Smallest dtype holding ``values`` exactly: uint8 for 0-100 scores."""
+    if values.dtype.kind in "iu" or (values.dtype.kind == "f" and np.all(np.isfinite(values)) and np.all(values == np.round(values))):
+        if values.size == 0 or values.min() >= 0:
+            return _narrowest_unsigned(int(values.max()) if values.size else 0)
+        return np.dtype(np.int64)
+    return np.dtype(np.float64)
+
+
+class ColumnarWriter:
+    """Append DataFrame chunks into a directory of raw column files.
+
+    Layout: ``schema.json`` plus one ``<column>.bin`` per column, readable
+    with ``np.memmap``. Object columns are stored as categorical codes
+    (uint8 until there are more than 255 categories) and integer-valued
+    numeric columns in the narrowest unsigned type that fits, so the 0-100
+    scores take one byte each. A column is widened in place if a later chunk
+    needs a larger type.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+        self.rows = 0
+        self.columns = None
+        self._files = {}
+
+    def _bin(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _widen(self, col, dtype):
+        name = col["name"]
+        self._files[name].close()
+        old = np.fromfile(self._bin(name), dtype=col["dtype"])
+        old.astype(dtype).tofile(self._bin(name))
+        col["dtype"] = np.dtype(dtype).str
+        self._files[name] = open(self._bin(name), "ab")
+
+    def append(self, df: pd.DataFrame):
+        if self.columns is None:
+            self.columns = []
+            for name in df.columns:
+                kind = "numeric" if pd.api.types.is_numeric_dtype(df[name].dtype) else "category"
+                self.columns.append({"name": str(name), "kind": kind, "dtype": np.dtype(np.uint8).str, "categories": []})
+                self._files[str(name)] = open(self._bin(name), "ab")
+
+        for col in self.columns:
+            series = df[col["name"]]
+            if col["kind"] == "category":
+                lookup = {v: i for i, v in enumerate(col["categories"])}
+                for v in pd.unique(series.astype(str)):
+                    if v not in lookup:
+                        lookup[v] = len(col["categories"])
+                        col["categories"].append(v)
+                codes = series.astype(str).map(lookup).to_numpy()
+                needed = _narrowest_unsigned(max(len(col["categories"]) - 1, 0))
+            else:
+                codes = series.to_numpy()
+                needed = _numeric_dtype(codes)
+            current = np.dtype(col["dtype"])
+            if needed != current and np.promote_types(needed, current) != current:
+                self._widen(col, np.promote_types(needed, current))
+            codes.astype(col["dtype"]).tofile(self._files[col["name"]])
+        self.rows += len(df)
+        return self
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        with open(os.path.join(self.path, SCHEMA_FILE), "w", encoding="utf-8") as f:
+            json.dump({"rows": self.rows, "columns": self.columns or []}, f, indent=2)
+        return self.path
+
+
+def write_columnar(df, path):
+    return ColumnarWriter(path).append(df).close()
+
+
+def csv_to_columnar(csv_path, path, chunksize=1_000_000):
+    writer = ColumnarWriter(path)
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        writer.append(chunk)
+    return writer.close()
+
+
+def read_schema(path):
+    with open(os.path.join(path, SCHEMA_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def open_column(path, name, schema=None):
+    """Memory-mapped raw values (codes for categorical columns) and the column's schema entry."""
+    schema = schema or read_schema(path)
+    col = next(c for c in schema["columns"] if c["name"] == name)
+    if schema["rows"] == 0:
+        return np.empty(0, dtype=col["dtype"]), col
+    return np.memmap(os.path.join(path, f"{name}.bin"), dtype=col["dtype"], mode="r", shape=(schema["rows"],)), col
+
+
+def read_columnar(path, columns=None, rows=None):
+    """Load columns as a DataFrame; categorical columns come back as ``category`` dtype."""
+    schema = read_schema(path)
+    names = columns or [c["name"] for c in schema["columns"]]
+    data = {}
+    for name in names:
+        values, col = open_column(path, name, schema)
+        if rows is not None:
+            values = values[rows]
+        if col["kind"] == "category":
+            data[name] = pd.Categorical.from_codes(np.asarray(values, dtype=np.int64), categories=col["categories"])
+        else:
+            data[name] = np.asarray(values)
+    return pd.DataFrame(data)
+
+
+def take_rows(src, dst, indices, chunksize=1_000_000):
+    """Write the rows ``indices`` of columnar dataset ``src`` into ``dst``, one column at a time."""
+    schema = read_schema(src)
+    os.makedirs(dst, exist_ok=True)
+    for col in schema["columns"]:
+        values, _ = open_column(src, col["name"], schema)
+        with open(os.path.join(dst, f"{col['name']}.bin"), "wb") as f:
+            for start in range(0, len(indices), chunksize):
+                np.asarray(values[indices[start:start + chunksize]]).tofile(f)
+    with open(os.path.join(dst, SCHEMA_FILE), "w", encoding="utf-8") as f:
+        json.dump({"rows": int(len(indices)), "columns": schema["columns"]}, f, indent=2)
+    return dst
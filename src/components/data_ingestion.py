@@ -1,27 +1,43 @@
 import os
 import sys
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from src.exception import CustomException
 from src.logger import logger
+from src.components.columnar import csv_to_columnar, read_schema, take_rows
 
 class DataIngestion:
-    def __init__(self, raw_data_path=None):
+    def __init__(self, raw_data_path=None, artifacts_dir="artifacts", data_format="csv", chunksize=1_000_000):
         if raw_data_path is None:
             self.raw_data_path = os.path.join("notebook", "data", "StudentsPerformance.csv")
         else:
             self.raw_data_path = raw_data_path
 
-        self.train_path = os.path.join("artifacts", "train.csv")
-        self.test_path = os.path.join("artifacts", "test.csv")
+        self.artifacts_dir = artifacts_dir
+        # "csv" writes raw/train/test CSVs; "columnar" writes binary column
+        # directories (see src.components.columnar) for multi-million-row data
+        self.data_format = data_format
+        self.chunksize = chunksize
+        if data_format == "columnar":
+            self.train_path = os.path.join(artifacts_dir, "train.col")
+            self.test_path = os.path.join(artifacts_dir, "test.col")
+        elif data_format == "csv":
+            self.train_path = os.path.join(artifacts_dir, "train.csv")
+            self.test_path = os.path.join(artifacts_dir, "test.csv")
+        else:
+            raise ValueError(f"Unknown data format: {data_format}")
 
     def initiate_data_ingestion(self):
         try:
+            if self.data_format == "columnar":
+                return self._ingest_columnar()
+
             logger.info(f"Reading dataset from: {self.raw_data_path}")
             df = pd.read_csv(self.raw_data_path)
 
-            os.makedirs("artifacts", exist_ok=True)
-            df.to_csv(os.path.join("artifacts", "raw.csv"), index=False)
+            os.makedirs(self.artifacts_dir, exist_ok=True)
+            df.to_csv(os.path.join(self.artifacts_dir, "raw.csv"), index=False)
 
             train_set, test_set = train_test_split(df, test_size=0.2, random_state=42)
 
@@ -32,3 +48,17 @@ class DataIngestion:
             return self.train_path, self.test_path
         except Exception as e:
             raise CustomException(e, sys)
+
+    def _ingest_columnar(self):
+        logger.info(f"Converting {self.raw_data_path} to columnar format in chunks of {self.chunksize} rows")
+        os.makedirs(self.artifacts_dir, exist_ok=True)
+        raw_path = csv_to_columnar(self.raw_data_path, os.path.join(self.artifacts_dir, "raw.col"), self.chunksize)
+
+        # splitting row numbers picks the same rows as splitting the frame itself
+        n_rows = read_schema(raw_path)["rows"]
+        train_idx, test_idx = train_test_split(np.arange(n_rows), test_size=0.2, random_state=42)
+        take_rows(raw_path, self.train_path, train_idx, self.chunksize)
+        take_rows(raw_path, self.test_path, test_idx, self.chunksize)
+
+        logger.info(f"Columnar data ingestion completed ({n_rows} rows).")
+        return self.train_path, self.test_path
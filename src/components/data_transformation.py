@@ -3,57 +3,60 @@ import numpy as np
 import pandas as pd
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
 from src.exception import CustomException
 from src.logger import logger
 from src.utils import save_object
+from src.components.schema import FEATURE_COLS, TARGET_COLS
+from src.components.columnar import is_columnar, open_column, read_columnar, read_schema
+
+# "onehot": dense float64 one-hot (the original layout)
+# "sparse": float32 one-hot kept as a CSR matrix
+# "ordinal": one uint8 category code per feature, for forests and CatBoost cat_features
+ENCODINGS = ("onehot", "sparse", "ordinal")
+ORDINAL_UNKNOWN = 255
 
 class DataTransformation:
-    def __init__(self):
-        self.preprocessor_path = os.path.join("artifacts", "preprocessor.pkl")
+    def __init__(self, artifacts_dir="artifacts", chunksize=1_000_000, encoding="onehot"):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {encoding!r}; expected one of {ENCODINGS}")
+        self.artifacts_dir = artifacts_dir
+        self.preprocessor_path = os.path.join(artifacts_dir, "preprocessor.pkl")
+        self.chunksize = chunksize
+        self.encoding = encoding
 
     def get_preprocessor_object(self):
         try:
-            categorical_cols = [
-                "gender",
-                "race_ethnicity",
-                "parental_level_of_education",
-                "lunch",
-                "test_preparation_course"
-            ]
-            cat_pipeline = Pipeline([
-                ("onehot", OneHotEncoder(handle_unknown="ignore", sparse_output=False))
-            ])
+            categorical_cols = FEATURE_COLS
+            if self.encoding == "ordinal":
+                step = ("ordinal", OrdinalEncoder(
+                    handle_unknown="use_encoded_value", unknown_value=ORDINAL_UNKNOWN, dtype=np.uint8
+                ))
+            else:
+                sparse = self.encoding == "sparse"
+                step = ("onehot", OneHotEncoder(
+                    handle_unknown="ignore", sparse_output=sparse, dtype=np.float32 if sparse else np.float64
+                ))
+            cat_pipeline = Pipeline([step])
             preprocessor = ColumnTransformer(transformers=[
                 ("cat", cat_pipeline, categorical_cols)
-            ], remainder="drop")
+            ], remainder="drop", sparse_threshold=1.0 if self.encoding == "sparse" else 0.3)
             return preprocessor
         except Exception as e:
             raise CustomException(e, sys)
 
     def initiate_data_transformation(self, train_path, test_path):
         try:
+            if is_columnar(train_path):
+                return self._transform_columnar(train_path, test_path)
+
             train_df = pd.read_csv(train_path)
             test_df = pd.read_csv(test_path)
 
             logger.info("Preparing data for transformation")
 
-            target_cols = [
-                "math_score",
-                "reading_score",
-                "writing_score",
-                "science_score",
-                "social_score",
-                "english_score",
-                "computer_score"
-            ]
-            feature_cols = [
-                "gender",
-                "race_ethnicity",
-                "parental_level_of_education",
-                "lunch",
-                "test_preparation_course"
-            ]
+            target_cols = TARGET_COLS
+            feature_cols = FEATURE_COLS
 
             X_train = train_df[feature_cols]
             y_train = train_df[target_cols]
@@ -66,12 +69,87 @@ class DataTransformation:
             X_train_transformed = preprocessor.fit_transform(X_train)
             X_test_transformed = preprocessor.transform(X_test)
 
+            save_object(self.preprocessor_path, preprocessor)
+
+            if self.encoding != "onehot":
+                # sparse and uint8 features cannot share one array with the targets
+                logger.info(f"Data transformation complete ({self.encoding} features)")
+                return ((X_train_transformed, y_train.to_numpy()), (X_test_transformed, y_test.to_numpy()),
+                        self.preprocessor_path)
+
             train_array = np.c_[X_train_transformed, y_train.values]
             test_array = np.c_[X_test_transformed, y_test.values]
 
-            save_object(self.preprocessor_path, preprocessor)
-
             logger.info("Data transformation complete")
             return train_array, test_array, self.preprocessor_path
         except Exception as e:
             raise CustomException(e, sys)
+
+    def _fit_frame(self, path):
+        """One row per category present in the training split, padded by repetition.
+
+        Fitting on this gives the same ``categories_`` as fitting on every row.
+        """
+        schema = read_schema(path)
+        present = {}
+        for col in FEATURE_COLS:
+            codes, meta = open_column(path, col, schema)
+            counts = np.bincount(codes, minlength=len(meta["categories"]))
+            present[col] = [c for c, n in zip(meta["categories"], counts) if n]
+        width = max(len(v) for v in present.values())
+        return pd.DataFrame({col: [v[i % len(v)] for i in range(width)] for col, v in present.items()})
+
+    def _write_arrays(self, preprocessor, path, name):
+        """Encode ``path`` chunk by chunk into memory-mapped uint8 ``X_<name>.npy`` / ``y_<name>.npy``.
+
+        With the sparse encoding the features go to ``X_<name>.npz`` as CSR instead.
+        """
+        schema = read_schema(path)
+        n_rows = schema["rows"]
+        width = len(preprocessor.get_feature_names_out())
+        y_dtype = np.result_type(*[open_column(path, col, schema)[1]["dtype"] for col in TARGET_COLS])
+        y_path = os.path.join(self.artifacts_dir, f"y_{name}.npy")
+        y = np.lib.format.open_memmap(y_path, mode="w+", dtype=y_dtype, shape=(n_rows, len(TARGET_COLS)))
+        if self.encoding == "sparse":
+            X, X_path = [], os.path.join(self.artifacts_dir, f"X_{name}.npz")
+        else:
+            X_path = os.path.join(self.artifacts_dir, f"X_{name}.npy")
+            X = np.lib.format.open_memmap(X_path, mode="w+", dtype=np.uint8, shape=(n_rows, width))
+        for start in range(0, n_rows, self.chunksize):
+            rows = slice(start, min(start + self.chunksize, n_rows))
+            encoded = preprocessor.transform(read_columnar(path, FEATURE_COLS, rows))
+            if self.encoding == "sparse":
+                X.append(encoded)
+            else:
+                X[rows] = encoded
+            for j, col in enumerate(TARGET_COLS):
+                y[rows, j] = open_column(path, col, schema)[0][rows]
+        y.flush()
+        del y
+        if self.encoding == "sparse":
+            from scipy import sparse
+            sparse.save_npz(X_path, sparse.vstack(X, format="csr") if X else sparse.csr_matrix((0, width)),
+                            compressed=False)
+            return sparse.load_npz(X_path), np.load(y_path, mmap_mode="r")
+        X.flush()
+        del X
+        return np.load(X_path, mmap_mode="r"), np.load(y_path, mmap_mode="r")
+
+    def _transform_columnar(self, train_path, test_path):
+        """Columnar counterpart of the CSV path.
+
+        Returns ``(X_train, y_train), (X_test, y_test), preprocessor_path``
+        with memory-mapped arrays instead of ``np.c_``-joined float64 matrices;
+        dense features (one-hot or ordinal) and the 0-100 scores are stored as uint8.
+        """
+        logger.info("Preparing columnar data for transformation")
+        os.makedirs(self.artifacts_dir, exist_ok=True)
+        preprocessor = self.get_preprocessor_object()
+        preprocessor.fit(self._fit_frame(train_path))
+
+        train = self._write_arrays(preprocessor, train_path, "train")
+        test = self._write_arrays(preprocessor, test_path, "test")
+        save_object(self.preprocessor_path, preprocessor)
+
+        logger.info(f"Data transformation complete ({train[0].shape[0]} train / {test[0].shape[0]} test rows)")
+        return train, test, self.preprocessor_path
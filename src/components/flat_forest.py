@@ -0,0 +1,105 @@
+import numpy as np
+
+
+class FlatForest:
+    """Array-backed copy of a fitted random forest, for fast loading.
+
+    All trees are concatenated into a handful of flat numpy arrays, so the
+    artifact holds no sklearn objects: unpickling it needs only numpy and its
+    arrays can be memory-mapped by joblib and shared between worker processes.
+    Leaves point to themselves, which lets ``predict`` walk every tree for a
+    block of samples in ``max_depth`` vectorized steps.
+
+    Supports ``RandomForestRegressor``/``ExtraTreesRegressor`` (single or
+    native multi-output) and ``MultiOutputRegressor`` wrapping them.
+    """
+
+    def __init__(self, left, right, feature, threshold, value, roots, tree_target, n_outputs, max_depth, n_features):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.tree_target = tree_target
+        self.n_outputs = n_outputs
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+
+    @staticmethod
+    def _groups(model):
+        estimators = getattr(model, "estimators_", None)
+        if not estimators:
+            return None
+        if all(hasattr(est, "tree_") for est in estimators):
+            return [(-1, estimators)]
+        if all(hasattr(forest, "estimators_") and all(hasattr(t, "tree_") for t in forest.estimators_)
+               for forest in estimators):
+            # MultiOutputRegressor: one single-output forest per target
+            return [(j, forest.estimators_) for j, forest in enumerate(estimators)]
+        return None
+
+    @classmethod
+    def supports(cls, model):
+        return cls._groups(model) is not None
+
+    @classmethod
+    def from_model(cls, model):
+        groups = cls._groups(model)
+        if groups is None:
+            raise TypeError(f"Cannot flatten {type(model).__name__}")
+        n_outputs = len(groups) if groups[0][0] >= 0 else model.n_outputs_
+
+        lefts, rights, features, thresholds, values, roots, targets = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for target, trees in groups:
+            for est in trees:
+                t = est.tree_
+                idx = np.arange(t.node_count, dtype=np.int32) + offset
+                leaf = t.children_left == -1
+                lefts.append(np.where(leaf, idx, t.children_left + offset).astype(np.int32))
+                rights.append(np.where(leaf, idx, t.children_right + offset).astype(np.int32))
+                features.append(np.where(leaf, 0, t.feature).astype(np.int32))
+                thresholds.append(t.threshold.astype(np.float64))
+                values.append(t.value[:, :, 0].astype(np.float64))
+                roots.append(offset)
+                targets.append(target)
+                max_depth = max(max_depth, t.max_depth)
+                offset += t.node_count
+
+        return cls(
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            tree_target=np.asarray(targets, dtype=np.int32),
+            n_outputs=n_outputs,
+            max_depth=max_depth,
+            n_features=model.n_features_in_,
+        )
+
+    def _leaves(self, X):
+        rows = np.arange(X.shape[0])
+        node = np.repeat(self.roots[:, None], X.shape[0], axis=1)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict(self, X, block_size=2048):
+        # sklearn's trees compare float32 features against float64 thresholds
+        X = np.asarray(X.toarray() if hasattr(X, "toarray") else X, dtype=np.float32)
+        out = np.empty((X.shape[0], self.n_outputs), dtype=np.float64)
+        grouped = self.tree_target[0] >= 0
+        for start in range(0, X.shape[0], block_size):
+            leaves = self._leaves(X[start:start + block_size])
+            if grouped:
+                leaf_values = self.value[leaves, 0]
+                for j in range(self.n_outputs):
+                    out[start:start + len(leaves[0]), j] = leaf_values[self.tree_target == j].mean(axis=0)
+            else:
+                out[start:start + leaves.shape[1]] = self.value[leaves].mean(axis=0)
+        return out
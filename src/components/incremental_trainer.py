@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import shutil
+import numpy as np
+from datetime import datetime, timezone
+from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor
+from sklearn.multioutput import MultiOutputRegressor
+from sklearn.metrics import mean_absolute_error
+from src.exception import CustomException
+from src.logger import logger, log_stage
+from src.utils import save_object, load_object, read_manifest, file_sha256, predict_targets
+from src.components.schema import FEATURE_COLS, TARGET_COLS
+from src.components.columnar import read_columnar, read_schema
+from src.components.lookup_table import PredictionLookupTable
+
+MODEL_VERSION_FILE = "model_version.json"
+FORESTS = (RandomForestRegressor, ExtraTreesRegressor)
+
+
+def _grow_forest(forest, X, y, add_trees, max_trees=None):
+    # warm_start keeps the fitted trees and fits only the new ones, on the new rows
+    forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + add_trees)
+    forest.fit(X, y)
+    forest.set_params(warm_start=False)
+    if max_trees and len(forest.estimators_) > max_trees:
+        # sliding window: the oldest trees saw the oldest data
+        del forest.estimators_[:len(forest.estimators_) - max_trees]
+        forest.n_estimators = len(forest.estimators_)
+
+
+def continue_training(model, X, y, add_trees=50, max_trees=None):
+    """Continue fitting ``model`` on new rows instead of refitting from scratch.
+
+    Random forests (plain or per-subject ``MultiOutputRegressor``) get
+    ``add_trees`` new trees per forest via ``warm_start``; CatBoost continues
+    boosting from the current model with ``init_model``. Returns the updated model.
+    """
+    if type(model).__module__.startswith("catboost"):
+        continued = type(model)(**model.get_params())
+        continued.fit(X, y, init_model=model)
+        return continued
+    if isinstance(model, MultiOutputRegressor) and all(isinstance(e, FORESTS) for e in model.estimators_):
+        y = np.asarray(y)
+        for i, forest in enumerate(model.estimators_):
+            _grow_forest(forest, X, y[:, i], add_trees, max_trees)
+        return model
+    if isinstance(model, FORESTS):
+        _grow_forest(model, X, y, add_trees, max_trees)
+        return model
+    raise CustomException(
+        f"{type(model).__name__} cannot be trained incrementally; run the full training pipeline "
+        "(the 'flat' artifact format is inference-only)"
+    )
+
+
+def _tree_count(model):
+    if isinstance(model, MultiOutputRegressor):
+        return sum(len(e.estimators_) for e in model.estimators_)
+    if hasattr(model, "estimators_"):
+        return len(model.estimators_)
+    return int(getattr(model, "tree_count_", 0))
+
+
+class IncrementalTrainer:
+    """Warm-start the published model on a columnar batch of new rows and publish it atomically.
+
+    Features go through the published preprocessor as-is (the model's
+    inputs must not move). The new model, its lookup table (if one is
+    published) and ``model_version.json`` are written to a staging directory
+    next to the artifacts and moved into place with ``os.replace``;
+    ``model_version.json`` goes last and is what serving workers watch.
+    """
+
+    def __init__(self, artifacts_dir="artifacts", add_trees=50, max_trees=None):
+        self.artifacts_dir = artifacts_dir
+        self.model_path = os.path.join(artifacts_dir, "model.pkl")
+        self.preprocessor_path = os.path.join(artifacts_dir, "preprocessor.pkl")
+        self.lookup_table_path = os.path.join(artifacts_dir, "lookup_table.npz")
+        self.version_path = os.path.join(artifacts_dir, MODEL_VERSION_FILE)
+        self.add_trees = add_trees
+        self.max_trees = max_trees
+
+    def read_version(self):
+        try:
+            with open(self.version_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _load_batch(self, preprocessor, dataset_path):
+        frame = read_columnar(dataset_path)
+        encoder = preprocessor.named_transformers_["cat"].steps[-1][1]
+        known = np.ones(len(frame), dtype=bool)
+        for col, cats in zip(FEATURE_COLS, encoder.categories_):
+            known &= frame[col].astype(str).isin(cats.tolist()).to_numpy()
+        if not known.all():
+            logger.info(f"Skipping {int((~known).sum())} rows with categories the preprocessor has not seen")
+            frame = frame[known]
+        return preprocessor.transform(frame[FEATURE_COLS]), frame[TARGET_COLS].to_numpy(dtype=np.float64)
+
+    def initiate_incremental_training(self, dataset_path, before_publish=None):
+        """Warm-start on ``dataset_path`` and publish; returns the new ``model_version.json`` contents.
+
+        ``before_publish(version)`` runs once the artifacts are staged (the
+        version includes the new ``model_sha256``) and before they are swapped in.
+        """
+        try:
+            preprocessor = load_object(self.preprocessor_path)
+            # no memory-mapping: the file is about to be replaced
+            model = load_object(self.model_path, mmap_mode=None)
+            X, y = self._load_batch(preprocessor, dataset_path)
+            if X.shape[0] == 0:
+                raise CustomException(f"No usable rows in {dataset_path}")
+
+            mae_before = float(mean_absolute_error(y, predict_targets(model, X)))
+            with log_stage("model_warm_start", model=type(model).__name__, rows=X.shape[0], add_trees=self.add_trees):
+                model = continue_training(model, X, y, self.add_trees, self.max_trees)
+            mae_after = float(mean_absolute_error(y, predict_targets(model, X)))
+            logger.info(f"Warm start on {X.shape[0]} rows: MAE on the new rows {mae_before:.4f} -> {mae_after:.4f}",
+                        extra={"mae_before": mae_before, "mae_after": mae_after})
+
+            previous = self.read_version() or {}
+            version = {
+                "version": previous.get("version", 0) + 1,
+                "kind": "incremental",
+                "rows": int(X.shape[0]),
+                "trees": _tree_count(model),
+                "mae_new_rows_before": mae_before,
+                "mae_new_rows_after": mae_after,
+                "dataset_rows": read_schema(dataset_path)["rows"],
+                "published": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            version["model_sha256"] = self.publish(model, preprocessor, version, before_publish)
+            return version
+        except CustomException:
+            raise
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def publish(self, model, preprocessor, version, before_publish=None):
+        """Stage the new artifacts next to the live ones, then swap them in; returns the model's sha256."""
+        staging = os.path.join(self.artifacts_dir, ".staging")
+        if os.path.exists(staging):
+            shutil.rmtree(staging)
+        os.makedirs(staging)
+        try:
+            # keep the published format: joblib artifacts carry a manifest, dill ones do not
+            fmt = "joblib" if read_manifest(self.model_path) else "dill"
+            staged_model = os.path.join(staging, "model.pkl")
+            save_object(staged_model, model, fmt=fmt)
+            model_sha = file_sha256(staged_model)
+            moves = []
+            if os.path.exists(self.lookup_table_path):
+                table = PredictionLookupTable.build(model, preprocessor, FEATURE_COLS, TARGET_COLS, model_sha256=model_sha)
+                table.save(os.path.join(staging, "lookup_table.npz"))
+                # the table goes first: until the model follows it is stale and ignored
+                moves.append(("lookup_table.npz", self.lookup_table_path))
+            if fmt == "joblib":
+                moves.append(("model.pkl.manifest.json", self.model_path + ".manifest.json"))
+            moves.append(("model.pkl", self.model_path))
+            version = dict(version, model_sha256=model_sha)
+            with open(os.path.join(staging, MODEL_VERSION_FILE), "w", encoding="utf-8") as f:
+                json.dump(version, f, indent=2)
+            moves.append((MODEL_VERSION_FILE, self.version_path))
+
+            if before_publish is not None:
+                before_publish(version)
+
+            for name, dest in moves:
+                os.replace(os.path.join(staging, name), dest)
+            logger.info(f"Published model version {version['version']} ({model_sha[:12]})")
+            return model_sha
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,75 @@
+import os
+import json
+from itertools import product
+import numpy as np
+from src.utils import predict_targets
+
+
+class PredictionLookupTable:
+    """Exhaustive table of model predictions over every category combination.
+
+    ``table[i_gender, i_race, i_education, i_lunch, i_prep]`` holds the seven
+    predicted scores, indexed by each feature's position in the fitted
+    encoder's ``categories_``. Loading and predicting need numpy only.
+    """
+
+    def __init__(self, feature_cols, target_cols, categories, table, model_sha256=None):
+        self.feature_cols = list(feature_cols)
+        self.target_cols = list(target_cols)
+        self.categories = [list(c) for c in categories]
+        self.table = table
+        self.model_sha256 = model_sha256
+        self._codes = [{v: i for i, v in enumerate(cats)} for cats in self.categories]
+
+    @classmethod
+    def build(cls, model, preprocessor, feature_cols, target_cols, model_sha256=None):
+        import pandas as pd
+        encoder = preprocessor.named_transformers_["cat"].steps[-1][1]
+        categories = [[str(v) for v in cats] for cats in encoder.categories_]
+        grid = pd.DataFrame(list(product(*categories)), columns=feature_cols)
+        predicted = predict_targets(model, preprocessor.transform(grid))
+        table = predicted.reshape([len(c) for c in categories] + [len(target_cols)])
+        return cls(feature_cols, target_cols, categories, table, model_sha256)
+
+    def save(self, path):
+        dir_path = os.path.dirname(path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        meta = {
+            "feature_cols": self.feature_cols,
+            "target_cols": self.target_cols,
+            "categories": self.categories,
+            "model_sha256": self.model_sha256,
+        }
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, table=self.table, meta=np.array(json.dumps(meta)))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(meta["feature_cols"], meta["target_cols"], meta["categories"], data["table"], meta["model_sha256"])
+
+    def codes(self, rows):
+        """Category codes for an iterable of feature tuples; raises ValueError on unknown values."""
+        codes = []
+        for row in rows:
+            try:
+                codes.append([self._codes[j][str(v)] for j, v in enumerate(row)])
+            except KeyError as e:
+                raise ValueError(f"Unknown category value: {e.args[0]!r}")
+        return np.asarray(codes, dtype=np.intp).reshape(-1, len(self.feature_cols))
+
+    def predict(self, X):
+        """Predict from a DataFrame with the feature columns, or from feature tuples."""
+        if hasattr(X, "columns"):
+            X = X[self.feature_cols].itertuples(index=False, name=None)
+        codes = self.codes(X)
+        return self.table[tuple(codes.T)]
+
+    def max_abs_diff(self, model, preprocessor):
+        import pandas as pd
+        grid = pd.DataFrame(list(product(*self.categories)), columns=self.feature_cols)
+        expected = predict_targets(model, preprocessor.transform(grid))
+        return float(np.abs(self.predict(grid) - expected).max())
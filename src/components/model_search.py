@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import time
+import hashlib
+from itertools import product
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import KFold
+from sklearn.multioutput import MultiOutputRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from src.exception import CustomException
+from src.logger import logger
+from src.utils import predict_targets
+
+
+def _random_forest(params):
+    return MultiOutputRegressor(RandomForestRegressor(random_state=42, n_jobs=1, **params))
+
+
+def _random_forest_native(params):
+    # one forest fitted on the 2-D target instead of one forest per subject
+    return RandomForestRegressor(random_state=42, n_jobs=1, **params)
+
+
+def _extra_trees(params):
+    return MultiOutputRegressor(ExtraTreesRegressor(random_state=42, n_jobs=1, **params))
+
+
+def _ridge(params):
+    return Ridge(**params)
+
+
+def _catboost(params):
+    from catboost import CatBoostRegressor
+    return MultiOutputRegressor(CatBoostRegressor(random_seed=42, thread_count=1, verbose=0, **params))
+
+
+def _catboost_native(params):
+    from catboost import CatBoostRegressor
+    return CatBoostRegressor(loss_function="MultiRMSE", random_seed=42, thread_count=1, verbose=0, **params)
+
+
+def _xgboost(params):
+    from xgboost import XGBRegressor
+    return MultiOutputRegressor(XGBRegressor(random_state=42, n_jobs=1, **params))
+
+
+# family -> (factory, optional import that must succeed, parameter grid)
+FAMILIES = {
+    "random_forest": (_random_forest, None, {
+        "n_estimators": [100, 200], "max_depth": [None, 10], "min_samples_leaf": [1, 5],
+    }),
+    "random_forest_native": (_random_forest_native, None, {
+        "n_estimators": [200, 400], "max_depth": [None, 10], "min_samples_leaf": [1, 5],
+    }),
+    "extra_trees": (_extra_trees, None, {
+        "n_estimators": [200], "max_depth": [None, 10], "min_samples_leaf": [1, 5],
+    }),
+    "ridge": (_ridge, None, {
+        "alpha": [0.1, 1.0, 10.0],
+    }),
+    "catboost": (_catboost, "catboost", {
+        "iterations": [300], "depth": [4, 6], "learning_rate": [0.05, 0.1],
+    }),
+    "catboost_native": (_catboost_native, "catboost", {
+        "iterations": [500], "depth": [4, 6], "learning_rate": [0.05, 0.1],
+    }),
+    "xgboost": (_xgboost, "xgboost", {
+        "n_estimators": [200], "max_depth": [3, 6], "learning_rate": [0.05, 0.1],
+    }),
+}
+
+
+def available_families():
+    names = []
+    for name, (_, module, _) in FAMILIES.items():
+        if module is not None:
+            try:
+                __import__(module)
+            except ImportError:
+                continue
+        names.append(name)
+    return names
+
+
+def build_model(family, params, cat_features=None):
+    # CatBoost takes ordinal-encoded columns as native categoricals
+    if cat_features and FAMILIES[family][1] == "catboost":
+        params = dict(params, cat_features=list(cat_features))
+    return FAMILIES[family][0](params)
+
+
+def data_hash(X, y):
+    h = hashlib.sha256()
+    if hasattr(X, "tocsr"):
+        X = X.tocsr()
+        h.update(np.ascontiguousarray(X.indptr).tobytes() + np.ascontiguousarray(X.indices).tobytes())
+        X = X.data
+    for arr in (X, y):
+        arr = np.ascontiguousarray(arr)
+        h.update(str((arr.shape, arr.dtype.str)).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def _evaluate(task):
+    """Fit one (candidate, fold, budget) cell; runs in a pool worker."""
+    family, params, cat_features, X_train, y_train, X_val, y_val = task
+    model = build_model(family, params, cat_features)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = predict_targets(model, X_val)
+    batch_time = time.perf_counter() - start
+
+    single = X_val[:1]
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        model.predict(single)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "mae": float(mean_absolute_error(y_val, y_pred)),
+        "r2": float(r2_score(y_val, y_pred, multioutput="uniform_average")),
+        "fit_seconds": fit_time,
+        "predict_ms_per_row": batch_time * 1000 / X_val.shape[0],
+        "predict_ms_single": float(np.median(timings)) * 1000,
+    }
+
+
+class ModelSearch:
+    """Successive-halving search over model families and parameter grids.
+
+    Every rung evaluates the surviving candidates with K-fold CV on a growing
+    sample of the training rows, in a process pool, and keeps the best
+    ``1/eta`` by MAE. Fold results are cached as JSON under ``cache_dir``,
+    keyed by the data hash, candidate, fold and sample size, so a rerun only
+    fits what changed. The winner is the most accurate final-rung candidate
+    whose single-row predict latency fits ``latency_budget_ms``.
+    """
+
+    def __init__(self, families=None, n_folds=3, eta=3, min_rows=200, latency_budget_ms=50.0,
+                 workers=None, cache_dir=os.path.join("artifacts", "search_cache"),
+                 report_path=os.path.join("artifacts", "model_search.json"), cat_features=None):
+        self.families = families or available_families()
+        self.n_folds = n_folds
+        self.eta = eta
+        self.min_rows = min_rows
+        self.latency_budget_ms = latency_budget_ms
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self.report_path = report_path
+        self.cat_features = cat_features
+
+    def candidates(self):
+        out = []
+        for family in self.families:
+            grid = FAMILIES[family][2]
+            keys = sorted(grid)
+            for values in product(*(grid[k] for k in keys)):
+                out.append((family, dict(zip(keys, values))))
+        return out
+
+    def _cache_file(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _cell_key(self, digest, family, params, fold, n_rows):
+        raw = json.dumps([digest, family, params, fold, n_rows, self.n_folds], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _rung_sizes(self, n_rows, n_candidates):
+        rungs = max(1, int(np.ceil(np.log(max(n_candidates, 1)) / np.log(self.eta))))
+        sizes = [n_rows // (self.eta ** (rungs - 1 - i)) for i in range(rungs)]
+        sizes = sorted({min(n_rows, max(self.min_rows, s)) for s in sizes})
+        return sizes
+
+    def _run_rung(self, pool, X, y, digest, candidates, n_rows):
+        rng = np.random.RandomState(42)
+        total = X.shape[0]
+        sample = np.sort(rng.choice(total, n_rows, replace=False)) if n_rows < total else np.arange(total)
+        Xs, ys = X[sample], y[sample]
+        folds = list(KFold(self.n_folds, shuffle=True, random_state=42).split(Xs))
+
+        cells, pending = {}, []
+        for ci, (family, params) in enumerate(candidates):
+            for fi, (tr, va) in enumerate(folds):
+                key = self._cell_key(digest, family, params, fi, n_rows)
+                path = self._cache_file(key)
+                if os.path.exists(path):
+                    with open(path, "r", encoding="utf-8") as f:
+                        cells[(ci, fi)] = json.load(f)
+                else:
+                    pending.append(((ci, fi), path, (family, params, self.cat_features, Xs[tr], ys[tr], Xs[va], ys[va])))
+
+        logger.info(f"Search rung n_rows={n_rows}: {len(candidates)} candidates, "
+                    f"{len(pending)} fits, {len(cells)} cached")
+        results = pool.map(_evaluate, [task for _, _, task in pending]) if pending else []
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for (cell, path, _), result in zip(pending, results):
+            cells[cell] = result
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp, path)
+
+        scored = []
+        for ci, (family, params) in enumerate(candidates):
+            fold_results = [cells[(ci, fi)] for fi in range(len(folds))]
+            summary = {k: float(np.mean([r[k] for r in fold_results])) for k in fold_results[0]}
+            scored.append({"family": family, "params": params, "n_rows": n_rows, **summary})
+        return scored
+
+    def run(self, X, y):
+        try:
+            digest = data_hash(X, y)
+            candidates = self.candidates()
+            sizes = self._rung_sizes(X.shape[0], len(candidates))
+            history = []
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                for i, n_rows in enumerate(sizes):
+                    scored = self._run_rung(pool, X, y, digest, candidates, n_rows)
+                    history.extend(scored)
+                    scored.sort(key=lambda r: r["mae"])
+                    if i < len(sizes) - 1:
+                        keep = max(1, int(np.ceil(len(scored) / self.eta)))
+                        candidates = [(r["family"], r["params"]) for r in scored[:keep]]
+
+            within = [r for r in scored if r["predict_ms_single"] <= self.latency_budget_ms]
+            best = within[0] if within else min(scored, key=lambda r: r["predict_ms_single"])
+            if not within:
+                logger.info(f"No candidate meets the {self.latency_budget_ms} ms budget; using the fastest")
+
+            report = {"data_hash": digest, "latency_budget_ms": self.latency_budget_ms,
+                      "rungs": sizes, "best": best, "results": history}
+            if self.report_path:
+                os.makedirs(os.path.dirname(self.report_path) or ".", exist_ok=True)
+                with open(self.report_path, "w", encoding="utf-8") as f:
+                    json.dump(report, f, indent=2)
+            logger.info(f"Model search picked {best['family']} {best['params']} "
+                        f"(MAE {best['mae']:.4f}, {best['predict_ms_single']:.2f} ms/predict)")
+            return best, report
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -1,38 +1,149 @@
+import os
 import sys
+import json
+import time
+import tempfile
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.multioutput import MultiOutputRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 from src.exception import CustomException
-from src.logger import logger
-from src.utils import save_object
+from src.logger import logger, log_stage
+from src.utils import save_object, load_object, file_sha256, predict_targets, ARTIFACT_FORMAT
+from src.components.schema import FEATURE_COLS, TARGET_COLS
+from src.components.lookup_table import PredictionLookupTable
+from src.components.model_search import ModelSearch, build_model
+
+def make_default_model(multioutput="wrapper", n_jobs=-1):
+    # "wrapper": one 200-tree forest per subject; "native": one forest on the 2-D target
+    if multioutput == "wrapper":
+        return MultiOutputRegressor(RandomForestRegressor(n_estimators=200, random_state=42, n_jobs=n_jobs))
+    if multioutput == "native":
+        return RandomForestRegressor(n_estimators=200, random_state=42, n_jobs=n_jobs)
+    raise ValueError(f"Unknown multioutput mode: {multioutput}")
+
+def split_xy(data):
+    """``(X, y)`` from either an ``(X, y)`` pair or a feature+target array with the targets last."""
+    if isinstance(data, tuple):
+        return data
+    return data[:, :-len(TARGET_COLS)], data[:, -len(TARGET_COLS):]
 
 class ModelTrainer:
-    def __init__(self):
-        self.model_path = "artifacts/model.pkl"
+    def __init__(self, artifact_format=None, multioutput="wrapper", artifacts_dir="artifacts", encoding="onehot"):
+        self.artifacts_dir = artifacts_dir
+        self.model_path = os.path.join(artifacts_dir, "model.pkl")
+        # "dill", "joblib" or "flat", see src.utils.save_object
+        self.artifact_format = artifact_format or ARTIFACT_FORMAT
+        self.multioutput = multioutput
+        # ordinal codes are handed to CatBoost as categorical features
+        self.cat_features = list(range(len(FEATURE_COLS))) if encoding == "ordinal" else None
+        self.lookup_table_path = os.path.join(artifacts_dir, "lookup_table.npz")
+        self.multioutput_report_path = os.path.join(artifacts_dir, "multioutput_report.json")
 
-    def initiate_model_trainer(self, train_array, test_array):
+    def export_lookup_table(self, model, preprocessor_path, tolerance=1e-9):
+        preprocessor = load_object(preprocessor_path)
+        table = PredictionLookupTable.build(
+            model, preprocessor, FEATURE_COLS, TARGET_COLS, model_sha256=file_sha256(self.model_path)
+        )
+        max_diff = table.max_abs_diff(model, preprocessor)
+        if max_diff > tolerance:
+            raise CustomException(f"Lookup table disagrees with model.predict (max abs diff {max_diff})")
+        table.save(self.lookup_table_path)
+        logger.info(f"Lookup table with {table.table.shape[:-1]} entries saved to {self.lookup_table_path}")
+        return {"lookup_table_path": self.lookup_table_path, "lookup_max_abs_diff": max_diff}
+
+    def initiate_model_trainer(self, train_array, test_array, preprocessor_path=None, lookup_table=False,
+                               search=False, search_config=None):
         try:
             logger.info("Starting model training")
 
-            X_train = train_array[:, :-7]
-            y_train = train_array[:, -7:]
-
-            X_test = test_array[:, :-7]
-            y_test = test_array[:, -7:]
+            # either np.c_-joined arrays or (X, y) pairs from the columnar path
+            X_train, y_train = split_xy(train_array)
+            X_test, y_test = split_xy(test_array)
 
-            base_model = RandomForestRegressor(n_estimators=200, random_state=42, n_jobs=-1)
-            model = MultiOutputRegressor(base_model)
-            model.fit(X_train, y_train)
+            selected = None
+            if search:
+                config = dict({"report_path": os.path.join(self.artifacts_dir, "model_search.json"),
+                               "cat_features": self.cat_features}, **(search_config or {}))
+                selected, _ = ModelSearch(**config).run(X_train, y_train)
+                model = build_model(selected["family"], selected["params"], self.cat_features)
+            else:
+                model = make_default_model(self.multioutput)
+            with log_stage("model_fit", model=type(model).__name__, rows=X_train.shape[0]):
+                model.fit(X_train, y_train)
 
-            y_pred = model.predict(X_test)
+            y_pred = predict_targets(model, X_test)
             mae = mean_absolute_error(y_test, y_pred)
             r2 = r2_score(y_test, y_pred, multioutput="uniform_average")
 
-            logger.info(f"Training complete. MAE: {mae:.4f}, R2(avg): {r2:.4f}")
+            logger.info(f"Training complete. MAE: {mae:.4f}, R2(avg): {r2:.4f}", extra={"mae": float(mae), "r2": float(r2)})
+
+            save_object(self.model_path, model, fmt=self.artifact_format)
+
+            metrics = {"model_path": self.model_path, "mae": float(mae), "r2": float(r2)}
+            if selected is not None:
+                metrics["selected"] = {"family": selected["family"], "params": selected["params"]}
+            if lookup_table:
+                metrics.update(self.export_lookup_table(model, preprocessor_path))
+            return metrics
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def compare_multioutput_strategies(self, train_array, test_array):
+        """Fit the per-subject wrapper and natively multi-output models side by side.
+
+        Records fit time, dill artifact size, predict latency and accuracy for
+        each and writes them to ``multioutput_report_path``.
+        """
+        try:
+            X_train, y_train = split_xy(train_array)
+            X_test, y_test = split_xy(test_array)
+            candidates = {
+                "wrapper_random_forest": make_default_model("wrapper"),
+                "native_random_forest": make_default_model("native"),
+            }
+            try:
+                from catboost import CatBoostRegressor
+                candidates["native_catboost_multirmse"] = CatBoostRegressor(
+                    loss_function="MultiRMSE", iterations=500, depth=6, random_seed=42, verbose=0,
+                    cat_features=self.cat_features
+                )
+            except ImportError:
+                pass
+
+            report = {}
+            for name, model in candidates.items():
+                start = time.perf_counter()
+                model.fit(X_train, y_train)
+                fit_seconds = time.perf_counter() - start
+
+                start = time.perf_counter()
+                y_pred = predict_targets(model, X_test)
+                batch_seconds = time.perf_counter() - start
+                single = []
+                for _ in range(20):
+                    start = time.perf_counter()
+                    predict_targets(model, X_test[:1])
+                    single.append(time.perf_counter() - start)
+
+                with tempfile.TemporaryDirectory() as tmp:
+                    path = os.path.join(tmp, "model.pkl")
+                    save_object(path, model, fmt="dill")
+                    artifact_mb = os.path.getsize(path) / 2**20
 
-            save_object(self.model_path, model)
+                report[name] = {
+                    "fit_seconds": fit_seconds,
+                    "artifact_mb": artifact_mb,
+                    "predict_ms_single": float(np.median(single)) * 1000,
+                    "predict_ms_per_row": batch_seconds * 1000 / X_test.shape[0],
+                    "mae": float(mean_absolute_error(y_test, y_pred)),
+                    "r2": float(r2_score(y_test, y_pred, multioutput="uniform_average")),
+                }
+                logger.info(f"{name}: {report[name]}")
 
-            return {"model_path": self.model_path, "mae": float(mae), "r2": float(r2)}
+            os.makedirs(os.path.dirname(self.multioutput_report_path), exist_ok=True)
+            with open(self.multioutput_report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            return report
         except Exception as e:
             raise CustomException(e, sys)
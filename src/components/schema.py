@@ -0,0 +1,27 @@
+FEATURE_COLS = [
+    "gender",
+    "race_ethnicity",
+    "parental_level_of_education",
+    "lunch",
+    "test_preparation_course"
+]
+TARGET_COLS = [
+    "math_score",
+    "reading_score",
+    "writing_score",
+    "science_score",
+    "social_score",
+    "english_score",
+    "computer_score"
+]
+# values seen in StudentsPerformance.csv; the register form offers these as the optional profile
+FEATURE_CATEGORIES = {
+    "gender": ["female", "male"],
+    "race_ethnicity": ["group A", "group B", "group C", "group D", "group E"],
+    "parental_level_of_education": [
+        "some high school", "high school", "some college",
+        "associate's degree", "bachelor's degree", "master's degree"
+    ],
+    "lunch": ["standard", "free/reduced"],
+    "test_preparation_course": ["none", "completed"]
+}
@@ -0,0 +1,73 @@
+import sys
+import pandas as pd
+from src.exception import CustomException
+from src.logger import logger
+from src.components.schema import FEATURE_COLS, TARGET_COLS, FEATURE_CATEGORIES
+from src.components.columnar import ColumnarWriter
+
+# users.json records use the subject titles, the dataset the *_score columns
+SUBJECT_COLUMNS = {col: col[:-len("_score")].capitalize() for col in TARGET_COLS}
+
+
+class SubmissionIngestion:
+    """Turn score submissions from the web app's user store into training rows.
+
+    Each record of a student with a complete profile (the five
+    ``FEATURE_COLS``) becomes one row: profile as features, subject scores as
+    targets. The watermark is ``{user key: records already exported}``;
+    records are only ever appended, so everything past it is new. Rows are
+    streamed into a columnar dataset in chunks of ``chunk_rows``.
+    """
+
+    def __init__(self, store, chunk_rows=50_000):
+        self.store = store
+        self.chunk_rows = chunk_rows
+
+    @staticmethod
+    def profile_features(user):
+        profile = user.get("profile") or {}
+        if all(profile.get(col) in FEATURE_CATEGORIES[col] for col in FEATURE_COLS):
+            return [profile[col] for col in FEATURE_COLS]
+        return None
+
+    def initiate_submission_ingestion(self, path, watermark=None):
+        """Write rows past ``watermark`` to the columnar dataset at ``path``.
+
+        Returns ``(rows, new_watermark)``; nothing is written when there are no new rows.
+        """
+        try:
+            from src.web.storage import user_key
+            watermark = dict(watermark or {})
+            new_watermark = dict(watermark)
+            writer = None
+            rows, chunk = 0, []
+
+            def flush():
+                nonlocal writer
+                if writer is None:
+                    writer = ColumnarWriter(path)
+                writer.append(pd.DataFrame(chunk, columns=FEATURE_COLS + TARGET_COLS))
+                chunk.clear()
+
+            for user in self.store.iter_users():
+                features = self.profile_features(user)
+                if features is None:
+                    continue
+                key = user_key(user["username"])
+                records = user.get("records", [])
+                for record in records[watermark.get(key, 0):]:
+                    scores = record.get("scores", {})
+                    chunk.append(features + [int(scores.get(SUBJECT_COLUMNS[col], 0)) for col in TARGET_COLS])
+                    if len(chunk) >= self.chunk_rows:
+                        rows += len(chunk)
+                        flush()
+                new_watermark[key] = len(records)
+            if chunk:
+                rows += len(chunk)
+                flush()
+            if writer is not None:
+                writer.close()
+            logger.info(f"Exported {rows} new submissions to {path}", extra={"rows": rows})
+            return rows, new_watermark
+        except Exception as e:
+            raise CustomException(e, sys)
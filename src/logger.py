@@ -1,24 +1,179 @@
-import logging
 import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process rotation only
+    fcntl = None
+
+# Nothing touches the filesystem at import. The first record emitted starts
+# a QueueListener thread that owns the real handlers: a size-rotated JSON
+# lines file (LOG_DIR/app.log, shared by every process) and a plain-text
+# console stream. Callers only pay for a queue put.
+LOG_DIR = os.environ.get("LOG_DIR", "logs")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", 10 * 2**20))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", 5))
+
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s - %(message)s"
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra={...}`` fields are kept as keys."""
+
+    def format(self, record):
+        payload = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SharedRotatingFileHandler(RotatingFileHandler):
+    """``RotatingFileHandler`` that several processes can write to at once.
+
+    Gunicorn workers and pool processes all log to the same file. Each write
+    holds an flock on ``<file>.lock``, reopens the file if another process
+    rotated it away, and checks the size of the file on disk, so the file is
+    rotated exactly once and no process keeps writing to a renamed backup.
+    """
+
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, **kwargs)
+        self._lock_fd = None
+
+    def _reopen_if_rotated(self):
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self.stream.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            self.stream.close()
+            self.stream = None  # reopened by emit (delay=True semantics)
+
+    def emit(self, record):
+        if fcntl is None:
+            return super().emit(record)
+        try:
+            if self._lock_fd is None:
+                self._lock_fd = os.open(self.baseFilename + ".lock", os.O_WRONLY | os.O_CREAT, 0o644)
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        except OSError:
+            self.handleError(record)
+            return
+        try:
+            self._reopen_if_rotated()
+            super().emit(record)
+        except Exception:
+            self.handleError(record)
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def close(self):
+        super().close()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+class _AsyncDispatchHandler(logging.Handler):
+    """Placeholder handler that sets up the queue pipeline on first use.
+
+    The pipeline is rebuilt after a fork (the listener thread does not
+    survive it), so preforked workers keep logging.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pid = None
+        self._queue_handler = None
+        self._listener = None
+        self._setup_lock = threading.Lock()
+
+    def _start(self):
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers = [console_handler]
+        try:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            file_handler = SharedRotatingFileHandler(
+                os.path.join(LOG_DIR, "app.log"), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                encoding="utf-8",
+            )
+        except OSError as e:
+            # an unwritable LOG_DIR must not break the caller: keep logging to the console
+            sys.stderr.write(f"Cannot write logs to {LOG_DIR} ({e}); logging to the console only\n")
+        else:
+            file_handler.setFormatter(JsonFormatter())
+            handlers.insert(0, file_handler)
+
+        log_queue = queue.SimpleQueue()
+        self._queue_handler = QueueHandler(log_queue)
+        self._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        self._pid = os.getpid()
+
+    def emit(self, record):
+        try:
+            if self._pid != os.getpid():
+                with self._setup_lock:
+                    if self._pid != os.getpid():
+                        self._start()
+            self._queue_handler.handle(record)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        """Block until every queued record has been written."""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener.start()
+
+    def close(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+            self._pid = None
+        super().close()
 
-LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 
-# Create logger
 logger = logging.getLogger("student_progress")
-logger.setLevel(logging.INFO)
-
-# File handler
-file_handler = logging.FileHandler(os.path.join(LOG_DIR, "app.log"))
-file_handler.setLevel(logging.INFO)
-file_formatter = logging.Formatter("[%(asctime)s] %(levelname)s - %(message)s")
-file_handler.setFormatter(file_formatter)
-
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
-console_handler.setFormatter(file_formatter)
-
-# Add handlers
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+logger.setLevel(LOG_LEVEL)
+logger.propagate = False
+_handler = _AsyncDispatchHandler()
+logger.addHandler(_handler)
+atexit.register(_handler.close)
+
+
+@contextmanager
+def log_stage(name, **fields):
+    """Log how long a block took as a structured record (``stage``, ``seconds`` and ``fields``)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        logger.info(f"{name} finished in {seconds:.3f}s", extra=dict(fields, stage=name, seconds=round(seconds, 6)))
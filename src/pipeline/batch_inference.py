@@ -0,0 +1,109 @@
+import os
+import sys
+import tempfile
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+import joblib
+from src.components.schema import FEATURE_COLS, TARGET_COLS
+from src.exception import CustomException
+from src.logger import logger
+from src.utils import load_object, predict_targets
+
+# Set in the parent before the pool forks (inherited copy-on-write) or loaded
+# once per worker by _init_worker on platforms without fork.
+_MODEL = None
+_PREPROCESSOR = None
+
+
+def _single_threaded(model):
+    # every worker is already one process per core; nested forest threads only oversubscribe
+    for est in [model] + list(getattr(model, "estimators_", [])):
+        if hasattr(est, "n_jobs"):
+            est.n_jobs = 1
+    return model
+
+
+def _init_worker(model_path=None, preprocessor_path=None):
+    global _MODEL, _PREPROCESSOR
+    if model_path is not None:
+        _MODEL = joblib.load(model_path, mmap_mode="r")
+        _PREPROCESSOR = joblib.load(preprocessor_path)
+    _single_threaded(_MODEL)
+
+
+def _predict_chunk(chunk):
+    return predict_targets(_MODEL, _PREPROCESSOR.transform(chunk))
+
+
+class BatchInferenceService:
+    """Load the model and preprocessor once and fan row chunks out to a process pool.
+
+    On POSIX the pool is forked after the model is loaded, so workers share the
+    parent's pages instead of unpickling their own copy; elsewhere the model is
+    dumped once with joblib and workers memory-map its arrays. Only the feature
+    chunks and the prediction arrays cross process boundaries, and results come
+    back in input order.
+    """
+
+    def __init__(self, model_path=None, preprocessor_path=None, workers=None, chunksize=20000):
+        self.model_path = model_path or os.path.join("artifacts", "model.pkl")
+        self.preprocessor_path = preprocessor_path or os.path.join("artifacts", "preprocessor.pkl")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.model = load_object(self.model_path)
+        self.preprocessor = load_object(self.preprocessor_path)
+        self._pool = None
+        self._spill_dir = None
+
+    def _get_pool(self):
+        if self._pool is not None:
+            return self._pool
+        global _MODEL, _PREPROCESSOR
+        if "fork" in mp.get_all_start_methods():
+            _MODEL, _PREPROCESSOR = self.model, self.preprocessor
+            self._pool = mp.get_context("fork").Pool(self.workers, initializer=_init_worker)
+        else:
+            self._spill_dir = tempfile.mkdtemp(prefix="batch_inference_")
+            model_path = os.path.join(self._spill_dir, "model.joblib")
+            preprocessor_path = os.path.join(self._spill_dir, "preprocessor.joblib")
+            joblib.dump(self.model, model_path)
+            joblib.dump(self.preprocessor, preprocessor_path)
+            self._pool = mp.get_context("spawn").Pool(
+                self.workers, initializer=_init_worker, initargs=(model_path, preprocessor_path)
+            )
+        logger.info(f"Started batch inference pool with {self.workers} workers")
+        return self._pool
+
+    def predict_single(self, df: pd.DataFrame):
+        return predict_targets(self.model, self.preprocessor.transform(df[FEATURE_COLS]))
+
+    def predict(self, df: pd.DataFrame):
+        try:
+            features = df[FEATURE_COLS]
+            if self.workers <= 1 or len(features) <= self.chunksize:
+                return self.predict_single(features)
+            chunks = (features.iloc[i:i + self.chunksize] for i in range(0, len(features), self.chunksize))
+            return np.vstack(list(self._get_pool().imap(_predict_chunk, chunks)))
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def predict_frame(self, df: pd.DataFrame):
+        return pd.DataFrame(self.predict(df), columns=TARGET_COLS, index=df.index)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._spill_dir is not None:
+            for name in os.listdir(self._spill_dir):
+                os.remove(os.path.join(self._spill_dir, name))
+            os.rmdir(self._spill_dir)
+            self._spill_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
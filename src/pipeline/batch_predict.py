@@ -0,0 +1,62 @@
+import os
+import sys
+import json
+import argparse
+from src.pipeline.predict_pipeline import PredictPipeline, StreamingClassStatistics
+from src.logger import logger
+
+
+def score_csv(input_path, output_path, chunksize=50000, stats_path=None):
+    """Score ``input_path`` chunk by chunk and write results to ``output_path``.
+
+    ``.jsonl``/``.ndjson`` outputs get one JSON record per student, anything else
+    is written as a flat CSV. Returns the number of rows and the class statistics.
+    """
+    pipeline = PredictPipeline()
+    statistics = StreamingClassStatistics(pipeline.subjects)
+    as_json = os.path.splitext(output_path)[1].lower() in (".jsonl", ".ndjson")
+    rows = 0
+
+    out_dir = os.path.dirname(output_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8", newline="") as out:
+        output = "records" if as_json else "frame"
+        for batch in pipeline.predict_stream(input_path, chunksize, output=output, statistics=statistics):
+            if as_json:
+                for rec in batch:
+                    out.write(json.dumps(rec, ensure_ascii=False, default=_to_builtin) + "\n")
+                rows += len(batch)
+            else:
+                batch.to_csv(out, header=(rows == 0), index=False)
+                rows += len(batch)
+            logger.info(f"Scored {rows} rows from {input_path}")
+
+    stats = statistics.result()
+    if stats_path:
+        with open(stats_path, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2, default=_to_builtin)
+    return rows, stats
+
+
+def _to_builtin(value):
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a class CSV in bounded memory")
+    parser.add_argument("input", help="CSV with the seven *_score columns")
+    parser.add_argument("output", help="output .csv or .jsonl file")
+    parser.add_argument("--chunksize", type=int, default=50000, help="rows per chunk")
+    parser.add_argument("--stats", help="optional path for the class statistics JSON")
+    args = parser.parse_args(argv)
+
+    rows, _ = score_csv(args.input, args.output, args.chunksize, args.stats)
+    print(f"Scored {rows} rows -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
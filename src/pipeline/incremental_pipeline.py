@@ -0,0 +1,109 @@
+import os
+import json
+import shutil
+import argparse
+from datetime import datetime, timezone
+from src.components.submission_ingestion import SubmissionIngestion
+from src.components.incremental_trainer import IncrementalTrainer
+from src.exception import CustomException
+from src.logger import logger
+from src.utils import file_sha256
+
+
+class IncrementalState:
+    """``<artifacts>/incremental/state.json``: the submission watermark and the model it was applied to.
+
+    The watermark is written as ``pending`` before the new model is swapped
+    in and only committed once ``model.pkl`` is seen with that hash, so a
+    crash in between neither loses nor double-counts a round. If model.pkl
+    changes for any other reason (a full run of the training pipeline), the
+    watermark starts over and every live submission is replayed into it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self, model_sha):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            state = {"watermark": {}, "model_sha256": None, "rounds": 0}
+        pending = state.pop("pending", None)
+        if pending and pending["model_sha256"] == model_sha:
+            state.update(watermark=pending["watermark"], model_sha256=model_sha, rounds=state["rounds"] + 1)
+        if state["model_sha256"] not in (None, model_sha):
+            logger.info("model.pkl was replaced outside incremental training; replaying all submissions")
+            state.update(watermark={}, model_sha256=None)
+        return state
+
+    def save(self, state):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+def run_incremental_training(data_dir="data", artifacts_dir="artifacts", min_rows=50, add_trees=50, max_trees=None,
+                             store=None):
+    """Export submissions since the last watermark and warm-start the published model on them.
+
+    Rounds with fewer than ``min_rows`` new rows are skipped without moving
+    the watermark, so small batches accumulate. Only one run at a time
+    proceeds per artifacts directory; a concurrent one returns ``busy``.
+    """
+    from src.web.storage import open_store, FileLock
+    if not os.path.exists(os.path.join(artifacts_dir, "model.pkl")):
+        raise CustomException(f"No published model in {artifacts_dir}; run src.pipeline.train_pipeline first")
+    work_dir = os.path.join(artifacts_dir, "incremental")
+    os.makedirs(work_dir, exist_ok=True)
+    lock = FileLock(os.path.join(work_dir, "LOCK"))
+    if not lock.acquire(blocking=False):
+        logger.info("Incremental training already running; skipping")
+        return {"status": "busy"}
+    try:
+        trainer = IncrementalTrainer(artifacts_dir, add_trees=add_trees, max_trees=max_trees)
+        state_file = IncrementalState(os.path.join(work_dir, "state.json"))
+        state = state_file.load(file_sha256(trainer.model_path))
+        state_file.save(state)
+
+        store = store or open_store(data_dir)
+        dataset = os.path.join(work_dir, f"round-{state['rounds'] + 1:06d}.col")
+        rows, watermark = SubmissionIngestion(store).initiate_submission_ingestion(dataset, state["watermark"])
+        if rows < min_rows:
+            shutil.rmtree(dataset, ignore_errors=True)
+            logger.info(f"{rows} new submissions, fewer than {min_rows}; waiting for more")
+            return {"status": "skipped", "rows": rows}
+
+        def mark_pending(version):
+            state_file.save(dict(state, pending={
+                "watermark": watermark,
+                "model_sha256": version["model_sha256"],
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }))
+
+        version = trainer.initiate_incremental_training(dataset, before_publish=mark_pending)
+        state_file.save(dict(state, watermark=watermark, model_sha256=version["model_sha256"],
+                             rounds=state["rounds"] + 1))
+        return dict(version, status="published", dataset=dataset)
+    finally:
+        lock.release()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm-start the published model on new app submissions")
+    parser.add_argument("--data-dir", default=os.environ.get("APP_DATA_DIR") or "data", help="the web app's data directory")
+    parser.add_argument("--artifacts", default="artifacts")
+    parser.add_argument("--min-rows", type=int, default=50, help="skip the round below this many new rows")
+    parser.add_argument("--add-trees", type=int, default=50, help="trees added to each forest per round")
+    parser.add_argument("--max-trees", type=int, help="drop the oldest trees beyond this many per forest")
+    args = parser.parse_args(argv)
+    result = run_incremental_training(args.data_dir, args.artifacts, args.min_rows, args.add_trees, args.max_trees)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
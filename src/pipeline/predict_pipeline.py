@@ -1,31 +1,86 @@
+from collections import Counter
 import pandas as pd
 import numpy as np
 
 class PredictPipeline:
+    BADGE_BINS = [90, 75, 60]
+    BADGE_LABELS = ["🏆 Star Performer", "🥈 Good Performer", "🥉 Average Performer"]
+    BADGE_DEFAULT = "⚠️ Needs Improvement"
+
     def __init__(self):
         self.subjects = ['math_score','reading_score','writing_score',
                          'english_score','computer_score','science_score','social_score']
+        self.subject_titles = np.array([sub.replace('_score','').title() for sub in self.subjects], dtype=object)
+
+    def predict(self, df: pd.DataFrame, output="records"):
+        """Score every row of ``df`` at once.
+
+        ``output`` selects the result layout: ``"records"`` (list of dicts, the
+        historical format), ``"frame"`` (flat DataFrame) or ``"columns"`` (dict
+        of column arrays, one entry per field).
+        """
+        columns = self._predict_columns(df)
+        if output == "columns":
+            return columns
+        if output == "frame":
+            frame = pd.DataFrame({"roll": columns["roll"], "name": columns["name"]})
+            for i, sub in enumerate(self.subjects):
+                frame[sub] = columns["scores"][:, i]
+            for key in ("strongest", "weakest", "overall", "badge", "recommendation"):
+                frame[key] = columns[key]
+            return frame
+        if output != "records":
+            raise ValueError(f"Unknown output format: {output}")
 
-    def predict(self, df: pd.DataFrame):
-        results = []
-        for idx, row in df.iterrows():
-            scores = {sub: int(row[sub]) for sub in self.subjects}
-            strongest = max(scores, key=scores.get)
-            weakest = min(scores, key=scores.get)
-            overall = round(np.mean(list(scores.values())),2)
-            badge = self.assign_badge(overall)
-            recommendation = f"Focus on improving {weakest.replace('_score','').title()}"
-            results.append({
-                "roll": row.get('roll_number', idx+1),
-                "name": row.get('name', f"Student {idx+1}"),
-                "scores": scores,
-                "strongest": strongest.replace('_score','').title(),
-                "weakest": weakest.replace('_score','').title(),
+        subjects = self.subjects
+        return [
+            {
+                "roll": roll,
+                "name": name,
+                "scores": dict(zip(subjects, row)),
+                "strongest": strongest,
+                "weakest": weakest,
                 "overall": overall,
                 "badge": badge,
                 "recommendation": recommendation
-            })
-        return results
+            }
+            for roll, name, row, strongest, weakest, overall, badge, recommendation in zip(
+                columns["roll"], columns["name"], columns["scores"].tolist(),
+                columns["strongest"], columns["weakest"], columns["overall"],
+                columns["badge"], columns["recommendation"]
+            )
+        ]
+
+    def _score_matrix(self, df: pd.DataFrame):
+        # int64 cannot hold NaN: a blank score would silently become INT64_MIN
+        values = df[self.subjects].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+        bad = ~np.isfinite(values)
+        if bad.any():
+            row, col = np.argwhere(bad)[0]
+            raise ValueError(f"{self.subjects[col]} is missing or not a number (row {df.index[row]!r})")
+        return values.astype(np.int64)
+
+    def _predict_columns(self, df: pd.DataFrame):
+        scores = self._score_matrix(df)
+        overall = np.round(scores.mean(axis=1), 2)
+        strongest = self.subject_titles[scores.argmax(axis=1)]
+        weakest = self.subject_titles[scores.argmin(axis=1)]
+        fallback = df.index + 1
+        return {
+            "roll": df['roll_number'].to_numpy(dtype=object) if 'roll_number' in df.columns else fallback.to_numpy(dtype=object),
+            "name": df['name'].to_numpy(dtype=object) if 'name' in df.columns
+                    else np.array([f"Student {i}" for i in fallback], dtype=object),
+            "scores": scores,
+            "strongest": strongest,
+            "weakest": weakest,
+            "overall": overall,
+            "badge": self.assign_badges(overall),
+            "recommendation": "Focus on improving " + weakest,
+        }
+
+    def assign_badges(self, overall):
+        overall = np.asarray(overall)
+        return np.select([overall >= b for b in self.BADGE_BINS], self.BADGE_LABELS, self.BADGE_DEFAULT).astype(object)
 
     def assign_badge(self, overall):
         if overall >= 90:
@@ -37,6 +92,17 @@ class PredictPipeline:
         else:
             return "⚠️ Needs Improvement"
 
+    def predict_stream(self, source, chunksize=50000, output="records", statistics=None):
+        """Yield ``predict`` results chunk by chunk from a CSV path or buffer.
+
+        Memory stays bounded by ``chunksize``; pass a ``StreamingClassStatistics``
+        as ``statistics`` to accumulate class statistics in the same pass.
+        """
+        for chunk in pd.read_csv(source, chunksize=chunksize):
+            if statistics is not None:
+                statistics.update(chunk)
+            yield self.predict(chunk, output=output)
+
     def class_statistics(self, df: pd.DataFrame):
         stats = {}
         for sub in self.subjects:
@@ -47,3 +113,69 @@ class PredictPipeline:
                 "min": df[sub].min()
             }
         return stats
+
+
+class StreamingClassStatistics:
+    """Incremental equivalent of ``PredictPipeline.class_statistics``.
+
+    Mean, min and max are exact running values. The median is exact too: the
+    0-100 integer scores go into a fixed 101-bin histogram, anything else
+    (fractional or out-of-range values) into a Counter, so memory does not grow
+    with the number of rows for regular score files.
+    """
+
+    def __init__(self, subjects=None):
+        self.subjects = subjects or PredictPipeline().subjects
+        self.count = {sub: 0 for sub in self.subjects}
+        self.total = {sub: 0 for sub in self.subjects}
+        self.min = {sub: None for sub in self.subjects}
+        self.max = {sub: None for sub in self.subjects}
+        self.histogram = {sub: np.zeros(101, dtype=np.int64) for sub in self.subjects}
+        self.other = {sub: Counter() for sub in self.subjects}
+
+    def update(self, df: pd.DataFrame):
+        for sub in self.subjects:
+            values = df[sub].dropna().to_numpy()
+            if values.size == 0:
+                continue
+            self.count[sub] += int(values.size)
+            self.total[sub] += values.sum().item()
+            lo, hi = values.min().item(), values.max().item()
+            self.min[sub] = lo if self.min[sub] is None else min(self.min[sub], lo)
+            self.max[sub] = hi if self.max[sub] is None else max(self.max[sub], hi)
+
+            in_range = (values >= 0) & (values <= 100) & (values == np.floor(values))
+            self.histogram[sub] += np.bincount(values[in_range].astype(np.int64), minlength=101)
+            if not in_range.all():
+                self.other[sub].update(values[~in_range].tolist())
+        return self
+
+    def _median(self, sub):
+        n = self.count[sub]
+        if n == 0:
+            return float("nan")
+        counts = [(float(v), int(c)) for v, c in enumerate(self.histogram[sub]) if c]
+        counts = sorted(counts + [(float(v), c) for v, c in self.other[sub].items()])
+        lo_rank, hi_rank = (n - 1) // 2, n // 2
+        lo = hi = None
+        seen = 0
+        for value, c in counts:
+            seen += c
+            if lo is None and seen > lo_rank:
+                lo = value
+            if seen > hi_rank:
+                hi = value
+                break
+        return (lo + hi) / 2
+
+    def result(self):
+        stats = {}
+        for sub in self.subjects:
+            n = self.count[sub]
+            stats[sub] = {
+                "average": round(self.total[sub] / n, 2) if n else float("nan"),
+                "median": round(self._median(sub), 2),
+                "max": self.max[sub],
+                "min": self.min[sub]
+            }
+        return stats
@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+import threading
+from itertools import product
+from src.components.schema import FEATURE_COLS, TARGET_COLS
+from src.exception import CustomException
+from src.logger import logger
+from src.utils import load_object, file_sha256, predict_targets
+
+
+class ScorePredictor:
+    """Predicted subject scores for one student profile, served from memory.
+
+    The model only sees the one-hot encoding of the five categorical
+    features, so there are only a few hundred distinct inputs. They are all
+    predicted in one batch on ``warm()`` (or lazily, batched per call) and
+    kept in a dict, so a request costs a dictionary lookup. When the training
+    run exported a lookup table for the current model.pkl, predictions come
+    from it and sklearn is never loaded.
+
+    With ``reload_interval`` set, ``predict_many`` checks (at most that often)
+    whether model.pkl or model_version.json changed on disk and swaps in the
+    newly published model; a failed load keeps serving the current one.
+    """
+
+    def __init__(self, model_path=None, preprocessor_path=None, lookup_table_path=None, reload_interval=None):
+        self.model_path = model_path or os.path.join("artifacts", "model.pkl")
+        self.preprocessor_path = preprocessor_path or os.path.join("artifacts", "preprocessor.pkl")
+        self.lookup_table_path = lookup_table_path or os.path.join(os.path.dirname(self.model_path), "lookup_table.npz")
+        self.model = None
+        self.preprocessor = None
+        self.lookup_table = None
+        self.categories = None
+        self.version_path = os.path.join(os.path.dirname(self.model_path), "model_version.json")
+        self.reload_interval = reload_interval
+        self._signature = None
+        self._checked = 0.0
+        self._warmed = False
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _current_signature(self):
+        sig = []
+        for path in (self.model_path, self.version_path):
+            try:
+                st = os.stat(path)
+                sig.append((st.st_mtime_ns, st.st_size, st.st_ino))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _load_lookup_table(self):
+        if not os.path.exists(self.lookup_table_path):
+            return None
+        # numpy only; sklearn is never imported when the table is current
+        from src.components.lookup_table import PredictionLookupTable
+        table = PredictionLookupTable.load(self.lookup_table_path)
+        if table.model_sha256 != file_sha256(self.model_path):
+            logger.info(f"Ignoring stale lookup table {self.lookup_table_path}")
+            return None
+        return table
+
+    def load(self):
+        if self.model is None and self.lookup_table is None:
+            try:
+                self._signature = self._current_signature()
+                self._checked = time.monotonic()
+                self.lookup_table = self._load_lookup_table()
+                if self.lookup_table is not None:
+                    self.categories = {col: set(cats) for col, cats in zip(FEATURE_COLS, self.lookup_table.categories)}
+                    logger.info(f"Loaded score predictor from {self.lookup_table_path}")
+                    return self
+                self.preprocessor = load_object(self.preprocessor_path)
+                self.model = load_object(self.model_path)
+                encoder = self.preprocessor.named_transformers_["cat"].steps[-1][1]
+                self.categories = {col: set(cats.tolist()) for col, cats in zip(FEATURE_COLS, encoder.categories_)}
+                logger.info(f"Loaded score predictor from {self.model_path}")
+            except Exception as e:
+                raise CustomException(e, sys)
+        return self
+
+    def combinations(self):
+        self.load()
+        return list(product(*(sorted(self.categories[col]) for col in FEATURE_COLS)))
+
+    def warm(self):
+        self._warmed = True
+        self._predict_missing(self.combinations())
+        return len(self._cache)
+
+    def maybe_reload(self):
+        """Swap in a newly published model; returns True if one was loaded."""
+        if self.reload_interval is None or self._signature is None:
+            return False
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval:
+            return False
+        self._checked = now
+        if self._current_signature() == self._signature:
+            return False
+        fresh = ScorePredictor(self.model_path, self.preprocessor_path, self.lookup_table_path)
+        try:
+            fresh.load()
+            if self._warmed:
+                fresh.warm()
+        except Exception as e:
+            # typically caught mid-publish; the next check retries
+            logger.error(f"Keeping the current model, reload failed: {e}")
+            return False
+        with self._lock:
+            self.model, self.preprocessor, self.lookup_table = fresh.model, fresh.preprocessor, fresh.lookup_table
+            self.categories, self._cache, self._signature = fresh.categories, fresh._cache, fresh._signature
+        logger.info(f"Reloaded score predictor from {self.model_path}")
+        return True
+
+    def _key(self, features):
+        missing = [col for col in FEATURE_COLS if col not in features]
+        if missing:
+            raise ValueError(f"Missing features: {', '.join(missing)}")
+        key = tuple(str(features[col]) for col in FEATURE_COLS)
+        for col, value in zip(FEATURE_COLS, key):
+            if value not in self.categories[col]:
+                raise ValueError(f"Unknown value for {col}: {value!r}")
+        return key
+
+    def _predict_missing(self, keys):
+        missing = [k for k in dict.fromkeys(keys) if k not in self._cache]
+        if not missing:
+            return
+        if self.lookup_table is not None:
+            predicted = self.lookup_table.predict(missing)
+        else:
+            import pandas as pd
+            frame = pd.DataFrame(missing, columns=FEATURE_COLS)
+            predicted = predict_targets(self.model, self.preprocessor.transform(frame))
+        with self._lock:
+            for key, row in zip(missing, predicted.tolist()):
+                self._cache[key] = {col: round(v, 2) for col, v in zip(TARGET_COLS, row)}
+
+    def predict_many(self, rows):
+        """Predict a list of feature dicts with at most one model call."""
+        self.load()
+        self.maybe_reload()
+        keys = [self._key(row) for row in rows]
+        self._predict_missing(keys)
+        return [self._cache[k] for k in keys]
+
+    def predict_one(self, features):
+        return self.predict_many([features])[0]
@@ -0,0 +1,174 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime, timezone
+from src.exception import CustomException
+from src.logger import logger
+from src.utils import file_sha256, manifest_path
+
+
+class Stage:
+    """One step of the training DAG.
+
+    ``fn(workdir, inputs)`` writes its outputs into ``workdir`` and may return
+    a JSON-serializable result. ``inputs`` maps each dependency's name to the
+    directory holding its outputs. The cache key covers the stage name, its
+    ``config``, the output hashes of its dependencies and the content of any
+    ``external_inputs`` files.
+    """
+
+    def __init__(self, name, fn, deps=(), config=None, external_inputs=()):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.config = config or {}
+        self.external_inputs = list(external_inputs)
+
+
+def _list_outputs(root):
+    """Relative paths of every file under ``root``, with ``/`` separators (columnar datasets are directories)."""
+    names = []
+    for dirpath, _, files in os.walk(root):
+        rel = os.path.relpath(dirpath, root)
+        names.extend(name if rel == "." else f"{rel}/{name}".replace(os.sep, "/") for name in files)
+    return sorted(names)
+
+
+class ArtifactStore:
+    """Content-addressed stage outputs under ``root/<stage>/<key>/``.
+
+    A directory only counts as present once its ``stage.json`` exists, which
+    is written last, so interrupted runs never look cached.
+    """
+
+    def __init__(self, root=os.path.join("artifacts", "store")):
+        self.root = root
+
+    def path(self, stage, key):
+        return os.path.join(self.root, stage, key)
+
+    def get(self, stage, key):
+        meta_path = os.path.join(self.path(stage, key), "stage.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, stage, key, workdir, meta):
+        final = self.path(stage, key)
+        if os.path.exists(final):
+            shutil.rmtree(final)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        shutil.move(workdir, final)
+        meta = dict(meta, outputs={name: file_sha256(os.path.join(final, name)) for name in _list_outputs(final)})
+        tmp = os.path.join(final, "stage.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, os.path.join(final, "stage.json"))
+        return meta
+
+
+class StageRunner:
+    def __init__(self, store=None, lineage_path=os.path.join("artifacts", "lineage.json")):
+        self.store = store or ArtifactStore()
+        self.lineage_path = lineage_path
+
+    @staticmethod
+    def _key(stage, dep_meta):
+        payload = {
+            "stage": stage.name,
+            "config": stage.config,
+            "deps": {name: meta["outputs"] for name, meta in dep_meta.items()},
+            "external": {os.path.basename(p): file_sha256(p) for p in stage.external_inputs},
+        }
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    def run(self, stages, from_stage=None, force=False):
+        """Run ``stages`` in order, reusing cached outputs where the key matches.
+
+        ``from_stage`` forces that stage and everything after it to run again;
+        ``force`` reruns everything. Returns ``{stage name: stage metadata}``.
+        """
+        names = [s.name for s in stages]
+        if from_stage is not None and from_stage not in names:
+            raise CustomException(f"Unknown stage {from_stage!r}; expected one of {names}")
+        forced_from = 0 if force else (names.index(from_stage) if from_stage else len(names))
+
+        done = {}
+        lineage = []
+        try:
+            for i, stage in enumerate(stages):
+                dep_meta = {d: done[d] for d in stage.deps}
+                key = self._key(stage, dep_meta)
+                meta = None if i >= forced_from else self.store.get(stage.name, key)
+                cached = meta is not None
+                start = time.perf_counter()
+                if cached:
+                    logger.info(f"Stage {stage.name}: up to date ({key})")
+                else:
+                    logger.info(f"Stage {stage.name}: running ({key})")
+                    os.makedirs(self.store.root, exist_ok=True)
+                    workdir = tempfile.mkdtemp(prefix=f".{stage.name}-", dir=self.store.root)
+                    inputs = {d: self.store.path(d, done[d]["key"]) for d in stage.deps}
+                    result = stage.fn(workdir, inputs)
+                    meta = self.store.put(stage.name, key, workdir, {
+                        "stage": stage.name,
+                        "key": key,
+                        "config": stage.config,
+                        "deps": {d: done[d]["key"] for d in stage.deps},
+                        "external_inputs": {p: file_sha256(p) for p in stage.external_inputs},
+                        "result": result,
+                        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    })
+                done[stage.name] = meta
+                seconds = time.perf_counter() - start
+                logger.info(f"Stage {stage.name}: done in {seconds:.3f}s",
+                            extra={"stage": stage.name, "key": key, "cached": cached, "seconds": round(seconds, 6)})
+                lineage.append({
+                    "stage": stage.name,
+                    "key": key,
+                    "cached": cached,
+                    "seconds": round(seconds, 3),
+                    "path": self.store.path(stage.name, key),
+                    "outputs": meta["outputs"],
+                })
+            self._write_lineage(lineage)
+            return done
+        except CustomException:
+            raise
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _write_lineage(self, lineage):
+        os.makedirs(os.path.dirname(self.lineage_path) or ".", exist_ok=True)
+        tmp = self.lineage_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"), "stages": lineage}, f, indent=2)
+        os.replace(tmp, self.lineage_path)
+
+    def publish(self, stage, meta, target_dir="artifacts", skip_suffixes=()):
+        """Copy a stage's outputs to their conventional locations (atomically per file).
+
+        A published file whose stage output has no manifest sidecar loses any
+        sidecar already in ``target_dir`` (left by an earlier joblib or flat
+        run), since ``load_object`` trusts whichever manifest it finds.
+        """
+        src = self.store.path(stage, meta["key"])
+        os.makedirs(target_dir, exist_ok=True)
+        outputs = set(meta["outputs"])
+        for name in meta["outputs"]:
+            # a suffix on the top-level entry skips a whole output directory
+            if name.endswith(tuple(skip_suffixes)) or name.split("/")[0].endswith(tuple(skip_suffixes)):
+                continue
+            dest = os.path.join(target_dir, *name.split("/"))
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            tmp = os.path.join(os.path.dirname(dest), f".{os.path.basename(dest)}.tmp")
+            shutil.copyfile(os.path.join(src, *name.split("/")), tmp)
+            os.replace(tmp, dest)
+            if manifest_path(name) not in outputs and os.path.exists(manifest_path(dest)):
+                os.remove(manifest_path(dest))
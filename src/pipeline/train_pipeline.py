@@ -1,20 +1,137 @@
+import os
+import json
+import argparse
+import numpy as np
 from src.components.data_ingestion import DataIngestion
 from src.components.data_transformation import DataTransformation
 from src.components.model_trainer import ModelTrainer
+from src.pipeline.stage_runner import Stage, StageRunner
+from src.utils import ARTIFACT_FORMAT
 from src.logger import logger
 
-def run_training():
-    logger.info("Training pipeline started")
-    ingestion = DataIngestion()
-    train_path, test_path = ingestion.initiate_data_ingestion()
+STAGES = ["ingestion", "transformation", "training"]
+
+
+def _ingest(raw_data_path, data_format):
+    def run(workdir, inputs):
+        DataIngestion(raw_data_path, artifacts_dir=workdir, data_format=data_format).initiate_data_ingestion()
+    return run
+
+
+def _transform(encoding):
+    def run(workdir, inputs):
+        src = inputs["ingestion"]
+        transformer = DataTransformation(artifacts_dir=workdir, encoding=encoding)
+        if os.path.isdir(os.path.join(src, "train.col")):
+            # writes X_/y_ train/test files into workdir itself
+            transformer.initiate_data_transformation(os.path.join(src, "train.col"), os.path.join(src, "test.col"))
+            return
+        train, test, _ = transformer.initiate_data_transformation(
+            os.path.join(src, "train.csv"), os.path.join(src, "test.csv")
+        )
+        for name, data in (("train", train), ("test", test)):
+            if isinstance(data, tuple):
+                _save_split(workdir, name, *data)
+            else:
+                np.save(os.path.join(workdir, f"{name}_array.npy"), data)
+    return run
+
+
+def _save_split(workdir, name, X, y):
+    if hasattr(X, "tocsr"):
+        from scipy import sparse
+        sparse.save_npz(os.path.join(workdir, f"X_{name}.npz"), X.tocsr(), compressed=False)
+    else:
+        np.save(os.path.join(workdir, f"X_{name}.npy"), X)
+    np.save(os.path.join(workdir, f"y_{name}.npy"), y)
+
+
+def _load_split(src, name):
+    y_path = os.path.join(src, f"y_{name}.npy")
+    if os.path.exists(os.path.join(src, f"X_{name}.npz")):
+        from scipy import sparse
+        return sparse.load_npz(os.path.join(src, f"X_{name}.npz")), np.load(y_path, mmap_mode="r")
+    if os.path.exists(os.path.join(src, f"X_{name}.npy")):
+        return np.load(os.path.join(src, f"X_{name}.npy"), mmap_mode="r"), np.load(y_path, mmap_mode="r")
+    return np.load(os.path.join(src, f"{name}_array.npy"))
 
-    transformer = DataTransformation()
-    train_array, test_array, preprocessor_path = transformer.initiate_data_transformation(train_path, test_path)
 
-    trainer = ModelTrainer()
-    metrics = trainer.initiate_model_trainer(train_array, test_array)
+def _train(config):
+    def run(workdir, inputs):
+        src = inputs["transformation"]
+        train_array = _load_split(src, "train")
+        test_array = _load_split(src, "test")
+        trainer = ModelTrainer(
+            artifact_format=config["artifact_format"], multioutput=config["multioutput"], artifacts_dir=workdir,
+            encoding=config["encoding"]
+        )
+        metrics = trainer.initiate_model_trainer(
+            train_array, test_array, preprocessor_path=os.path.join(src, "preprocessor.pkl"),
+            lookup_table=config["lookup_table"], search=config["search"], search_config=config["search_config"]
+        )
+        # paths inside the temporary work dir are meaningless once stored
+        return {k: v for k, v in metrics.items() if not k.endswith("_path")}
+    return run
 
+
+def build_stages(raw_data_path=None, lookup_table=True, search=False, search_config=None,
+                 multioutput="wrapper", artifact_format=None, data_format="csv", encoding="onehot"):
+    raw_data_path = raw_data_path or os.path.join("notebook", "data", "StudentsPerformance.csv")
+    train_config = {
+        "lookup_table": lookup_table,
+        "search": search,
+        "search_config": search_config,
+        "multioutput": multioutput,
+        "artifact_format": artifact_format or ARTIFACT_FORMAT,
+        "encoding": encoding,
+    }
+    return [
+        Stage("ingestion", _ingest(raw_data_path, data_format),
+              config={"test_size": 0.2, "random_state": 42, "data_format": data_format},
+              external_inputs=[raw_data_path]),
+        Stage("transformation", _transform(encoding), deps=["ingestion"], config={"encoding": encoding}),
+        Stage("training", _train(train_config), deps=["transformation"], config=train_config),
+    ]
+
+
+def run_training(lookup_table=True, search=False, search_config=None, multioutput="wrapper",
+                 from_stage=None, force=False, raw_data_path=None, artifact_format=None, data_format="csv", encoding="onehot"):
+    """Run ingestion -> transformation -> training, skipping stages whose inputs
+    and config are unchanged, then publish the outputs to ``artifacts/``."""
+    logger.info("Training pipeline started")
+    runner = StageRunner()
+    stages = build_stages(raw_data_path, lookup_table, search, search_config, multioutput, artifact_format, data_format,
+                          encoding)
+    results = runner.run(stages, from_stage=from_stage, force=force)
+    for stage in STAGES:
+        # intermediate arrays stay in the store; everything else goes where the app expects it
+        runner.publish(stage, results[stage], skip_suffixes=(".npy", "_train.npz", "_test.npz", ".col"))
+
+    metrics = results["training"]["result"]
     logger.info(f"Training finished. Metrics: {metrics}")
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the training pipeline")
+    parser.add_argument("--from-stage", choices=STAGES, help="rerun this stage and everything after it")
+    parser.add_argument("--force", action="store_true", help="ignore cached stage outputs")
+    parser.add_argument("--multioutput", choices=["wrapper", "native"], default="wrapper")
+    parser.add_argument("--search", action="store_true", help="run the model search")
+    parser.add_argument("--no-lookup-table", action="store_true")
+    parser.add_argument("--data", help="raw CSV (default notebook/data/StudentsPerformance.csv)")
+    parser.add_argument("--data-format", choices=["csv", "columnar"], default="csv",
+                        help="intermediate format; columnar keeps memory flat on multi-million-row data")
+    parser.add_argument("--encoding", choices=["onehot", "sparse", "ordinal"], default="onehot",
+                        help="feature encoding; sparse/ordinal avoid the dense float64 one-hot matrix")
+    args = parser.parse_args(argv)
+    metrics = run_training(
+        lookup_table=not args.no_lookup_table, search=args.search, multioutput=args.multioutput,
+        from_stage=args.from_stage, force=args.force, raw_data_path=args.data, data_format=args.data_format,
+        encoding=args.encoding
+    )
+    print(json.dumps(metrics, indent=2))
+
 
 if __name__ == "__main__":
-    run_training()
+    main()
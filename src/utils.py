@@ -1,20 +1,109 @@
 import os
-import dill
+import json
+import hashlib
 from src.exception import CustomException
 
-def save_object(file_path, obj):
+# dill, joblib and numpy are imported where they are used, so modules that
+# only need file_sha256 or ARTIFACT_FORMAT (stage runner, web workers) stay light.
+
+# save_object formats: "dill" (plain pickle, the historical default), "joblib"
+# (uncompressed joblib with numpy arrays stored out-of-band so they can be
+# memory-mapped on load, plus a <file>.manifest.json sidecar) or "flat"
+# (forests converted to a numpy-only FlatForest, then saved as "joblib").
+ARTIFACT_FORMAT = os.environ.get("ARTIFACT_FORMAT", "dill")
+ARTIFACT_FORMAT_VERSION = 1
+
+
+def manifest_path(file_path):
+    return file_path + ".manifest.json"
+
+
+def file_sha256(file_path):
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _feature_names(obj):
+    names = getattr(obj, "feature_names_in_", None)
+    if names is None and hasattr(obj, "get_feature_names_out"):
+        try:
+            names = obj.get_feature_names_out()
+        except Exception:
+            names = None
+    return [str(n) for n in names] if names is not None else None
+
+
+def read_manifest(file_path):
+    try:
+        with open(manifest_path(file_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_object(file_path, obj, fmt=None, feature_names=None):
+    fmt = fmt or ARTIFACT_FORMAT
     try:
         dir_path = os.path.dirname(file_path)
         if dir_path != "":
             os.makedirs(dir_path, exist_ok=True)
-        with open(file_path, "wb") as f:
-            dill.dump(obj, f)
+        if fmt == "dill":
+            import dill
+            with open(file_path, "wb") as f:
+                dill.dump(obj, f)
+            if os.path.exists(manifest_path(file_path)):
+                os.remove(manifest_path(file_path))
+            return
+        if fmt == "flat":
+            from src.components.flat_forest import FlatForest
+            if FlatForest.supports(obj):
+                obj = FlatForest.from_model(obj)
+            fmt = "joblib"
+        if fmt != "joblib":
+            raise ValueError(f"Unknown artifact format: {fmt}")
+
+        import joblib
+        joblib.dump(obj, file_path)
+        manifest = {
+            "format": "joblib",
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "type": f"{type(obj).__module__}.{type(obj).__qualname__}",
+            "feature_names": list(feature_names) if feature_names is not None else _feature_names(obj),
+            "size": os.path.getsize(file_path),
+            "sha256": file_sha256(file_path),
+        }
+        with open(manifest_path(file_path), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
     except Exception as e:
         raise CustomException(f"Error saving object to {file_path}: {e}")
 
-def load_object(file_path):
+
+def predict_targets(model, X):
+    """``model.predict`` as a float64 ``(n_rows, n_targets)`` array.
+
+    Works for MultiOutputRegressor wrappers as well as natively multi-output
+    estimators (RandomForest fitted on a 2-D y, CatBoost MultiRMSE, FlatForest).
+    """
+    import numpy as np
+    y = np.asarray(model.predict(X), dtype=np.float64)
+    return y.reshape(X.shape[0], -1)
+
+
+def load_object(file_path, mmap_mode="r", verify=True):
     try:
-        with open(file_path, "rb") as f:
-            return dill.load(f)
+        manifest = read_manifest(file_path)
+        if manifest is None:
+            import dill
+            with open(file_path, "rb") as f:
+                return dill.load(f)
+        if manifest.get("format_version", 0) > ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f"artifact format version {manifest['format_version']} is newer than supported")
+        if verify and file_sha256(file_path) != manifest["sha256"]:
+            raise ValueError("checksum mismatch")
+        import joblib
+        return joblib.load(file_path, mmap_mode=mmap_mode)
     except Exception as e:
         raise CustomException(f"Error loading object from {file_path}: {e}")
@@ -0,0 +1,67 @@
+SUBJECTS = ["Math", "Reading", "Writing", "English", "Computer", "Science", "Social"]
+
+
+def empty_aggregates():
+    """Running per-user statistics kept next to ``records``.
+
+    ``series`` is columnar: one list per field, one element per record, so
+    trend charts can be sliced without touching the record dicts.
+    """
+    return {
+        "count": 0,
+        "percentage": {"sum": 0, "min": None, "max": None},
+        "subjects": {s: {"sum": 0, "min": None, "max": None} for s in SUBJECTS},
+        "series": dict({"timestamp": [], "percentage": []}, **{s: [] for s in SUBJECTS}),
+    }
+
+
+def _fold_value(stat, value):
+    stat["sum"] += value
+    stat["min"] = value if stat["min"] is None else min(stat["min"], value)
+    stat["max"] = value if stat["max"] is None else max(stat["max"], value)
+
+
+def fold_record(agg, record):
+    agg["count"] += 1
+    _fold_value(agg["percentage"], record["percentage"])
+    series = agg["series"]
+    series["timestamp"].append(record.get("timestamp"))
+    series["percentage"].append(record["percentage"])
+    scores = record.get("scores", {})
+    for s in SUBJECTS:
+        value = scores.get(s, 0)
+        _fold_value(agg["subjects"][s], value)
+        series[s].append(value)
+    return agg
+
+
+def build_aggregates(records):
+    agg = empty_aggregates()
+    for r in records:
+        fold_record(agg, r)
+    return agg
+
+
+def ensure_aggregates(user, rebuild=False):
+    if rebuild or "aggregates" not in user:
+        user["aggregates"] = build_aggregates(user.get("records", []))
+    return user["aggregates"]
+
+
+def subject_averages(agg):
+    if not agg["count"]:
+        return {}
+    return {s: round(agg["subjects"][s]["sum"] / agg["count"], 2) for s in SUBJECTS}
+
+
+def chart_points(agg, since=0, limit=None):
+    series = agg["series"]
+    end = agg["count"] if limit is None else min(agg["count"], since + limit)
+    return [
+        {
+            "timestamp": series["timestamp"][i],
+            "percentage": series["percentage"][i],
+            "scores": {s: series[s][i] for s in SUBJECTS},
+        }
+        for i in range(since, end)
+    ]
@@ -0,0 +1,198 @@
+import os
+import gzip
+import hashlib
+import mimetypes
+import threading
+from functools import wraps
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+# a year: fingerprinted URLs change whenever the content does
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".html", ".txt", ".map")
+
+
+def _debug(flag):
+    # None follows the current app's debug flag (set after import by app.run(debug=True))
+    if flag is not None:
+        return flag
+    from flask import current_app, has_app_context
+    return has_app_context() and current_app.debug
+
+
+class _Asset:
+    __slots__ = ("name", "hashed_name", "digest", "mtime", "mimetype", "variants")
+
+
+class AssetPipeline:
+    """Content-hashed, precompressed static files served from memory.
+
+    On startup every file under ``static_dir`` is read once, hashed and,
+    for text types, compressed with gzip (and brotli when the ``brotli``
+    package is installed). ``url_for('static', filename='style.css')``
+    becomes ``/static/style.<hash>.css``, served with a one-year immutable
+    Cache-Control; the plain name still works with ``no-cache`` and an ETag.
+    In debug mode a changed file is picked up on its next URL build.
+    """
+
+    def __init__(self, static_dir, compress_min_bytes=256, debug=None):
+        self.static_dir = static_dir
+        self.compress_min_bytes = compress_min_bytes
+        self.debug = debug
+        self._lock = threading.Lock()
+        self._by_name = {}
+        self._by_hashed = {}
+        for dirpath, _, files in os.walk(static_dir):
+            for name in files:
+                rel = os.path.relpath(os.path.join(dirpath, name), static_dir).replace(os.sep, "/")
+                self._load(rel)
+
+    def _load(self, name):
+        path = os.path.join(self.static_dir, *name.split("/"))
+        with open(path, "rb") as f:
+            data = f.read()
+        asset = _Asset()
+        asset.name = name
+        asset.digest = hashlib.sha256(data).hexdigest()[:12]
+        root, ext = os.path.splitext(name)
+        asset.hashed_name = f"{root}.{asset.digest}{ext}"
+        asset.mtime = os.stat(path).st_mtime_ns
+        asset.mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if asset.mimetype.startswith("text/") or asset.mimetype == "application/javascript":
+            asset.mimetype += "; charset=utf-8"
+        asset.variants = {"identity": data}
+        if ext.lower() in COMPRESSIBLE and len(data) >= self.compress_min_bytes:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                asset.variants["gzip"] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    asset.variants["br"] = compressed
+        with self._lock:
+            old = self._by_name.get(name)
+            if old is not None:
+                self._by_hashed.pop(old.hashed_name, None)
+            self._by_name[name] = asset
+            self._by_hashed[asset.hashed_name] = asset
+        return asset
+
+    def _get(self, name):
+        asset = self._by_name.get(name)
+        if asset is not None and _debug(self.debug):
+            try:
+                if os.stat(os.path.join(self.static_dir, *name.split("/"))).st_mtime_ns != asset.mtime:
+                    asset = self._load(name)
+            except FileNotFoundError:
+                return None
+        return asset
+
+    def hashed_url_name(self, name):
+        asset = self._get(name)
+        return asset.hashed_name if asset is not None else name
+
+    def response(self, filename):
+        from flask import Response, request, abort
+        asset = self._by_hashed.get(filename)
+        immutable = asset is not None
+        if asset is None:
+            asset = self._get(filename)
+        if asset is None:
+            abort(404)
+
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in asset.variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        resp = Response(asset.variants[encoding], mimetype=asset.mimetype)
+        if encoding != "identity":
+            resp.headers["Content-Encoding"] = encoding
+        if len(asset.variants) > 1:
+            resp.vary.add("Accept-Encoding")
+        # one tag per encoding, since the bytes differ
+        resp.set_etag(asset.digest if encoding == "identity" else f"{asset.digest}-{encoding}")
+        resp.cache_control.public = True
+        if immutable:
+            resp.cache_control.max_age = IMMUTABLE_MAX_AGE
+            resp.cache_control.immutable = True
+        else:
+            resp.cache_control.no_cache = True
+        return resp.make_conditional(request)
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {"url_name": a.hashed_name, "bytes": {k: len(v) for k, v in a.variants.items()}}
+                for name, a in self._by_name.items()
+            }
+
+
+class PageCache:
+    """Rendered bodies of pages that look the same for every anonymous visitor.
+
+    ``cached`` wraps a view: a plain GET (no query string) is answered from
+    memory with an ETag and ``no-cache``, so browsers revalidate and get a
+    304 while the body is unchanged. Anything else runs the view. In debug
+    mode nothing is cached, so template edits show up immediately.
+    """
+
+    def __init__(self, debug=None):
+        self.debug = debug
+        self.hits = 0
+        self.misses = 0
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def cached(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            from flask import Response, request, make_response
+            if request.method != "GET" or request.args or _debug(self.debug):
+                return view(*args, **kwargs)
+            key = (request.endpoint, tuple(sorted(kwargs.items())))
+            page = self._pages.get(key)
+            if page is None:
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code != 200 or resp.direct_passthrough:
+                    return resp
+                body = resp.get_data()
+                page = (body, hashlib.sha1(body).hexdigest(), resp.mimetype)
+                with self._lock:
+                    self._pages[key] = page
+                    self.misses += 1
+            else:
+                with self._lock:
+                    self.hits += 1
+            body, etag, mimetype = page
+            resp = Response(body, mimetype=mimetype)
+            resp.set_etag(etag)
+            resp.cache_control.public = True
+            resp.cache_control.no_cache = True
+            return resp.make_conditional(request)
+        return wrapper
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"pages": len(self._pages), "hits": self.hits, "misses": self.misses}
+
+
+def init_app(app, static_dir=None):
+    """Serve ``app``'s static endpoint through an ``AssetPipeline`` and fingerprint its URLs."""
+    pipeline = AssetPipeline(static_dir or app.static_folder)
+
+    @app.url_defaults
+    def _fingerprint(endpoint, values):
+        if endpoint == "static" and "filename" in values:
+            values["filename"] = pipeline.hashed_url_name(values["filename"])
+
+    # same URL rule and endpoint as Flask's built-in static view, new handler
+    app.view_functions["static"] = pipeline.response
+    return pipeline
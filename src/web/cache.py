@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from src.web.storage import user_key
+
+
+class UserCache:
+    """Per-worker LRU of materialized users, keyed by case-folded username.
+
+    Entries are dropped from the store's change events, so a hit costs one
+    cheap freshness check on the store and no JSON parsing. Cached dicts are
+    shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, store, maxsize=4096):
+        self.store = store
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._data = OrderedDict()
+        self._epoch = 0
+        self._lock = threading.Lock()
+        store.add_listener(self._on_change)
+
+    def _on_change(self, events):
+        with self._lock:
+            self._epoch += 1
+            for kind, key, _ in events:
+                if kind == "reset":
+                    self.invalidations += len(self._data)
+                    self._data.clear()
+                    break
+                if self._data.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def get(self, username):
+        key = user_key(username)
+        self.store.refresh()
+        with self._lock:
+            user = self._data.get(key)
+            if user is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return user
+            self.misses += 1
+            epoch = self._epoch
+
+        user = self.store.get_user(key)
+        if user is not None:
+            with self._lock:
+                # skip the insert if the store changed while we were reading it
+                if epoch == self._epoch:
+                    self._data[key] = user
+                    if len(self._data) > self.maxsize:
+                        self._data.popitem(last=False)
+        return user
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
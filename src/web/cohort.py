@@ -0,0 +1,157 @@
+from src.web.storage import user_key
+from src.web.aggregates import SUBJECTS
+from src.web.materialized import MaterializedView
+
+
+class Cohort(MaterializedView):
+    """Every student's latest score per subject, kept in sync with the store's change events.
+
+    Scores live in a float matrix (one row per student with records, one
+    column per subject in ``SUBJECTS`` order) plus one presorted array per
+    subject. A new record replaces the student's row and moves seven values
+    in the sorted arrays with ``searchsorted``, so percentile ranks are two
+    bisections and cohort statistics are vectorized reductions over the
+    matrix (cached until the next change). NumPy is imported on first use.
+    """
+
+    def __init__(self, store):
+        self._np = None
+        self._rows = {}          # user key -> matrix row
+        self._free = []          # rows of users that lost their records
+        self._matrix = None
+        self._sorted = None
+        self._summary = None
+        super().__init__(store)
+
+    # ---- maintenance ----
+    def _apply(self, kind, key, payload):
+        if kind != "record":
+            return False
+        self._set_scores(key, payload["record"]["scores"])
+        return True
+
+    def _put(self, key, user):
+        records = user.get("records") if user else None
+        self._set_scores(key, records[-1]["scores"] if records else None)
+
+    def _vector(self, scores):
+        return self._np.array([float(scores.get(s, 0)) for s in SUBJECTS])
+
+    def _set_scores(self, key, scores):
+        np = self._np
+        self._summary = None
+        row = self._rows.get(key)
+        if row is not None:
+            old = self._matrix[row]
+            for j in range(len(SUBJECTS)):
+                col = self._sorted[j]
+                self._sorted[j] = np.delete(col, np.searchsorted(col, old[j]))
+        if scores is None:
+            if row is not None:
+                del self._rows[key]
+                self._free.append(row)
+            return
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                row = len(self._rows)
+                if row == len(self._matrix):
+                    grown = np.zeros((max(2 * row, 64), len(SUBJECTS)))
+                    grown[:row] = self._matrix
+                    self._matrix = grown
+            self._rows[key] = row
+        new = self._vector(scores)
+        self._matrix[row] = new
+        for j in range(len(SUBJECTS)):
+            col = self._sorted[j]
+            self._sorted[j] = np.insert(col, np.searchsorted(col, new[j]), new[j])
+
+    def _rebuild(self, users):
+        np = self._np
+        self._rows, self._free, self._summary = {}, [], None
+        latest = []
+        for user in users:
+            if user.get("records"):
+                self._rows[user_key(user["username"])] = len(latest)
+                latest.append(self._vector(user["records"][-1]["scores"]))
+        self._matrix = np.zeros((max(len(latest), 64), len(SUBJECTS)))
+        if latest:
+            self._matrix[:len(latest)] = latest
+        self._sorted = [np.sort(self._matrix[:len(latest), j]) for j in range(len(SUBJECTS))]
+
+    def _sync(self):
+        if self._np is None:
+            import numpy
+            self._np = numpy
+        super()._sync()
+
+    def _active(self):
+        rows = sorted(self._rows.values())
+        return self._matrix[rows]
+
+    # ---- queries ----
+    def __len__(self):
+        self._sync()
+        return len(self._rows)
+
+    def standing(self, scores, username=None):
+        """Percentile (0-100, ties count half) and rank of ``scores`` in each subject.
+
+        With ``username``, that student is counted at ``scores`` instead of
+        their stored row, so a submission still in flight ranks correctly.
+        """
+        self._sync()
+        with self._lock:
+            row = self._rows.get(user_key(username)) if username is not None else None
+            n = len(self._rows)
+            if username is not None and row is None:
+                n += 1
+            out = {}
+            for j, s in enumerate(SUBJECTS):
+                value = float(scores.get(s, 0))
+                col = self._sorted[j]
+                below = int(self._np.searchsorted(col, value, side="left"))
+                at_or_below = int(self._np.searchsorted(col, value, side="right"))
+                if username is not None:
+                    old = self._matrix[row, j] if row is not None else None
+                    if old is not None and old < value:
+                        below -= 1
+                    if old is None or old > value:
+                        at_or_below += 1
+                out[s] = {
+                    "score": scores.get(s, 0),
+                    "percentile": round((below + at_or_below) / 2 / n * 100, 1) if n else None,
+                    "rank": n - at_or_below + 1,
+                }
+            return {"students": n, "subjects": out}
+
+    def summary(self):
+        """Cohort size, per-subject mean/median/std/min/max and the subject correlation matrix."""
+        self._sync()
+        with self._lock:
+            if self._summary is not None:
+                return self._summary
+            np = self._np
+            n = len(self._rows)
+            subjects = {}
+            for j, s in enumerate(SUBJECTS):
+                col = self._sorted[j]
+                subjects[s] = {
+                    "mean": round(float(col.mean()), 2) if n else None,
+                    "median": round(float(np.median(col)), 2) if n else None,
+                    "std": round(float(col.std()), 2) if n else None,
+                    "min": float(col[0]) if n else None,
+                    "max": float(col[-1]) if n else None,
+                }
+            correlations = None
+            if n >= 2:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    corr = np.corrcoef(self._active(), rowvar=False)
+                correlations = {
+                    s: {t: (None if np.isnan(corr[i, j]) else round(float(corr[i, j]), 3))
+                        for j, t in enumerate(SUBJECTS)}
+                    for i, s in enumerate(SUBJECTS)
+                }
+            self._summary = {"students": n, "subjects": subjects, "correlations": correlations}
+            return self._summary
@@ -0,0 +1,296 @@
+import os
+import copy
+import json
+import time
+import uuid
+import atexit
+import threading
+from src.logger import logger
+from src.web.storage import lock_fd, unlock_fd, user_key, _fsync_dir
+from src.web.aggregates import ensure_aggregates, fold_record
+
+
+class WriteBehindJournal:
+    """Durable write-behind buffer for score submissions.
+
+    ``submit`` appends the record to this worker's journal file
+    (``journal-<pid>-<id>.jsonl``) and returns once it is fsynced. A commit
+    thread groups everything submitted within ``commit_interval`` seconds
+    into one write + fsync. A fold thread moves durable entries into the store
+    every ``fold_interval`` seconds with ``store.append_records``, which also
+    records the journal's watermark, so a replay never applies an entry twice.
+
+    Reads through ``get_user`` overlay the worker's own not-yet-folded
+    submissions on the stored user. Other workers see a submission once it has
+    been folded, at most ``fold_interval`` later, so a plain read can lag by
+    that much. Nothing stored is derived from such a read: with ``rebase``
+    (see ``LogStore.append_records``) each entry is rebuilt against the
+    user's real latest record when it is folded or replayed.
+
+    Each live journal is flock-ed by its worker. ``recover`` replays journals
+    whose owner is gone (crash, kill -9) and runs on startup and periodically.
+    Threads start lazily in each process, so the object can be created before
+    gunicorn forks.
+    """
+
+    def __init__(self, store, path, reader=None, rebase=None, commit_interval=0.005, fold_interval=0.05,
+                 rotate_bytes=1 << 20, recover_interval=30.0):
+        if not getattr(store, "supports_watermarks", False):
+            raise ValueError("write-behind journaling needs a store with watermarks (the log backend)")
+        self.store = store
+        self.path = path
+        self.reader = reader or store.get_user
+        self.rebase = rebase
+        self.commit_interval = commit_interval
+        self.fold_interval = fold_interval
+        self.rotate_bytes = rotate_bytes
+        self.recover_interval = recover_interval
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    # ---- lifecycle ----
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # forked from a process that had a journal open: drop the inherited descriptor
+                try:
+                    os.close(self._fd)
+                except OSError:
+                    pass
+            os.makedirs(self.path, exist_ok=True)
+            self._cond = threading.Condition()
+            self._file_lock = threading.Lock()
+            self._fold_lock = threading.Lock()
+            self._staged = []      # (seq, username, record, points) waiting for the group fsync
+            self._unfolded = []    # durable, not yet in the store
+            self._pending = {}     # user key -> [(seq, record, points)] for read-your-writes
+            self._durable = 0
+            self._seq = 0
+            self._error = None
+            self._stopping = False
+            self._open_journal()
+            self._pid = os.getpid()
+            threading.Thread(target=self._commit_loop, name="journal-commit", daemon=True).start()
+            threading.Thread(target=self._fold_loop, name="journal-fold", daemon=True).start()
+            atexit.register(self.close)
+        self.recover()
+
+    def _open_journal(self):
+        self.journal_id = f"journal-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._journal_path = os.path.join(self.path, self.journal_id + ".jsonl")
+        # lock under a temporary name first so recovery never sees an unowned journal
+        tmp = self._journal_path + ".new"
+        self._fd = os.open(tmp, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        lock_fd(self._fd)
+        os.replace(tmp, self._journal_path)
+        # the journal's directory entry must be durable before any entry in it is acknowledged
+        _fsync_dir(self.path)
+        self._seq = 0
+
+    def close(self):
+        """Commit and fold everything, then remove the (empty) journal."""
+        if self._pid != os.getpid() or self._fd is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self.flush()
+        with self._file_lock:
+            if not self._unfolded and not self._staged:
+                self._retire_journal()
+        self._pid = None
+
+    # ---- writes ----
+    def submit(self, username, record, points_gain):
+        """Journal one submission; returns after it is durable on disk."""
+        self._ensure_started()
+        with self._cond:
+            if self._error is not None:
+                raise self._error
+            self._seq += 1
+            seq = self._seq
+            self._staged.append((seq, username, record, points_gain))
+            self._pending.setdefault(user_key(username), []).append((seq, record, points_gain))
+            self._cond.notify_all()
+            while self._durable < seq and self._error is None:
+                self._cond.wait()
+            if self._durable < seq:
+                raise self._error
+        return seq
+
+    def _commit_loop(self):
+        while True:
+            with self._cond:
+                while not self._staged and not self._stopping:
+                    self._cond.wait()
+                if not self._staged:
+                    return
+            time.sleep(self.commit_interval)  # let concurrent submissions join this group
+            with self._file_lock:
+                with self._cond:
+                    batch, self._staged = self._staged, []
+                data = b"".join(
+                    json.dumps({"seq": seq, "user": username, "record": record, "points": points},
+                               ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                    for seq, username, record, points in batch
+                )
+                try:
+                    os.write(self._fd, data)
+                    os.fsync(self._fd)
+                except OSError as e:
+                    logger.error(f"Journal commit failed: {e}")
+                    with self._cond:
+                        self._error = e
+                        self._cond.notify_all()
+                    return
+            with self._cond:
+                self._durable = batch[-1][0]
+                self._unfolded.extend(batch)
+                self._cond.notify_all()
+
+    # ---- folding ----
+    def _fold_loop(self):
+        last_recover = time.monotonic()
+        while True:
+            with self._cond:
+                if not self._unfolded and not self._stopping:
+                    self._cond.wait(timeout=self.recover_interval)
+                stopping = self._stopping
+            if not stopping:
+                time.sleep(self.fold_interval)
+            try:
+                self._fold()
+                self._maybe_rotate()
+                if time.monotonic() - last_recover >= self.recover_interval:
+                    last_recover = time.monotonic()
+                    self.recover()
+            except Exception as e:
+                logger.error(f"Journal fold failed, will retry: {e}")
+            if stopping:
+                return
+
+    def _fold(self):
+        with self._fold_lock:
+            with self._cond:
+                batch = list(self._unfolded)
+            if not batch:
+                return 0
+            self.store.append_records(
+                [(username, record, points) for _, username, record, points in batch],
+                watermark=(self.journal_id, batch[-1][0]),
+                rebase=self.rebase,
+            )
+            last = batch[-1][0]
+            with self._cond:
+                del self._unfolded[:len(batch)]
+                for key in list(self._pending):
+                    rest = [p for p in self._pending[key] if p[0] > last]
+                    if rest:
+                        self._pending[key] = rest
+                    else:
+                        del self._pending[key]
+            return len(batch)
+
+    def flush(self):
+        """Wait for staged submissions to be durable, then fold them now."""
+        self._ensure_started()
+        with self._cond:
+            target = self._seq
+            while self._durable < target and self._error is None:
+                self._cond.wait(timeout=0.1)
+        return self._fold()
+
+    def _maybe_rotate(self):
+        with self._file_lock:
+            if self._fd is None:  # retired by close() while this fold was running
+                return
+            with self._cond:
+                idle = not self._staged and not self._unfolded
+            if idle and os.fstat(self._fd).st_size >= self.rotate_bytes:
+                self._retire_journal()
+                self._open_journal()
+
+    def _retire_journal(self):
+        # caller holds _file_lock and everything is folded
+        self.store.sync()
+        os.remove(self._journal_path)
+        _fsync_dir(self.path)
+        unlock_fd(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        self.store.drop_watermark(self.journal_id)
+
+    # ---- reads ----
+    def get_user(self, username):
+        """The stored user plus this worker's submissions that are not folded yet."""
+        if self._pid != os.getpid():
+            return self.reader(username)
+        with self._fold_lock:
+            user = self.reader(username)
+            with self._cond:
+                pending = list(self._pending.get(user_key(username), ()))
+        if user is None or not pending:
+            return user
+        user = dict(user)
+        user["records"] = list(user.get("records", []))
+        user["aggregates"] = copy.deepcopy(ensure_aggregates(user))
+        for _, record, points in pending:
+            user["records"].append(record)
+            fold_record(user["aggregates"], record)
+            user["points"] = user.get("points", 0) + points
+        return user
+
+    # ---- crash recovery ----
+    def recover(self):
+        """Replay journals left behind by workers that are no longer running."""
+        if not os.path.isdir(self.path):
+            return 0
+        replayed = 0
+        for name in sorted(os.listdir(self.path)):
+            if not name.startswith("journal-") or not name.endswith(".jsonl"):
+                continue
+            journal_id = name[:-len(".jsonl")]
+            if journal_id == getattr(self, "journal_id", None) and self._pid == os.getpid():
+                continue
+            path = os.path.join(self.path, name)
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # retired or recovered meanwhile
+            try:
+                if not lock_fd(fd, blocking=False):
+                    continue  # owner is alive
+                if not os.path.exists(path):
+                    continue
+                replayed += self._replay(journal_id, path)
+                self.store.sync()
+                os.remove(path)
+                _fsync_dir(self.path)
+                self.store.drop_watermark(journal_id)
+            finally:
+                os.close(fd)
+        if replayed:
+            logger.info(f"Replayed {replayed} journaled submissions", extra={"replayed": replayed})
+        return replayed
+
+    def _replay(self, journal_id, path):
+        done = self.store.watermark(journal_id)
+        entries = []
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write: never acknowledged
+                entry = json.loads(line)
+                if entry["seq"] > done:
+                    entries.append(entry)
+        if entries:
+            self.store.append_records(
+                [(e["user"], e["record"], e["points"]) for e in entries],
+                watermark=(journal_id, entries[-1]["seq"]),
+                rebase=self.rebase,
+            )
+        return len(entries)
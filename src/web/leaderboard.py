@@ -0,0 +1,113 @@
+import hashlib
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from src.web.storage import user_key
+from src.web.materialized import MaterializedView
+
+
+class Leaderboard(MaterializedView):
+    """Materialized leaderboard kept in sync with the store's change events.
+
+    Each user with records holds a running percentage sum/count; the board is
+    a list sorted by ``(-avg, -points, seq)`` where ``seq`` is the registration
+    order, which reproduces the stable ``sort(..., reverse=True)`` of the
+    original full recomputation. Appending a record moves one entry with two
+    bisections instead of re-sorting everybody.
+    """
+
+    def __init__(self, store):
+        self._entries = {}
+        self._order = []
+        self._next_seq = 0
+        self.last_modified = datetime.now(timezone.utc)
+        super().__init__(store)
+
+    # ---- maintenance ----
+    def _on_change(self, events):
+        super()._on_change(events)
+        self.last_modified = datetime.now(timezone.utc)
+
+    def _apply(self, kind, key, payload):
+        if kind != "record" or key not in self._entries:
+            return False
+        self._add_record(key, payload["record"]["percentage"], payload["points"])
+        return True
+
+    @staticmethod
+    def _sort_key(key, entry):
+        return (-entry["avg"], -entry["points"], entry["seq"], key)
+
+    def _remove(self, key, entry):
+        if entry["count"]:
+            i = bisect_left(self._order, self._sort_key(key, entry))
+            del self._order[i]
+
+    def _insert(self, key, entry):
+        entry["avg"] = round(entry["sum"] / entry["count"], 2) if entry["count"] else 0.0
+        if entry["count"]:
+            insort(self._order, self._sort_key(key, entry))
+
+    def _add_record(self, key, percentage, points_gain):
+        entry = self._entries[key]
+        self._remove(key, entry)
+        entry["sum"] += percentage
+        entry["count"] += 1
+        entry["points"] += points_gain
+        self._insert(key, entry)
+
+    def _put(self, key, user):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._remove(key, old)
+            seq = old["seq"]
+        else:
+            seq = self._next_seq
+            self._next_seq += 1
+        if user is None:
+            return
+        recs = user.get("records", [])
+        entry = {
+            "name": user.get("name", user["username"]),
+            "roll": user.get("roll", "-"),
+            "sum": sum(r["percentage"] for r in recs),
+            "count": len(recs),
+            "points": user.get("points", 0),
+            "seq": seq,
+        }
+        self._entries[key] = entry
+        self._insert(key, entry)
+
+    def _rebuild(self, users):
+        self._entries = {}
+        self._order = []
+        self._next_seq = 0
+        for user in users:
+            self._put(user_key(user["username"]), user)
+
+    # ---- queries ----
+    def __len__(self):
+        self._sync()
+        return len(self._order)
+
+    def page(self, offset=0, limit=None):
+        self._sync()
+        with self._lock:
+            end = len(self._order) if limit is None else offset + limit
+            rows = []
+            for rank, item in enumerate(self._order[offset:end], start=offset + 1):
+                entry = self._entries[item[3]]
+                rows.append({
+                    "rank": rank,
+                    "name": entry["name"],
+                    "roll": entry["roll"],
+                    "avg": entry["avg"],
+                    "points": entry["points"],
+                })
+            return rows, len(self._order)
+
+    @staticmethod
+    def etag(rows, total):
+        h = hashlib.sha1(str(total).encode())
+        for r in rows:
+            h.update(repr((r["rank"], r["name"], r["roll"], r["avg"], r["points"])).encode("utf-8"))
+        return h.hexdigest()
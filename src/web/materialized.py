@@ -0,0 +1,73 @@
+import threading
+
+
+class MaterializedView:
+    """Per-worker state derived from every user, kept in sync with the store's change events.
+
+    Subclasses implement ``_rebuild(users)`` (from a full scan),
+    ``_put(key, user)`` (one user re-read from the store, ``None`` if gone)
+    and ``_apply(kind, key, payload)`` (apply one change event in place;
+    return False to have the user re-read instead).
+
+    The store calls listeners while holding its own mutex, so the store is
+    never read while ``self._lock`` is held: that would take the two locks
+    in the opposite order and deadlock against a concurrent writer. Reads
+    happen unlocked and the result is swapped in afterwards; users that
+    changed while a read was in flight are read again.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()  # one reader at a time; never taken by listeners
+        self._dirty = set()
+        self._stale = True
+        self._resets = 0
+        self._touched = None               # keys changed during an unlocked read
+        store.add_listener(self._on_change)
+
+    def _on_change(self, events):
+        with self._lock:
+            for kind, key, payload in events:
+                if kind == "reset":
+                    self._stale = True
+                    self._resets += 1
+                    self._dirty.clear()
+                    continue
+                if self._touched is not None:
+                    self._touched.add(key)
+                if self._stale:
+                    continue
+                if key in self._dirty or not self._apply(kind, key, payload):
+                    self._dirty.add(key)
+
+    def _sync(self):
+        self.store.refresh()
+        with self._sync_lock:
+            while True:
+                with self._lock:
+                    if not self._stale and not self._dirty:
+                        return
+                    stale, resets, keys = self._stale, self._resets, set(self._dirty)
+                    self._touched = set()
+                try:
+                    if stale:
+                        fetched = list(self.store.iter_users())
+                    else:
+                        fetched = [(key, self.store.get_user(key)) for key in keys]
+                except BaseException:
+                    with self._lock:
+                        self._touched = None
+                    raise
+                with self._lock:
+                    touched, self._touched = self._touched, None
+                    if self._resets != resets:
+                        continue  # the store was reset mid-read; start over
+                    if stale:
+                        self._rebuild(fetched)
+                        self._stale = False
+                        self._dirty |= touched
+                    else:
+                        for key, user in fetched:
+                            self._put(key, user)
+                        self._dirty -= keys - touched
@@ -0,0 +1,182 @@
+import os
+import time
+import threading
+import cProfile
+import itertools
+from contextlib import contextmanager
+from functools import wraps
+
+# Prometheus' default latency buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# makes profile dump names unique within a process (the pid covers the rest)
+_profile_seq = itertools.count(1)
+
+
+def _label_str(labels):
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + body + "}"
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """In-process latency histograms rendered in the Prometheus text format.
+
+    Metrics are per process: under gunicorn every worker keeps and exposes
+    its own numbers, which the scraper aggregates.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self.buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels):
+        """Decorator form of ``timer``."""
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def render(self):
+        with self._lock:
+            items = sorted(
+                (name, labels, list(h.counts), h.sum, h.count) for (name, labels), h in self._histograms.items()
+            )
+        lines, seen = [], set()
+        for name, labels, counts, total, count in items:
+            if name not in seen:
+                seen.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_label_str(labels + (('le', repr(float(bound))),))} {cumulative}")
+            lines.append(f"{name}_bucket{_label_str(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_label_str(labels)} {total!r}")
+            lines.append(f"{name}_count{_label_str(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.describe("http_request_duration_seconds", "Request latency by route, method and status.")
+metrics.describe("store_operation_seconds", "Time spent in user store operations.")
+metrics.describe("json_seconds", "JSON request parsing and response serialization.")
+metrics.describe("template_render_seconds", "Jinja template rendering time.")
+
+
+def _make_json_provider(base, registry):
+    class TimedJSONProvider(base):
+        def loads(self, s, **kwargs):
+            with registry.timer("json_seconds", op="loads"):
+                return super().loads(s, **kwargs)
+
+        def dumps(self, obj, **kwargs):
+            with registry.timer("json_seconds", op="dumps"):
+                return super().dumps(obj, **kwargs)
+
+    return TimedJSONProvider
+
+
+def init_app(app, registry=metrics, profile_dir=None):
+    """Instrument ``app`` and register ``/metrics``.
+
+    Request latency is labelled with the matched URL rule, so path
+    parameters do not explode the label set. Templates are timed through
+    Flask's render signals and JSON through the app's JSON provider.
+
+    Profiling is opt-in: when ``PROFILE_TOKEN`` is set, a request carrying
+    ``X-Profile: <token>`` runs under cProfile and the stats are written to
+    ``profile_dir`` (named in the ``X-Profile-File`` response header).
+    """
+    from flask import Response, g, request, before_render_template, template_rendered
+
+    app.json = _make_json_provider(type(app.json), registry)(app)
+    profile_token = os.environ.get("PROFILE_TOKEN")
+    profile_dir = profile_dir or os.path.join(app.root_path, "profiles")
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+        if profile_token and request.headers.get("X-Profile") == profile_token:
+            g._profiler = cProfile.Profile()
+            g._profiler.enable()
+
+    @app.after_request
+    def _record(response):
+        profiler = g.pop("_profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            name = (f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint or 'unknown'}"
+                    f"-{os.getpid()}-{next(_profile_seq)}.prof")
+            profiler.dump_stats(os.path.join(profile_dir, name))
+            response.headers["X-Profile-File"] = name
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            registry.observe("http_request_duration_seconds", time.perf_counter() - start,
+                             route=route, method=request.method, status=response.status_code)
+        return response
+
+    def _template_started(sender, template, context, **extra):
+        g.setdefault("_template_starts", []).append(time.perf_counter())
+
+    def _template_done(sender, template, context, **extra):
+        starts = g.get("_template_starts")
+        if starts:
+            registry.observe("template_render_seconds", time.perf_counter() - starts.pop(),
+                             template=template.name or "<string>")
+
+    before_render_template.connect(_template_started, app, weak=False)
+    template_rendered.connect(_template_done, app, weak=False)
+
+    @app.route("/metrics")
+    def prometheus_metrics():
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+    return registry
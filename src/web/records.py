@@ -0,0 +1,245 @@
+import io
+import csv
+import json
+from datetime import datetime
+from src.web.aggregates import SUBJECTS
+
+# -----------------------------
+# Recommendations / Badges / Points
+# -----------------------------
+RECOMMENDATIONS = {
+    "Math": "Practice problem sets daily; revisit formulas and attempt past papers.",
+    "Reading": "Read editorials and short stories; summarize in your own words.",
+    "Writing": "Draft structured paragraphs; focus on grammar and clarity.",
+    "English": "Improve vocabulary and grammar with short daily exercises.",
+    "Computer": "Revise basics; build tiny programs or logic puzzles.",
+    "Science": "Strengthen fundamentals; learn via concept maps and experiments.",
+    "Social": "Create timelines/maps; revise key events and civics topics."
+}
+
+def make_recommendation(weakest_list, hours):
+    if not weakest_list:
+        base = "Great work! Keep practicing to maintain consistency."
+    else:
+        base = "; ".join(RECOMMENDATIONS.get(w, "Practice regularly.") for w in weakest_list)
+    if hours < 2:
+        return f"{base} You’re studying <2 hrs/day — try to increase consistent study time."
+    if hours >= 6:
+        return f"{base} You’re studying a lot — focus on targeted practice & mock tests."
+    return base
+
+def badge_for_percentage(p):
+    if p >= 85:
+        return "🏅 Gold"
+    if p >= 70:
+        return "🥈 Silver"
+    if p >= 55:
+        return "🥉 Bronze"
+    return "🎯 Starter"
+
+def clamp_scores(scores):
+    return {k: max(0, min(100, int(v))) for k, v in scores.items()}
+
+def compute_percentage(scores):
+    return round(sum(scores.values()) / len(scores), 2) if scores else 0.0
+
+def compute_points(prev_pct, new_pct):
+    if new_pct > prev_pct:
+        delta = new_pct - prev_pct
+        if delta >= 10:
+            return 20
+        if delta >= 5:
+            return 14
+        return 10
+    return 2
+
+def compute_subject_deltas(prev_scores, new_scores):
+    deltas = {}
+    for s in SUBJECTS:
+        prev = prev_scores.get(s, 0) if prev_scores else 0
+        deltas[s] = new_scores.get(s, 0) - prev
+    return deltas
+
+def build_record(scores, hours, prev_record=None, timestamp=None):
+    """One score submission as stored in ``records``, plus the points it earns.
+
+    ``prev_record`` is the user's latest record (or None); submissions for
+    the same user must be built in order.
+    """
+    scores = clamp_scores(scores)
+    percentage = compute_percentage(scores)
+    weakest_val = min(scores.values())
+    weakest_subjects = sorted([s for s, v in scores.items() if v == weakest_val])
+
+    prev_pct = prev_record["percentage"] if prev_record else 0
+    prev_scores = prev_record["scores"] if prev_record else {}
+    record = {
+        "timestamp": timestamp or datetime.utcnow().isoformat(timespec="seconds"),
+        "hours": hours,
+        "scores": scores,
+        "percentage": percentage,
+        "weakest_subjects": weakest_subjects,
+        "recommendation": make_recommendation(weakest_subjects, hours),
+        "badge": badge_for_percentage(percentage),
+        "deltas": compute_subject_deltas(prev_scores, scores)
+    }
+    return record, compute_points(prev_pct, percentage)
+
+def rebase_record(record, prev_record):
+    """``record`` rebuilt on top of ``prev_record``; the ``rebase`` hook of ``store.append_records``."""
+    return build_record(record["scores"], record["hours"], prev_record, record["timestamp"])
+
+# -----------------------------
+# Bulk import / export
+# -----------------------------
+EXPORT_COLUMNS = ("username", "timestamp", "hours", *SUBJECTS, "percentage", "badge")
+_SUBJECT_KEYS = {k: s for s in SUBJECTS for k in (s, s.lower(), f"{s.lower()}_score")}
+
+
+def _as_int(value, field):
+    if isinstance(value, bool) or value is None or value == "":
+        raise ValueError(f"{field} is required")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{field} must be an integer")
+        return int(value)
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{field} must be an integer") from None
+
+
+def read_import_rows(data, content_type="", max_rows=None):
+    """Rows of an import upload as dicts.
+
+    Accepts CSV with a header row, a JSON list (or ``{"records": [...]}``) and
+    NDJSON. The format comes from ``content_type``, falling back to sniffing
+    the first character. Raises ValueError for unreadable input.
+    """
+    if isinstance(data, bytes):
+        try:
+            data = data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValueError("upload must be UTF-8 text") from None
+    text = data.strip()
+    if not text:
+        return []
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("application/x-ndjson", "application/jsonl") or (
+            content_type != "application/json" and text[0] == "{" and "\n" in text):
+        rows = []
+        for lineno, line in enumerate(text.splitlines(), 1):
+            if line.strip():
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    raise ValueError(f"line {lineno} is not valid JSON") from None
+    elif content_type == "application/json" or text[0] in "[{":
+        try:
+            rows = json.loads(text)
+        except ValueError:
+            raise ValueError("body is not valid JSON") from None
+        if isinstance(rows, dict):
+            rows = rows.get("records")
+        if not isinstance(rows, list):
+            raise ValueError('expected a JSON list of records or {"records": [...]}')
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        rows = [{(k or "").strip(): v for k, v in row.items()} for row in reader]
+    if max_rows is not None and len(rows) > max_rows:
+        raise ValueError(f"at most {max_rows} records per import")
+    return rows
+
+
+def parse_import_row(row, default_username=None):
+    """Validate one import row; returns ``(username, scores, hours, timestamp)``.
+
+    Scores may be flat (``Math`` / ``math`` / ``math_score``) or under
+    ``scores``; all seven subjects are required. ``hours`` (or
+    ``hours_studied``) must be 0-24 and ``timestamp``, when present, ISO 8601.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("record must be an object")
+    username = row.get("username") or default_username or ""
+    if not isinstance(username, str):
+        raise ValueError("username must be a string")
+    username = username.strip()
+    if not username:
+        raise ValueError("username is required")
+
+    source = row.get("scores") if isinstance(row.get("scores"), dict) else row
+    scores = {}
+    for key, value in source.items():
+        subject = _SUBJECT_KEYS.get(key)
+        if subject is not None:
+            scores[subject] = _as_int(value, subject)
+    missing = [s for s in SUBJECTS if s not in scores]
+    if missing:
+        raise ValueError(f"missing scores for {', '.join(missing)}")
+
+    hours = _as_int(row.get("hours", row.get("hours_studied")), "hours")
+    if not 0 <= hours <= 24:
+        raise ValueError("hours must be between 0 and 24")
+
+    timestamp = row.get("timestamp") or None
+    if timestamp is not None:
+        try:
+            timestamp = datetime.fromisoformat(str(timestamp).strip()).isoformat(timespec="seconds")
+        except ValueError:
+            raise ValueError("timestamp must be ISO 8601 (e.g. 2025-01-31T09:30:00)") from None
+    return username, scores, hours, timestamp
+
+
+def build_import_batch(rows, latest_by_user):
+    """Build records for parsed rows in order, chaining deltas and points per user.
+
+    ``latest_by_user`` maps each username to its current latest record (or
+    None). Returns ``(username, record, points_gain)`` triples for
+    ``store.append_records``.
+    """
+    latest = dict(latest_by_user)
+    batch = []
+    for username, scores, hours, timestamp in rows:
+        record, points_gain = build_record(scores, hours, latest.get(username), timestamp)
+        latest[username] = record
+        batch.append((username, record, points_gain))
+    return batch
+
+
+def _chunked(lines, chunk_bytes=64 * 1024):
+    buf, size = [], 0
+    for line in lines:
+        buf.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield "".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf)
+
+
+def iter_ndjson(users):
+    """Stream ``(username, records)`` pairs as NDJSON chunks, one record per line."""
+    def lines():
+        for username, records in users:
+            for rec in records:
+                yield json.dumps(dict(rec, username=username), ensure_ascii=False) + "\n"
+    return _chunked(lines())
+
+
+def iter_csv(users):
+    """Stream ``(username, records)`` pairs as CSV chunks in ``EXPORT_COLUMNS`` order (re-importable)."""
+    def lines():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(EXPORT_COLUMNS)
+        for username, records in users:
+            for rec in records:
+                scores = rec.get("scores", {})
+                writer.writerow([username, rec.get("timestamp"), rec.get("hours"),
+                                 *(scores.get(s) for s in SUBJECTS), rec.get("percentage"), rec.get("badge")])
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        yield buf.getvalue()
+    return _chunked(lines())
@@ -0,0 +1,727 @@
+import os
+import sys
+import json
+import threading
+import argparse
+from src.web.aggregates import ensure_aggregates, fold_record
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_BACKEND = "log"
+
+
+def user_key(username):
+    return (username or "").strip().casefold()
+
+
+def _pread(fd, length, offset):
+    if hasattr(os, "pread"):
+        return os.pread(fd, length, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, length)
+
+
+def _fsync_dir(path):
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def lock_fd(fd, blocking=True):
+    """Exclusive flock/msvcrt lock on ``fd``; returns False if ``blocking`` is off and it is taken."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+    except OSError:
+        if blocking:
+            raise
+        return False
+    return True
+
+
+def unlock_fd(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """Inter-process lock on a sidecar file (flock on POSIX, msvcrt on Windows).
+
+    The descriptor is reopened after a fork so that workers never share the
+    parent's open file description (which would make flock a no-op between them).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._pid = None
+        self._depth = 0
+        self._mutex = threading.RLock()
+
+    def _ensure_fd(self):
+        if self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+            self._depth = 0
+
+    def acquire(self, blocking=True):
+        if not self._mutex.acquire(blocking):
+            return False
+        try:
+            self._ensure_fd()
+            if self._depth == 0 and not lock_fd(self._fd, blocking):
+                self._mutex.release()
+                return False
+        except BaseException:
+            self._mutex.release()
+            raise
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            unlock_fd(self._fd)
+        self._mutex.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class _Observable:
+    """Change notification shared by the store backends.
+
+    Listeners are called with a list of ``(kind, key, payload)`` events:
+    ``("user", key, None)`` when a user is created or replaced,
+    ``("record", key, {"record": ..., "points": ...})`` for an appended record
+    and ``("reset", None, None)`` when everything must be considered changed.
+    ``version`` increases with every batch of changes, including the ones
+    picked up from other processes.
+    """
+
+    def _init_listeners(self):
+        self._listeners = []
+        self.version = 0
+
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    def _notify(self, events):
+        if not events:
+            return
+        self.version += 1
+        for fn in self._listeners:
+            fn(events)
+
+
+# -----------------------------
+# Legacy backend: one users.json file
+# -----------------------------
+class JsonFileStore(_Observable):
+    """The original single-file store.
+
+    The parsed list and a case-folded index are kept per process and only
+    rebuilt when the file's inode, mtime or size changes.
+    """
+    supports_watermarks = False
+
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = FileLock(path + ".lock")
+        self._mutex = threading.RLock()
+        self._sig = None
+        self._users = []
+        self._by_key = {}
+        self._init_listeners()
+
+    def _ensure(self):
+        if not os.path.exists(self.path):
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump([], f)
+
+    def _signature(self):
+        st = os.stat(self.path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _parse(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+                return data if isinstance(data, list) else []
+            except Exception:
+                return []
+
+    def _set(self, users, sig):
+        self._users = users
+        self._by_key = {user_key(u["username"]): u for u in users}
+        self._sig = sig
+
+    def _refresh(self):
+        self._ensure()
+        sig = self._signature()
+        if sig != self._sig:
+            self._set(self._parse(), sig)
+            self._notify([("reset", None, None)])
+
+    def refresh(self):
+        with self._mutex:
+            self._refresh()
+
+    def _write(self, users, events):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(users, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._set(users, self._signature())
+        self._notify(events)
+
+    def iter_users(self):
+        with self._mutex:
+            self._refresh()
+            return iter(list(self._users))
+
+    def count(self):
+        with self._mutex:
+            self._refresh()
+            return len(self._users)
+
+    def get_user(self, username):
+        with self._mutex:
+            self._refresh()
+            user = self._by_key.get(user_key(username))
+            if user is not None:
+                ensure_aggregates(user)
+            return user
+
+    def add_user(self, user):
+        key = user_key(user["username"])
+        with self._mutex, self._lock:
+            self._ensure()
+            users = self._parse()
+            if any(user_key(u["username"]) == key for u in users):
+                return False
+            ensure_aggregates(user)
+            users.append(user)
+            self._write(users, [("user", key, None)])
+            return True
+
+    def append_record(self, username, record, points_gain, rebase=None):
+        key = user_key(username)
+        with self._mutex, self._lock:
+            self._ensure()
+            users = self._parse()
+            for u in users:
+                if user_key(u["username"]) == key:
+                    if rebase is not None:
+                        record, points_gain = rebase(record, u["records"][-1] if u.get("records") else None)
+                    agg = ensure_aggregates(u)
+                    u.setdefault("records", []).append(record)
+                    fold_record(agg, record)
+                    u["points"] = u.get("points", 0) + points_gain
+                    self._write(users, [("record", key, {"record": record, "points": points_gain})])
+                    return u
+        return None
+
+    def append_records(self, batch, rebase=None):
+        """Append ``(username, record, points_gain)`` triples with a single rewrite.
+
+        Records for unknown users are skipped; returns how many were applied.
+        ``rebase`` works as in ``LogStore.append_records``.
+        """
+        with self._mutex, self._lock:
+            self._ensure()
+            users = self._parse()
+            by_key = {user_key(u["username"]): u for u in users}
+            events = []
+            for username, record, points_gain in batch:
+                u = by_key.get(user_key(username))
+                if u is None:
+                    continue
+                if rebase is not None:
+                    record, points_gain = rebase(record, u["records"][-1] if u.get("records") else None)
+                agg = ensure_aggregates(u)
+                u.setdefault("records", []).append(record)
+                fold_record(agg, record)
+                u["points"] = u.get("points", 0) + points_gain
+                events.append(("record", user_key(username), {"record": record, "points": points_gain}))
+            if events:
+                self._write(users, events)
+            return len(events)
+
+    def sync(self):
+        pass
+
+    def replace_all(self, users):
+        users = list(users)
+        for u in users:
+            ensure_aggregates(u, rebuild=True)
+        with self._mutex, self._lock:
+            self._write(users, [("reset", None, None)])
+
+
+# -----------------------------
+# Log backend: indexed, append-only generations
+# -----------------------------
+class LogStore(_Observable):
+    """Append-only user store.
+
+    Layout of the store directory::
+
+        CURRENT            number of the live generation
+        log-000001.jsonl   one line per operation
+        LOCK / COMPACT     inter-process lock files
+
+    Each log line is ``<op>\\t<json key>\\t<json payload>``. ``U`` writes a full
+    user (profile + records + aggregates), ``R`` appends one record and its
+    points gain, folded into the user's aggregates on read. ``W`` records a
+    write-behind journal's watermark (last folded sequence number, or null
+    once the journal is gone) in the same write as the records it covers.
+    Every process keeps an in-memory index ``key -> [(offset, length), ...]``
+    and tails the log for lines written by other processes, so reads and
+    writes only touch the lines belonging to one user. Compaction folds each
+    user back into a single ``U`` line in a new generation.
+    """
+
+    supports_watermarks = True
+
+    def __init__(self, path, compact_min_bytes=1 << 20, compact_ratio=2.0, background_compaction=True):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.compact_min_bytes = compact_min_bytes
+        self.compact_ratio = compact_ratio
+        self.background_compaction = background_compaction
+        self._current_path = os.path.join(path, "CURRENT")
+        self._lock = FileLock(os.path.join(path, "LOCK"))
+        self._compact_lock = FileLock(os.path.join(path, "COMPACT"))
+        self._mutex = threading.RLock()
+        self._pid = None
+        self._fd = None
+        self._gen = None
+        self._offset = 0
+        self._base_size = 0
+        self._index = {}
+        self._watermarks = {}
+        self._compacting = False
+        self._init_listeners()
+
+    # ---- files ----
+    def _log_path(self, gen):
+        return os.path.join(self.path, f"log-{gen:06d}.jsonl")
+
+    def _read_current(self):
+        try:
+            with open(self._current_path, "r", encoding="ascii") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _write_current(self, gen):
+        tmp = f"{self._current_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="ascii") as f:
+            f.write(str(gen))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._current_path)
+        _fsync_dir(self.path)
+
+    def is_empty(self):
+        return self._read_current() == 0
+
+    # ---- index maintenance ----
+    def _scan(self, data, base, events=None):
+        index = self._index
+        pos = 0
+        while True:
+            nl = data.find(b"\n", pos)
+            if nl < 0:
+                break
+            tab = data.find(b"\t", pos + 2)
+            key = json.loads(data[pos + 2:tab])
+            entry = (base + pos, nl - pos)
+            op = data[pos:pos + 1]
+            if op == b"U":
+                index[key] = [entry]
+                if events is not None:
+                    events.append(("user", key, None))
+            elif op == b"R":
+                entries = index.get(key)
+                if entries is not None:
+                    entries.append(entry)
+                    if events is not None:
+                        events.append(("record", key, json.loads(data[tab + 1:nl])))
+            elif op == b"W":
+                seq = json.loads(data[tab + 1:nl])
+                if seq is None:
+                    self._watermarks.pop(key, None)
+                else:
+                    self._watermarks[key] = seq
+            pos = nl + 1
+        return pos
+
+    def _load_generation(self, gen):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._index = {}
+        self._watermarks = {}
+        self._gen = gen
+        self._offset = 0
+        self._base_size = 0
+        if gen:
+            self._fd = os.open(self._log_path(gen), os.O_RDWR | os.O_APPEND)
+            self._tail(notify=False)
+            self._base_size = self._offset
+        self._notify([("reset", None, None)])
+
+    def _tail(self, notify=True):
+        size = os.fstat(self._fd).st_size
+        if size > self._offset:
+            data = _pread(self._fd, size - self._offset, self._offset)
+            events = [] if notify and self._listeners else None
+            self._offset += self._scan(data, self._offset, events)
+            if notify:
+                self._notify(events if events is not None else [("reset", None, None)])
+
+    def _refresh(self):
+        if self._pid != os.getpid():
+            # never reuse descriptors inherited across fork, but keep the index:
+            # it is still valid for the same generation, so workers forked from a
+            # preloaded master only tail what was appended since
+            self._pid = os.getpid()
+            if self._fd is not None:
+                try:
+                    os.close(self._fd)
+                except OSError:
+                    pass
+                self._fd = None
+            if self._gen:
+                try:
+                    self._fd = os.open(self._log_path(self._gen), os.O_RDWR | os.O_APPEND)
+                except FileNotFoundError:
+                    self._gen = None  # compacted away since: reload
+        while True:
+            gen = self._read_current()
+            try:
+                if gen != self._gen:
+                    self._load_generation(gen)
+                elif self._fd is not None:
+                    self._tail()
+                return
+            except FileNotFoundError:
+                # generation was compacted away between reading CURRENT and opening it
+                self._gen = None
+                continue
+
+    def refresh(self):
+        with self._mutex:
+            self._refresh()
+
+    # ---- reads ----
+    def _materialize(self, entries, fd):
+        user = None
+        for offset, length in entries:
+            line = _pread(fd, length, offset)
+            payload = json.loads(line[line.index(b"\t", 2) + 1:])
+            if line[:1] == b"U":
+                user = payload
+                user.setdefault("records", [])
+                ensure_aggregates(user)
+            elif user is not None:
+                user["records"].append(payload["record"])
+                fold_record(user["aggregates"], payload["record"])
+                user["points"] = user.get("points", 0) + payload["points"]
+        return user
+
+    def _latest_record(self, key):
+        # only the last line matters: an R line carries the record, a U line the full list
+        offset, length = self._index[key][-1]
+        line = _pread(self._fd, length, offset)
+        payload = json.loads(line[line.index(b"\t", 2) + 1:])
+        if line[:1] == b"R":
+            return payload["record"]
+        records = payload.get("records")
+        return records[-1] if records else None
+
+    def get_user(self, username):
+        with self._mutex:
+            self._refresh()
+            entries = self._index.get(user_key(username))
+            if not entries:
+                return None
+            return self._materialize(entries, self._fd)
+
+    def count(self):
+        with self._mutex:
+            self._refresh()
+            return len(self._index)
+
+    def iter_users(self):
+        with self._mutex:
+            self._refresh()
+            keys = list(self._index)
+        for key in keys:
+            user = self.get_user(key)
+            if user is not None:
+                yield user
+
+    # ---- writes ----
+    @staticmethod
+    def _encode(op, key, payload):
+        return (
+            op + "\t" + json.dumps(key) + "\t"
+            + json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n"
+        ).encode("utf-8")
+
+    def _append(self, lines):
+        with self._mutex, self._lock:
+            self._refresh()
+            if self._gen == 0:
+                self._write_generation([])
+            if os.fstat(self._fd).st_size != self._offset:
+                # torn tail left by a crashed writer
+                os.ftruncate(self._fd, self._offset)
+            os.write(self._fd, b"".join(lines))
+            self._tail()
+        self._maybe_compact()
+
+    def add_user(self, user):
+        key = user_key(user["username"])
+        with self._mutex, self._lock:
+            self._refresh()
+            if key in self._index:
+                return False
+            user = dict(user)
+            user.setdefault("records", [])
+            ensure_aggregates(user)
+            self._append([self._encode("U", key, user)])
+        return True
+
+    def append_record(self, username, record, points_gain, rebase=None):
+        key = user_key(username)
+        with self._mutex, self._lock:
+            self._refresh()
+            if key not in self._index:
+                return None
+            if rebase is not None:
+                record, points_gain = rebase(record, self._latest_record(key))
+            self._append([self._encode("R", key, {"record": record, "points": points_gain})])
+            return self._materialize(self._index[key], self._fd)
+
+    def append_records(self, batch, watermark=None, rebase=None):
+        """Append ``(username, record, points_gain)`` triples in one write.
+
+        ``watermark=(journal_id, seq)`` is written in the same write, so a
+        journal replay can tell exactly which of its entries already landed.
+        Records for unknown users are skipped; returns how many were applied.
+
+        ``rebase(record, prev_record) -> (record, points_gain)`` re-derives
+        each record against the user's real latest record, read under the
+        store lock, so fields chained off the previous submission (deltas,
+        points) stay right when the caller's view of the user was stale.
+        """
+        with self._mutex, self._lock:
+            self._refresh()
+            lines = []
+            latest = {}
+            for username, record, points_gain in batch:
+                key = user_key(username)
+                if key in self._index:
+                    if rebase is not None:
+                        prev = latest[key] if key in latest else self._latest_record(key)
+                        record, points_gain = rebase(record, prev)
+                        latest[key] = record
+                    lines.append(self._encode("R", key, {"record": record, "points": points_gain}))
+            applied = len(lines)
+            if watermark is not None:
+                lines.append(self._encode("W", watermark[0], watermark[1]))
+            if lines:
+                self._append(lines)
+            return applied
+
+    def watermark(self, journal_id):
+        with self._mutex:
+            self._refresh()
+            return self._watermarks.get(journal_id, 0)
+
+    def drop_watermark(self, journal_id):
+        with self._mutex, self._lock:
+            self._refresh()
+            if journal_id in self._watermarks:
+                self._append([self._encode("W", journal_id, None)])
+
+    def sync(self):
+        """fsync the live generation (appends themselves are not fsynced)."""
+        with self._mutex:
+            self._refresh()
+            if self._fd is not None:
+                os.fsync(self._fd)
+
+    def replace_all(self, users):
+        users = list(users)
+        for u in users:
+            ensure_aggregates(u, rebuild=True)
+        with self._mutex, self._lock:
+            self._refresh()
+            self._write_generation(users)
+
+    def _prepare_generation(self, tmp, users, watermarks=None):
+        with open(tmp, "wb") as f:
+            for u in users:
+                f.write(self._encode("U", user_key(u["username"]), u))
+            for journal_id, seq in (watermarks or {}).items():
+                f.write(self._encode("W", journal_id, seq))
+
+    def _publish_generation(self, tmp, tail=b""):
+        # caller holds self._lock
+        gen = max(self._gen or 0, self._read_current()) + 1
+        with open(tmp, "ab") as f:
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._log_path(gen))
+        old = self._gen
+        self._write_current(gen)
+        self._load_generation(gen)
+        if old:
+            try:
+                os.remove(self._log_path(old))
+            except OSError:
+                pass
+
+    def _write_generation(self, users):
+        tmp = os.path.join(self.path, f"log-{os.getpid()}.tmp")
+        self._prepare_generation(tmp, users, self._watermarks)
+        self._publish_generation(tmp)
+
+    # ---- compaction ----
+    def _maybe_compact(self):
+        if not self.background_compaction or self._compacting:
+            return
+        if self._offset < max(self.compact_min_bytes, self.compact_ratio * self._base_size):
+            return
+        self._compacting = True
+        threading.Thread(target=self._compact_in_background, daemon=True).start()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except Exception:
+            pass
+        finally:
+            self._compacting = False
+
+    def compact(self):
+        """Rewrite the live generation with one ``U`` line per user.
+
+        Users are materialized from a private descriptor without holding the
+        store lock; only the bytes appended meanwhile are copied over under the
+        lock, so writers in other processes are blocked for a short time only.
+        """
+        if not self._compact_lock.acquire(blocking=False):
+            return False
+        tmp = os.path.join(self.path, f"compact-{os.getpid()}.tmp")
+        try:
+            with self._mutex:
+                self._refresh()
+                if not self._gen:
+                    return False
+                gen, end = self._gen, self._offset
+                snapshot = [list(entries) for entries in self._index.values()]
+                watermarks = dict(self._watermarks)
+            fd = os.open(self._log_path(gen), os.O_RDONLY)
+            try:
+                users = (self._materialize(entries, fd) for entries in snapshot)
+                self._prepare_generation(tmp, (u for u in users if u is not None), watermarks)
+                with self._mutex, self._lock:
+                    self._refresh()
+                    if self._gen != gen:
+                        return False
+                    tail = _pread(fd, self._offset - end, end) if self._offset > end else b""
+                    self._publish_generation(tmp, tail)
+            finally:
+                os.close(fd)
+            return True
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            self._compact_lock.release()
+
+
+# -----------------------------
+# Factory / migration
+# -----------------------------
+def migrate_json_store(json_path, store):
+    """One-shot import of a legacy users.json list into ``store``."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        users = json.load(f)
+    if not isinstance(users, list):
+        users = []
+    seen = set()
+    unique = []
+    for u in users:
+        key = user_key(u.get("username"))
+        if key and key not in seen:
+            seen.add(key)
+            u.setdefault("records", [])
+            unique.append(u)
+    store.replace_all(unique)
+    return len(unique)
+
+
+def open_store(data_dir, backend=None):
+    backend = backend or os.environ.get("USER_STORE_BACKEND", DEFAULT_BACKEND)
+    users_file = os.path.join(data_dir, "users.json")
+    if backend == "json":
+        return JsonFileStore(users_file)
+    if backend != "log":
+        raise ValueError(f"Unknown user store backend: {backend}")
+
+    store = LogStore(os.path.join(data_dir, "store"))
+    if store.is_empty() and os.path.exists(users_file):
+        with store._lock:
+            if store.is_empty():
+                migrate_json_store(users_file, store)
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="User store maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    mig = sub.add_parser("migrate", help="import a legacy users.json into a log store")
+    mig.add_argument("--json", required=True, help="path of the legacy users.json")
+    mig.add_argument("--store", required=True, help="log store directory")
+    comp = sub.add_parser("compact", help="compact a log store")
+    comp.add_argument("--store", required=True, help="log store directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        store = LogStore(args.store, background_compaction=False)
+        n = migrate_json_store(args.json, store)
+        print(f"Migrated {n} users into {args.store}")
+    elif args.command == "compact":
+        LogStore(args.store, background_compaction=False).compact()
+        print(f"Compacted {args.store}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
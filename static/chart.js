@@ -5,9 +5,39 @@ document.addEventListener("DOMContentLoaded", () => {
 
   if (!trendCtx && !subjectCtx && !avgCtx) return;
 
-  fetch("/records/chart-data")
-    .then((res) => res.json())
+  // Attempts already fetched are kept in sessionStorage; only newer ones are requested.
+  const cacheKey = `chartData:${document.body.dataset.user || ""}`;
+
+  const loadCached = () => {
+    try {
+      return JSON.parse(sessionStorage.getItem(cacheKey)) || [];
+    } catch (e) {
+      return [];
+    }
+  };
+
+  const fetchPoints = (since) =>
+    fetch(`/records/chart-data?since=${since}`).then((res) =>
+      res.json().then((points) => ({
+        points,
+        total: parseInt(res.headers.get("X-Total-Count") || "0", 10),
+      }))
+    );
+
+  const cached = loadCached();
+
+  fetchPoints(cached.length)
+    .then(({ points, total }) => {
+      if (cached.length + points.length === total) return cached.concat(points);
+      // history changed underneath us; start over
+      return fetchPoints(0).then((full) => full.points);
+    })
     .then((data) => {
+      try {
+        sessionStorage.setItem(cacheKey, JSON.stringify(data));
+      } catch (e) {
+        // storage full or disabled: charts still render
+      }
       if (!data || data.length === 0) return;
 
       // -------- Trend Chart (Overall Percentage) --------
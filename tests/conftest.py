@@ -0,0 +1,80 @@
+import os
+import uuid
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from src.web.storage import LogStore
+from src.web.records import build_record
+from src.web.aggregates import SUBJECTS
+from src.components.schema import FEATURE_CATEGORIES, FEATURE_COLS, TARGET_COLS
+
+
+def make_user(username):
+    return {"username": username, "name": username.title(), "roll": "-", "password": "x", "records": []}
+
+
+def make_record(score, hours=2):
+    scores = {s: score for s in SUBJECTS}
+    return build_record(scores, hours)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LogStore(str(tmp_path / "store"), background_compaction=False)
+    for i in range(20):
+        store.add_user(make_user(f"student{i:02d}"))
+    return store
+
+
+def start_writer(store, stop, rounds=200):
+    """A daemon thread appending records for student00..19 until ``stop`` is set."""
+    def run():
+        for i in range(rounds):
+            if stop.is_set():
+                return
+            record, points = make_record(40 + i % 60)
+            store.append_records([(f"student{i % 20:02d}", record, points)])
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """The Flask app module, imported once against a temporary data directory."""
+    root = tmp_path_factory.mktemp("app")
+    os.environ.update(APP_DATA_DIR=str(root / "data"), APP_ARTIFACTS_DIR=str(root / "artifacts"),
+                      LOG_DIR=str(root / "logs"))
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    """A test client logged in as a fresh user; the username is ``client.username``."""
+    username = f"user{uuid.uuid4().hex[:8]}"
+    app_module.store.add_user(make_user(username))
+    client = app_module.app.test_client()
+    client.post("/login", data={"username": username, "password": "x"})
+    client.username = username
+    return client
+
+
+@pytest.fixture(scope="session")
+def training_frame():
+    """400 synthetic students: every feature category, targets that depend on a few of them."""
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame({col: rng.choice(FEATURE_CATEGORIES[col], n) for col in FEATURE_COLS})
+    base = 50 + 10 * (df["lunch"] == "standard") + 8 * (df["test_preparation_course"] == "completed")
+    for col in TARGET_COLS:
+        df[col] = (base + rng.normal(0, 8, n)).clip(0, 100).round()
+    return df
+
+
+@pytest.fixture(scope="session")
+def preprocessor(training_frame):
+    """The training pipeline's (one-hot) preprocessor, fitted on ``training_frame``."""
+    from src.components.data_transformation import DataTransformation
+    return DataTransformation().get_preprocessor_object().fit(training_frame[FEATURE_COLS])
@@ -0,0 +1,36 @@
+from conftest import make_record
+from src.web.aggregates import build_aggregates, empty_aggregates, fold_record, subject_averages, chart_points
+
+
+def _records(*scores):
+    return [make_record(s)[0] for s in scores]
+
+
+def test_folding_matches_a_full_rebuild():
+    records = _records(40, 75, 62)
+    agg = empty_aggregates()
+    for record in records:
+        fold_record(agg, record)
+    assert agg == build_aggregates(records)
+    assert agg["count"] == 3
+    assert subject_averages(agg)["Math"] == round((40 + 75 + 62) / 3, 2)
+
+
+def test_chart_points_since_and_limit():
+    agg = build_aggregates(_records(10, 20, 30, 40, 50))
+    assert [p["percentage"] for p in chart_points(agg)] == [10, 20, 30, 40, 50]
+    assert [p["percentage"] for p in chart_points(agg, since=3)] == [40, 50]
+    assert [p["percentage"] for p in chart_points(agg, since=1, limit=2)] == [20, 30]
+    assert chart_points(agg, since=5) == []
+
+
+def test_chart_data_route(app_module, client):
+    batch = [(client.username, *make_record(score)) for score in (55, 65, 75, 85)]
+    app_module.store.append_records(batch)
+
+    resp = client.get("/records/chart-data?since=1&limit=2")
+    assert resp.headers["X-Total-Count"] == "4"
+    assert [p["percentage"] for p in resp.get_json()] == [65, 75]
+    assert len(client.get("/records/chart-data?since=-3").get_json()) == 4  # clamped to 0
+    assert client.get("/records/chart-data?since=99").get_json() == []
+    assert len(client.get("/records/chart-data?limit=-1").get_json()) == 0
@@ -0,0 +1,41 @@
+import os
+from conftest import make_record
+from src.web.cache import UserCache
+from src.web.storage import LogStore
+
+
+def test_hits_until_the_user_changes(store):
+    cache = UserCache(store)
+    first = cache.get("Student00")
+    assert cache.get("student00") is first  # keys are case-folded
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    record, points = make_record(64)
+    store.append_record("student00", record, points)
+    fresh = cache.get("student00")
+    assert fresh is not first and fresh["records"] == [record]
+    assert cache.stats()["invalidations"] == 1
+    assert cache.get("student01") is not None and cache.stats()["size"] == 2
+
+
+def test_writes_from_another_process_invalidate(store):
+    cache = UserCache(store)
+    assert cache.get("student05")["records"] == []
+    record, points = make_record(81)
+    pid = os.fork()
+    if pid == 0:
+        LogStore(store.path, background_compaction=False).append_record("student05", record, points)
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert cache.get("student05")["records"] == [record]
+
+
+def test_compaction_resets_and_lru_evicts(store):
+    cache = UserCache(store, maxsize=3)
+    for i in range(5):
+        cache.get(f"student{i:02d}")
+    assert cache.stats()["size"] == 3
+    store.compact()
+    assert cache.stats()["size"] == 0
+    assert cache.get("student04")["username"] == "student04"
+    assert cache.get("nobody") is None and cache.stats()["size"] == 1
@@ -0,0 +1,60 @@
+from conftest import make_record
+from src.web.cohort import Cohort
+
+
+def _scores(value):
+    return make_record(value)[0]["scores"]
+
+
+def _submit(store, username, value):
+    store.append_record(username, *make_record(value))
+
+
+def test_empty_cohort(store):
+    cohort = Cohort(store)
+    assert len(cohort) == 0  # registered users without records do not count
+    math = cohort.standing(_scores(60))["subjects"]["Math"]
+    assert math["percentile"] is None and math["rank"] == 1
+    # a student counted at their in-flight scores makes a cohort of one
+    me = cohort.standing(_scores(60), username="student00")
+    assert me["students"] == 1 and me["subjects"]["Math"]["percentile"] == 50.0
+    summary = cohort.summary()
+    assert summary["students"] == 0 and summary["correlations"] is None
+    assert summary["subjects"]["Math"]["mean"] is None
+
+
+def test_ties_count_half_and_rank_below_strictly_better(store):
+    for username, value in [("student00", 50), ("student01", 50), ("student02", 70), ("student03", 90)]:
+        _submit(store, username, value)
+    cohort = Cohort(store)
+    math = cohort.standing(_scores(50))["subjects"]["Math"]
+    assert (math["percentile"], math["rank"]) == (25.0, 3)
+    assert cohort.standing(_scores(100))["subjects"]["Math"] == {"score": 100, "percentile": 100.0, "rank": 1}
+    assert cohort.standing(_scores(0))["subjects"]["Math"]["percentile"] == 0.0
+
+
+def test_member_is_moved_not_counted_twice(store):
+    for username, value in [("student00", 50), ("student01", 50), ("student02", 70), ("student03", 90)]:
+        _submit(store, username, value)
+    cohort = Cohort(store)
+    me = cohort.standing(_scores(90), username="student00")
+    assert me["students"] == 4
+    assert (me["subjects"]["Math"]["percentile"], me["subjects"]["Math"]["rank"]) == (75.0, 1)
+
+    # once the submission lands, the stored standing agrees with the virtual one
+    _submit(store, "student00", 90)
+    assert cohort.standing(_scores(90), username="student00") == me
+    assert cohort.standing(_scores(90)) == Cohort(store).standing(_scores(90))
+
+
+def test_summary_follows_new_records(store):
+    _submit(store, "student00", 50)
+    cohort = Cohort(store)
+    assert cohort.summary()["correlations"] is None  # needs two students
+    _submit(store, "student01", 70)
+    summary = cohort.summary()
+    assert summary["students"] == 2
+    assert summary["subjects"]["Math"] == {"mean": 60.0, "median": 60.0, "std": 10.0, "min": 50.0, "max": 70.0}
+    assert summary["correlations"]["Math"]["Reading"] == 1.0
+    _submit(store, "student00", 90)
+    assert cohort.summary()["subjects"]["Math"]["mean"] == 80.0
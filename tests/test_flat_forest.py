@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+from sklearn.multioutput import MultiOutputRegressor
+from src.components.flat_forest import FlatForest
+from src.components.schema import FEATURE_COLS, TARGET_COLS
+from src.utils import predict_targets, save_object, load_object
+
+FORESTS = {
+    "random_forest": lambda: RandomForestRegressor(n_estimators=8, max_depth=8, random_state=0),
+    "extra_trees": lambda: ExtraTreesRegressor(n_estimators=8, random_state=0),
+    "multioutput": lambda: MultiOutputRegressor(RandomForestRegressor(n_estimators=4, random_state=0)),
+}
+
+
+@pytest.mark.parametrize("name", sorted(FORESTS))
+def test_flat_forest_matches_the_sklearn_forest(name, training_frame, preprocessor):
+    X = preprocessor.transform(training_frame[FEATURE_COLS])
+    model = FORESTS[name]().fit(X, training_frame[TARGET_COLS].to_numpy())
+    flat = FlatForest.from_model(model)
+    assert np.allclose(flat.predict(X), predict_targets(model, X))
+
+
+def test_flat_artifact_round_trip(tmp_path, training_frame, preprocessor):
+    X = preprocessor.transform(training_frame[FEATURE_COLS])
+    model = FORESTS["random_forest"]().fit(X, training_frame[TARGET_COLS].to_numpy())
+    path = str(tmp_path / "model.pkl")
+    save_object(path, model, fmt="flat")
+    loaded = load_object(path)
+    assert isinstance(loaded, FlatForest)
+    assert np.allclose(predict_targets(loaded, X), predict_targets(model, X))
@@ -0,0 +1,85 @@
+import os
+from conftest import make_record
+from src.web.journal import WriteBehindJournal
+from src.web.storage import LogStore
+from src.web.records import build_record, compute_points, rebase_record
+
+
+def test_fold_rebases_on_records_folded_by_another_worker(store, tmp_path):
+    journal = WriteBehindJournal(store, str(tmp_path / "journal"), rebase=rebase_record)
+    try:
+        # this worker built its record before seeing the one another worker just folded
+        stale, stale_points = make_record(70)
+        other, other_points = make_record(50)
+        store.append_records([("student00", other, other_points)])
+
+        journal.submit("student00", stale, stale_points)
+        journal.flush()
+    finally:
+        journal.close()
+
+    user = store.get_user("student00")
+    latest = user["records"][-1]
+    assert [r["percentage"] for r in user["records"]] == [50, 70]
+    assert set(latest["deltas"].values()) == {20}
+    assert user["points"] == other_points + compute_points(50, 70)
+
+
+def test_append_records_rebase_chains_within_a_batch(store):
+    store.append_records([("student01", *make_record(40))])
+    scores = make_record(60)[0]["scores"]
+    batch = [("student01", build_record(scores, 2)[0], 0), ("student01", build_record(scores, 2)[0], 0)]
+    assert store.append_records(batch, rebase=rebase_record) == 2
+    records = store.get_user("student01")["records"]
+    assert [set(r["deltas"].values()) for r in records[1:]] == [{20}, {0}]
+
+
+def _crash_after(store, journal_dir, submit_scores, fold_after=None, torn_tail=b""):
+    """In a forked worker: journal the submissions (folding the first ``fold_after``), then die without cleanup."""
+    pid = os.fork()
+    if pid == 0:
+        worker_store = LogStore(store.path, background_compaction=False)
+        journal = WriteBehindJournal(worker_store, journal_dir, fold_interval=3600, recover_interval=3600)
+        for i, score in enumerate(submit_scores):
+            journal.submit("student07", *make_record(score))
+            if i + 1 == fold_after:
+                journal.flush()
+        if torn_tail:
+            os.write(journal._fd, torn_tail)
+        os._exit(0)  # kill -9: no fold, no atexit, the journal file stays behind
+    os.waitpid(pid, 0)
+
+
+def test_recover_replays_a_dead_workers_journal(store, tmp_path):
+    journal_dir = str(tmp_path / "journal")
+    _crash_after(store, journal_dir, [50, 60, 70], torn_tail=b'{"seq":4,"user":"student07"')
+    assert store.get_user("student07")["records"] == []
+    assert len(os.listdir(journal_dir)) == 1
+
+    journal = WriteBehindJournal(store, journal_dir)
+    assert journal.recover() == 3  # the torn, never-acknowledged line is ignored
+    assert [r["percentage"] for r in store.get_user("student07")["records"]] == [50, 60, 70]
+    assert os.listdir(journal_dir) == []
+    assert journal.recover() == 0
+
+
+def test_watermark_prevents_double_apply(store, tmp_path):
+    journal_dir = str(tmp_path / "journal")
+    _crash_after(store, journal_dir, [50, 60, 70, 80], fold_after=2)
+    assert [r["percentage"] for r in store.get_user("student07")["records"]] == [50, 60]
+
+    assert WriteBehindJournal(store, journal_dir).recover() == 2
+    assert [r["percentage"] for r in store.get_user("student07")["records"]] == [50, 60, 70, 80]
+
+
+def test_recover_skips_journals_of_live_workers(store, tmp_path):
+    journal_dir = str(tmp_path / "journal")
+    live = WriteBehindJournal(store, journal_dir, fold_interval=3600)
+    try:
+        live.submit("student08", *make_record(40))
+        other = WriteBehindJournal(LogStore(store.path, background_compaction=False), journal_dir)
+        assert other.recover() == 0  # still flock-ed by its owner
+        assert store.get_user("student08")["records"] == []
+    finally:
+        live.close()
+    assert len(store.get_user("student08")["records"]) == 1
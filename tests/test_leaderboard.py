@@ -0,0 +1,51 @@
+from conftest import make_record
+from src.web.leaderboard import Leaderboard
+from src.web.records import rebase_record
+
+
+def _submit(store, username, *scores):
+    for score in scores:
+        prev = store.get_user(username)["records"]
+        record, points = make_record(score)
+        if prev:  # chain points off the previous submission, as the app does
+            record, points = rebase_record(record, prev[-1])
+        store.append_record(username, record, points)
+
+
+def _names(rows):
+    return [r["name"] for r in rows]
+
+
+def test_orders_by_average_then_points_then_registration(store):
+    board = Leaderboard(store)
+    _submit(store, "student01", 80)
+    _submit(store, "student00", 80)        # same average and points as student01, registered first
+    _submit(store, "student02", 70, 90)    # average 80 as well, but more points
+    _submit(store, "student03", 95)
+    rows, total = board.page()
+    assert total == 4  # users without records are not ranked
+    assert _names(rows) == ["Student03", "Student02", "Student00", "Student01"]
+    assert [r["rank"] for r in rows] == [1, 2, 3, 4]
+    assert rows[1]["avg"] == 80.0 and rows[1]["points"] > rows[2]["points"]
+    assert board.page() == Leaderboard(store).page()
+
+
+def test_pagination_keeps_absolute_ranks(store):
+    for i in range(10):
+        _submit(store, f"student{i:02d}", 50 + i)
+    board = Leaderboard(store)
+    rows, total = board.page(offset=3, limit=4)
+    assert total == 10
+    assert [r["rank"] for r in rows] == [4, 5, 6, 7]
+    assert _names(rows) == ["Student06", "Student05", "Student04", "Student03"]
+    assert board.page(offset=8, limit=5)[0][-1]["rank"] == 10
+
+
+def test_etag_changes_only_with_the_page(store):
+    _submit(store, "student00", 60)
+    _submit(store, "student01", 70)
+    board = Leaderboard(store)
+    etag = Leaderboard.etag(*board.page())
+    assert Leaderboard.etag(*board.page()) == etag
+    _submit(store, "student00", 90)
+    assert Leaderboard.etag(*board.page()) != etag
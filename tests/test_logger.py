@@ -0,0 +1,43 @@
+import os
+import glob
+import logging
+from src import logger as app_logger
+from src.logger import SharedRotatingFileHandler, JsonFormatter
+
+
+def _record(msg):
+    return logging.LogRecord("test", logging.INFO, __file__, 0, msg, (), None)
+
+
+def test_forked_writers_share_one_rotation(tmp_path):
+    path = str(tmp_path / "app.log")
+    pids = []
+    for p in range(3):
+        pid = os.fork()
+        if pid == 0:
+            handler = SharedRotatingFileHandler(path, maxBytes=4000, backupCount=50, encoding="utf-8")
+            handler.setFormatter(JsonFormatter())
+            for i in range(200):
+                handler.emit(_record(f"proc {p} line {i}"))
+            handler.close()
+            os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        assert os.waitpid(pid, 0)[1] == 0
+    files = [f for f in glob.glob(path + "*") if not f.endswith(".lock")]
+    assert len(files) > 2  # it did rotate
+    assert sum(1 for f in files for _ in open(f, encoding="utf-8")) == 600
+
+
+def test_unwritable_log_dir_falls_back_to_console(tmp_path, monkeypatch, capsys):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setattr(app_logger, "LOG_DIR", str(blocker / "logs"))
+    handler = app_logger._AsyncDispatchHandler()
+    try:
+        handler.handle(_record("still logged"))
+        handler.flush()
+    finally:
+        handler.close()
+    err = capsys.readouterr().err
+    assert "console only" in err and "still logged" in err
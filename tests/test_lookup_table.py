@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from src.components.lookup_table import PredictionLookupTable
+from src.components.schema import FEATURE_COLS, TARGET_COLS
+from src.utils import predict_targets
+
+
+@pytest.fixture(scope="module")
+def model(training_frame, preprocessor):
+    X = preprocessor.transform(training_frame[FEATURE_COLS])
+    return RandomForestRegressor(n_estimators=8, random_state=0).fit(X, training_frame[TARGET_COLS].to_numpy())
+
+
+def test_table_matches_the_model(model, preprocessor, training_frame):
+    table = PredictionLookupTable.build(model, preprocessor, FEATURE_COLS, TARGET_COLS)
+    assert table.table.shape == (2, 5, 6, 2, 2, len(TARGET_COLS))  # every category combination
+    expected = predict_targets(model, preprocessor.transform(training_frame[FEATURE_COLS]))
+    assert np.allclose(table.predict(training_frame), expected)
+    assert table.max_abs_diff(model, preprocessor) == pytest.approx(0.0)
+
+
+def test_saved_table_predicts_the_same(model, preprocessor, training_frame, tmp_path):
+    table = PredictionLookupTable.build(model, preprocessor, FEATURE_COLS, TARGET_COLS, model_sha256="abc")
+    table.save(str(tmp_path / "lookup_table.npz"))
+    loaded = PredictionLookupTable.load(str(tmp_path / "lookup_table.npz"))
+    assert loaded.model_sha256 == "abc"
+    rows = list(training_frame[FEATURE_COLS].itertuples(index=False, name=None))[:50]
+    assert np.allclose(loaded.predict(rows), table.predict(rows))
+
+
+def test_unknown_category_is_rejected(model, preprocessor, training_frame):
+    table = PredictionLookupTable.build(model, preprocessor, FEATURE_COLS, TARGET_COLS)
+    row = training_frame[FEATURE_COLS].iloc[:1].copy()
+    row["lunch"] = "caviar"
+    with pytest.raises(ValueError, match="caviar"):
+        table.predict(row)
@@ -0,0 +1,37 @@
+import threading
+import pytest
+from conftest import make_record, start_writer
+from src.web.cohort import Cohort
+from src.web.leaderboard import Leaderboard
+
+SCORES = make_record(70)[0]["scores"]
+
+VIEWS = {
+    "leaderboard": (Leaderboard, lambda board: board.page()),
+    "cohort": (Cohort, lambda cohort: (len(cohort), cohort.standing(SCORES, username="student00"))),
+}
+
+
+@pytest.mark.parametrize("name", sorted(VIEWS))
+def test_stale_sync_with_concurrent_writer_does_not_deadlock(store, name):
+    cls, query = VIEWS[name]
+    view = cls(store)
+    query(view)
+    stop = threading.Event()
+    writer = start_writer(store, stop)
+
+    def sync_repeatedly():
+        for _ in range(50):
+            with view._lock:
+                view._stale = True
+            query(view)
+
+    reader = threading.Thread(target=sync_repeatedly, daemon=True)
+    reader.start()
+    reader.join(timeout=30)
+    stop.set()
+    writer.join(timeout=30)
+    assert not reader.is_alive() and not writer.is_alive(), f"{name} sync deadlocked against a store write"
+
+    # whatever interleaving happened, the view matches one built from scratch
+    assert query(view) == query(cls(store))
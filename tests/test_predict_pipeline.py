@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.pipeline.predict_pipeline import PredictPipeline
+
+SUBJECTS = PredictPipeline().subjects
+
+
+def test_missing_score_names_the_column():
+    df = pd.DataFrame({s: [70, 80] for s in SUBJECTS})
+    df.loc[1, "science_score"] = np.nan
+    with pytest.raises(ValueError, match="science_score"):
+        PredictPipeline().predict(df)
+
+
+def test_numeric_strings_are_accepted():
+    df = pd.DataFrame({s: ["70", "80"] for s in SUBJECTS})
+    result = PredictPipeline().predict(df)
+    assert result[1]["scores"]["math_score"] == 80 and result[1]["overall"] == 80.0
+
+
+def _predict_per_row(df):
+    """The original iterrows implementation, kept as the reference for the vectorized path."""
+    pipeline = PredictPipeline()
+    results = []
+    for idx, row in df.iterrows():
+        scores = {sub: int(row[sub]) for sub in SUBJECTS}
+        weakest = min(scores, key=scores.get)
+        overall = round(np.mean(list(scores.values())), 2)
+        results.append({
+            "scores": scores,
+            "strongest": max(scores, key=scores.get).replace("_score", "").title(),
+            "weakest": weakest.replace("_score", "").title(),
+            "overall": overall,
+            "badge": pipeline.assign_badge(overall),
+            "recommendation": f"Focus on improving {weakest.replace('_score', '').title()}",
+        })
+    return results
+
+
+def test_vectorized_predict_matches_the_per_row_path():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({s: rng.integers(0, 101, 500) for s in SUBJECTS})
+    df.iloc[:20] = 75  # all-tied rows: strongest and weakest both pick the first subject
+    df["name"] = [f"s{i}" for i in range(len(df))]
+    expected = _predict_per_row(df)
+    actual = PredictPipeline().predict(df)
+    assert np.allclose([r["overall"] for r in actual], [r["overall"] for r in expected])
+    assert np.array_equal([list(r["scores"].values()) for r in actual],
+                          [list(r["scores"].values()) for r in expected])
+    for key in ("strongest", "weakest", "badge", "recommendation"):
+        assert [r[key] for r in actual] == [r[key] for r in expected], key
+    assert [r["roll"] for r in actual] == list(range(1, 501))
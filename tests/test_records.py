@@ -0,0 +1,76 @@
+import json
+import pytest
+from src.web.aggregates import SUBJECTS
+from src.web.records import parse_import_row, read_import_rows, build_import_batch, iter_csv, iter_ndjson
+
+
+def _row(**extra):
+    return dict({s: 70 for s in SUBJECTS}, hours=2, **extra)
+
+
+def test_read_import_rows_formats():
+    rows = [_row(username="a"), _row(username="b")]
+    assert read_import_rows(json.dumps(rows), "application/json") == rows
+    assert read_import_rows(json.dumps({"records": rows}).encode()) == rows
+    assert read_import_rows("\n".join(json.dumps(r) for r in rows) + "\n", "application/x-ndjson") == rows
+    csv_rows = read_import_rows("username,hours," + ",".join(SUBJECTS) + "\nc,3," + ",".join(["80"] * 7) + "\n")
+    assert csv_rows == [dict({s: "80" for s in SUBJECTS}, username="c", hours="3")]
+    assert read_import_rows("  ") == []
+    with pytest.raises(ValueError, match="at most 1"):
+        read_import_rows(json.dumps(rows), max_rows=1)
+    with pytest.raises(ValueError, match="not valid JSON"):
+        read_import_rows("[{", "application/json")
+
+
+def test_parse_import_row():
+    username, scores, hours, timestamp = parse_import_row(_row(username=" alice ", timestamp="2025-01-31T09:30"))
+    assert (username, hours, timestamp) == ("alice", 2, "2025-01-31T09:30:00")
+    assert scores == {s: 70 for s in SUBJECTS}
+    nested = {"scores": {f"{s.lower()}_score": "65" for s in SUBJECTS}, "hours_studied": "4"}
+    assert parse_import_row(nested, default_username="me")[:3] == ("me", {s: 65 for s in SUBJECTS}, 4)
+
+
+@pytest.mark.parametrize("row, message", [
+    (dict(_row(), Math=None), "Math is required"),
+    (dict(_row(), Math=7.5), "Math must be an integer"),
+    ({k: v for k, v in _row().items() if k != "Social"}, "missing scores for Social"),
+    (dict(_row(), hours=30), "hours must be between 0 and 24"),
+    (dict(_row(), timestamp="yesterday"), "timestamp must be ISO 8601"),
+    (_row(username=12345), "username must be a string"),
+    (["not", "a", "dict"], "record must be an object"),
+])
+def test_parse_import_row_rejects(row, message):
+    with pytest.raises(ValueError, match=message):
+        parse_import_row(row, default_username="me")
+
+
+def test_build_import_batch_chains_per_user_in_order():
+    rows = [("a", {s: 50 for s in SUBJECTS}, 2, None), ("b", {s: 90 for s in SUBJECTS}, 2, None),
+            ("a", {s: 60 for s in SUBJECTS}, 2, None)]
+    batch = build_import_batch(rows, {"a": None, "b": None})
+    assert [u for u, _, _ in batch] == ["a", "b", "a"]
+    assert set(batch[2][1]["deltas"].values()) == {10}  # chained off a's first row, not b's
+
+
+def test_export_round_trips_through_import():
+    records = [{"timestamp": "2025-01-01T00:00:00", "hours": 2, "scores": {s: 70 for s in SUBJECTS},
+                "percentage": 70.0, "badge": "x"}]
+    ndjson = "".join(iter_ndjson([("a", records)]))
+    assert parse_import_row(json.loads(ndjson))[:3] == ("a", records[0]["scores"], 2)
+    csv_text = "".join(iter_csv([("a", records)]))
+    assert parse_import_row(read_import_rows(csv_text)[0])[:3] == ("a", records[0]["scores"], 2)
+
+
+def test_import_route_is_all_or_nothing_and_keeps_order(app_module, client):
+    bad = [dict(_row(), Math=80), _row(username="someone-else"), dict(_row(), hours=99)]
+    resp = client.post("/records/import", data=json.dumps(bad), content_type="application/json")
+    assert resp.status_code == 400
+    assert [e["row"] for e in resp.get_json()["errors"]] == [2, 3]
+    assert app_module.store.get_user(client.username)["records"] == []
+
+    good = [_row(**{s: score for s in SUBJECTS}) for score in (40, 90, 60)]
+    resp = client.post("/records/import", data=json.dumps(good), content_type="application/json")
+    assert resp.status_code == 200 and resp.get_json()["imported"] == 3
+    records = app_module.find_user(client.username)["records"]
+    assert [r["percentage"] for r in records] == [40, 90, 60]
+    assert [r["deltas"]["Math"] for r in records] == [40, 50, -30]
@@ -0,0 +1,20 @@
+import os
+from src.pipeline.stage_runner import ArtifactStore, Stage, StageRunner
+from src.utils import save_object, load_object, manifest_path
+
+
+def test_publish_removes_stale_manifest(tmp_path):
+    target = str(tmp_path / "artifacts")
+    # an earlier joblib run left model.pkl with a manifest sidecar
+    save_object(os.path.join(target, "model.pkl"), {"old": True}, fmt="joblib")
+
+    def train(workdir, inputs):
+        save_object(os.path.join(workdir, "model.pkl"), {"new": True}, fmt="dill")
+
+    runner = StageRunner(ArtifactStore(str(tmp_path / "store")), lineage_path=str(tmp_path / "lineage.json"))
+    stage = Stage("train", train)
+    results = runner.run([stage])
+    runner.publish("train", results["train"], target_dir=target)
+
+    assert not os.path.exists(manifest_path(os.path.join(target, "model.pkl")))
+    assert load_object(os.path.join(target, "model.pkl")) == {"new": True}
@@ -0,0 +1,68 @@
+import os
+import json
+from conftest import make_user, make_record
+from src.web.storage import LogStore, JsonFileStore, open_store
+
+
+def _in_child(fn):
+    """Run ``fn`` in a forked process (a separate store instance, like another worker)."""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            fn()
+        finally:
+            os._exit(0)
+    assert os.waitpid(pid, 0)[1] == 0
+
+
+def test_open_store_migrates_users_json_once(tmp_path):
+    record, points = make_record(60)
+    alice = dict(make_user("Alice"), records=[record], points=points)
+    users = [alice, make_user("bob"), make_user("ALICE")]  # duplicate key (case-folded) is dropped
+    (tmp_path / "users.json").write_text(json.dumps(users), encoding="utf-8")
+
+    store = open_store(str(tmp_path), backend="log")
+    assert store.count() == 2
+    user = store.get_user("alice")
+    assert user["username"] == "Alice" and user["records"] == [record]
+    assert user["aggregates"]["count"] == 1
+
+    # a second open does not import the (now stale) users.json again
+    (tmp_path / "users.json").write_text(json.dumps([make_user("carol")]), encoding="utf-8")
+    assert open_store(str(tmp_path), backend="log").get_user("carol") is None
+
+
+def test_appends_from_another_process_are_tailed(store):
+    assert store.get_user("student00")["records"] == []
+    record, points = make_record(75)
+    _in_child(lambda: LogStore(store.path, background_compaction=False).append_record("student00", record, points))
+    user = store.get_user("student00")
+    assert user["records"] == [record]
+    assert user["points"] == points
+
+
+def test_compaction_in_another_process_keeps_every_user(store):
+    for i in range(5):
+        store.append_records([(f"student{j:02d}", *make_record(40 + i)) for j in range(20)])
+    before = {u["username"]: u for u in store.iter_users()}
+    gen = store._gen
+
+    _in_child(lambda: LogStore(store.path, background_compaction=False).compact())
+    after = {u["username"]: u for u in store.iter_users()}
+    assert after == before
+    assert store._gen > gen
+    assert all(len(entries) == 1 for entries in store._index.values())  # one U line per user
+
+    # writes after the compaction land in the new generation
+    record, points = make_record(99)
+    store.append_record("student03", record, points)
+    assert LogStore(store.path, background_compaction=False).get_user("student03")["records"][-1] == record
+
+
+def test_json_backend_keeps_the_same_interface(tmp_path):
+    store = JsonFileStore(str(tmp_path / "users.json"))
+    assert store.add_user(make_user("dave"))
+    assert not store.add_user(make_user("Dave"))
+    record, points = make_record(88)
+    assert store.append_records([("dave", record, points), ("nobody", record, points)]) == 1
+    assert JsonFileStore(str(tmp_path / "users.json")).get_user("DAVE")["records"] == [record]